@@ -1,257 +1,249 @@
 import os
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-import yt_dlp
-import requests
 import tempfile
+import functools
 import json
-import time
+
+from instrumentation import RequestTimings
+from job_queue import FAILED, QUEUED, JobQueue, QueueFull
+from pipeline import FETCH_STAGES, SummaryPipeline
+from rate_limiter import RateLimitExceeded
+from telemetry import METRICS_PORT, configure_json_logging, log_request, start_metrics_server
+from session_results import SessionResults, VideoResult
+from transcript_analytics import analyze_transcript
+from transcript_index import format_timestamp
+from video_metadata import extract_video_id
 
 # Load environment variables from .env file
 load_dotenv()
 
-# --- Set up the LLM and the Prompt ---
-def setup_llm():
-    """Setup Gemini LLM with correct model names"""
-    # Try available models in order of preference
-    models_to_try = [
-        "gemini-2.5-flash",          # Fast and free - should work
-        "gemini-2.0-flash",          # Good alternative
-        "gemini-2.5-pro",            # Pro version
-        "gemini-flash-latest",       # Latest flash
-        "gemini-pro-latest",         # Latest pro
-    ]
-    
-    for model_name in models_to_try:
-        try:
-            # REMOVED: st.write(f"🔄 Trying model: {model_name}") - This line is removed as requested
-            llm = ChatGoogleGenerativeAI(
-                model=model_name,
-                temperature=0.3,
-                google_api_key=os.getenv("GOOGLE_API_KEY")
-            )
-            # Test the model with a simple prompt
-            test_response = llm.invoke("Say 'Hello' in one word.")
-            # REMOVED: Success message from UI - backend only
-            return llm
-        except Exception as e:
-            # REMOVED: Warning messages from UI - backend only
-            continue
-    
-    # REMOVED: Error message from UI - will handle in main app
-    return None
+# --- Shared processing pipeline (LLM, caches, HTTP client) ---
+@st.cache_resource
+def get_pipeline():
+    """One pipeline per process, shared by every session and rerun"""
+    configure_json_logging()
+    return SummaryPipeline()
 
-# Initialize LLM
-llm = setup_llm()
+@st.cache_resource
+def start_metrics_sidecar():
+    """Prometheus ``/metrics`` on TUBETALK_METRICS_PORT, once per process"""
+    if METRICS_PORT:
+        return start_metrics_server(get_pipeline().metrics, METRICS_PORT)
+
+start_metrics_sidecar()
 
-prompt_template = """
-You are an expert in summarizing YouTube videos.
-You will be given a transcript of a YouTube video and your job is to provide a concise summary.
+def get_llm_provider():
+    return get_pipeline().llm_provider
 
-Please provide a well-structured summary that includes:
-1. Main topic and key points
-2. Important insights or findings
-3. Conclusion or main takeaways
+def get_video_cache():
+    return get_pipeline().video_cache
 
-Here is the transcript:
-{transcript}
+def get_transcript_store():
+    return get_pipeline().store
 
-Summary:
-"""
-prompt = PromptTemplate(template=prompt_template, input_variables=["transcript"])
-output_parser = StrOutputParser()
+# --- Set up the LLM ---
+def setup_llm():
+    """Return the cached Gemini LLM, probing models only when needed"""
+    return get_llm_provider().get()
+
+# Initialize LLM
+llm = setup_llm()
+
+MAX_TIMING_HISTORY = 20
 
-if llm:
-    summarizer_chain = prompt | llm | output_parser
-else:
-    summarizer_chain = None
+def record_timings(timings):
+    """Keep the most recent request timings for this session's Analytics tab"""
+    history = st.session_state.setdefault('timing_history', [])
+    history.append(timings)
+    del history[:-MAX_TIMING_HISTORY]
 
 # --- Helper function to get video info using yt-dlp ---
 def get_video_info(url):
-    ydl_opts = {'quiet': True, 'skip_download': True}
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info_dict = ydl.extract_info(url, download=False)
-        video_title = info_dict.get('title', 'No title found')
-        video_thumbnail_url = info_dict.get('thumbnail', None)
-        video_duration = info_dict.get('duration', 0)
-        return video_title, video_thumbnail_url, video_duration
+    return get_pipeline().get_video_info(url)
 
 # --- Improved transcript function using yt-dlp ---
-def get_youtube_transcript(url):
-    try:
-        video_id = ""
-        if "watch?v=" in url:
-            video_id = url.split("v=")[1].split("&")[0]
-        elif "youtu.be/" in url:
-            video_id = url.split("/")[-1].split("?")[0]
-        else:
-            raise ValueError("Invalid YouTube URL format")
-        
-        ydl_opts = {
-            'writesubtitles': True,
-            'writeautomaticsub': True,
-            'skip_download': True,
-            'quiet': True,
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info_dict = ydl.extract_info(url, download=False)
-            
-            # Check for available subtitles
-            subtitles = info_dict.get('subtitles', {})
-            automatic_captions = info_dict.get('automatic_captions', {})
-            
-            # Display available languages
-            available_subs = list(subtitles.keys())[:5] if subtitles else []
-            available_auto = list(automatic_captions.keys())[:5] if automatic_captions else []
-            
-            if available_subs:
-                st.sidebar.write("📝 Manual subtitles:", available_subs)
-            if available_auto:
-                st.sidebar.write("🤖 Auto-captions:", available_auto)
-            
-            # Try to get English subtitles first
-            transcript_text = None
-            
-            # Priority 1: Manual English subtitles
-            if 'en' in subtitles and subtitles['en']:
-                subtitle_url = subtitles['en'][0]['url']
-                transcript_text = download_and_parse_subtitle(subtitle_url)
-                if transcript_text:
-                    st.success("✓ Using English manual subtitles")
-            
-            # Priority 2: Automatic English captions
-            if not transcript_text and 'en' in automatic_captions and automatic_captions['en']:
-                subtitle_url = automatic_captions['en'][0]['url']
-                transcript_text = download_and_parse_subtitle(subtitle_url)
-                if transcript_text:
-                    st.success("✓ Using English automatic captions")
-            
-            # Priority 3: Any available manual subtitle
-            if not transcript_text and subtitles:
-                for lang in list(subtitles.keys())[:3]:  # Try first 3 languages
-                    if subtitles[lang]:
-                        subtitle_url = subtitles[lang][0]['url']
-                        transcript_text = download_and_parse_subtitle(subtitle_url)
-                        if transcript_text:
-                            st.success(f"✓ Using {lang} manual subtitles")
-                            break
-            
-            # Priority 4: Any available auto-caption
-            if not transcript_text and automatic_captions:
-                for lang in list(automatic_captions.keys())[:3]:  # Try first 3 languages
-                    if automatic_captions[lang]:
-                        subtitle_url = automatic_captions[lang][0]['url']
-                        transcript_text = download_and_parse_subtitle(subtitle_url)
-                        if transcript_text:
-                            st.success(f"✓ Using {lang} automatic captions")
-                            break
-            
-            if transcript_text:
-                return transcript_text
-            else:
-                return "Error: No subtitles or captions available for this video."
-                
-    except Exception as e:
-        return f"Error fetching transcript: {str(e)}"
+def show_pipeline_event(event, *args):
+    if event == "captions_available":
+        available_subs, available_auto = args
+        if available_subs:
+            st.sidebar.write("📝 Manual subtitles:", available_subs)
+        if available_auto:
+            st.sidebar.write("🤖 Auto-captions:", available_auto)
+    elif event == "caption_selected":
+        st.success(f"✓ Using {args[0]}")
+    elif event == "warning":
+        st.warning(args[0])
 
-def download_and_parse_subtitle(url):
-    try:
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            content = response.text
-            
-            # Handle different subtitle formats
-            if url.endswith('.json3') or url.endswith('.json'):
-                return parse_json_subtitle(response.json())
-            elif url.endswith('.vtt'):
-                return parse_vtt_subtitle(content)
-            elif url.endswith('.srt'):
-                return parse_srt_subtitle(content)
-            else:
-                # Try to auto-detect format
-                if content.strip().startswith('WEBVTT'):
-                    return parse_vtt_subtitle(content)
-                elif '-->' in content and any(char.isdigit() for char in content):
-                    return parse_srt_subtitle(content)
-                else:
-                    # Try JSON parsing as fallback
-                    try:
-                        return parse_json_subtitle(response.json())
-                    except:
-                        return content  # Return raw content as last resort
-        return None
-    except Exception as e:
-        st.warning(f"Subtitle parsing error: {e}")
-        return None
+# --- Results kept across reruns ---
+def get_session_results():
+    """This session's finished work, so reruns redraw instead of recomputing"""
+    return st.session_state.setdefault('results', SessionResults())
 
-def parse_json_subtitle(data):
-    """Parse JSON3 subtitle format"""
-    try:
-        events = data.get('events', [])
-        transcript_parts = []
-        
-        for event in events:
-            if 'segs' in event:
-                for seg in event['segs']:
-                    if 'utf8' in seg:
-                        text = seg['utf8'].strip()
-                        if text and text not in ['\n', ' ']:
-                            transcript_parts.append(text)
-        
-        return " ".join(transcript_parts)
-    except Exception as e:
-        st.warning(f"JSON subtitle parsing failed: {e}")
-        return None
+def start_over():
+    st.session_state['youtube_url'] = ""
 
-def parse_vtt_subtitle(content):
-    """Parse WebVTT subtitle format"""
-    try:
-        lines = content.split('\n')
-        transcript_parts = []
-        in_cue = False
-        
-        for line in lines:
-            line = line.strip()
-            if '-->' in line:
-                in_cue = True
-                continue
-            if not line or line.isdigit() or line == 'WEBVTT':
-                in_cue = False
-                continue
-            if in_cue and line and not line.startswith('NOTE'):
-                transcript_parts.append(line)
-        
-        return " ".join(transcript_parts)
-    except Exception as e:
-        st.warning(f"VTT subtitle parsing failed: {e}")
-        return None
+def show_transcript_preview(transcript):
+    with st.expander("📜 **View Transcript Preview**", expanded=False):
+        st.text_area("Full Transcript", transcript.text, height=200, label_visibility="collapsed", key="transcript_preview")
+
+def show_result(result):
+    """Caption source, transcript preview, summary and details of a finished summary"""
+    if result.caption_label:
+        st.success(f"✓ Using {result.caption_label}")
+    show_transcript_preview(result.transcript)
+    st.markdown("---")
+    st.markdown("### 📝 **AI Generated Summary**")
+    st.markdown('<div class="summary-card">', unsafe_allow_html=True)
+    st.markdown(result.summary)
+    st.markdown('</div>', unsafe_allow_html=True)
+    show_summary_details(result)
 
-def parse_srt_subtitle(content):
-    """Parse SRT subtitle format"""
+def show_summary_details(result):
+    """Timing captions, download and reset buttons under a finished summary"""
+    summary_timing = result.summary_timing
+    if summary_timing.get('cached'):
+        st.caption(f"⚡ Loaded from cache in {summary_timing['total']:.2f}s")
+    elif summary_timing.get('shared'):
+        st.caption(f"⚡ Shared with an identical request already in progress · complete after {summary_timing['total']:.2f}s")
+    elif 'first_token' in summary_timing:
+        st.caption(f"⚡ First token after {summary_timing['first_token']:.2f}s · complete after {summary_timing['total']:.2f}s")
+    if summary_timing.get('models'):
+        st.caption(f"🧭 Answered by {', '.join(summary_timing['models'])}")
+    
+    # Enhanced Download Section
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col2:
+        st.download_button(
+            "💾 **Download Summary**",
+            result.summary,
+            file_name=f"summary_{(result.title or result.video_id)[:30]}.txt",
+            mime="text/plain",
+            use_container_width=True
+        )
+    
+    # Clear button
+    st.button("🔄 Analyze Another Video", use_container_width=True, on_click=start_over)
+
+# --- Background summaries ---
+JOB_POLL_SECONDS = 0.5
+
+def run_summary_job(pipeline, job, url, transcript=None):
+    """Fetch (unless already fetched) and summarize one video on a job worker.
+
+    Progress goes to ``job.emit``: the pipeline's events, ``"progress"``,
+    ``"transcript"`` once it is parsed and ``"summary_chunk"`` per streamed piece.
+    """
+    timings = RequestTimings(video_id=job.key, on_progress=lambda fraction: job.emit("progress", fraction))
+    if transcript is None:
+        transcript = pipeline.get_youtube_transcript(url, timings, on_event=job.emit)
+    else:
+        for stage in FETCH_STAGES:
+            timings.complete(stage)         # Skipped: fetched by an earlier run
+    if isinstance(transcript, str):
+        log_request(timings, "error", error=transcript)
+        raise RuntimeError(transcript)
+    job.emit("transcript", transcript)
+
+    summary_timing = {}
+    parts = []
     try:
-        lines = content.split('\n')
-        transcript_parts = []
-        in_cue = False
-        
-        for line in lines:
-            line = line.strip()
-            if '-->' in line:
-                in_cue = True
-                continue
-            if not line or line.isdigit():
-                in_cue = False
-                continue
-            if in_cue and line:
-                transcript_parts.append(line)
-        
-        return " ".join(transcript_parts)
+        with timings.stage("llm"):
+            for chunk in pipeline.stream_summary(transcript, summary_timing):
+                parts.append(chunk)
+                job.emit("summary_chunk", chunk)
+    except RateLimitExceeded as e:
+        log_request(timings, "rate_limited", transcript_chars=len(transcript.text), error=str(e))
+        raise
     except Exception as e:
-        st.warning(f"SRT subtitle parsing failed: {e}")
-        return None
+        log_request(timings, "error", transcript_chars=len(transcript.text), error=str(e))
+        # Model may have gone away; re-probe on the next run
+        pipeline.llm_provider.invalidate()
+        raise
+    if 'first_token' in summary_timing:
+        # Part of the llm span, so a fact rather than a stage of its own
+        timings.info['llm_first_token_seconds'] = round(summary_timing['first_token'], 4)
+    timings.info.update(summary_timing.get('compaction', {}))
+    log_request(timings, "ok", transcript_chars=len(transcript.text),
+                models=summary_timing.get('models', []), cached=summary_timing.get('cached', False))
+    return {"transcript": transcript, "summary": "".join(parts), "summary_timing": summary_timing, "timings": timings}
+
+@st.cache_resource
+def get_job_queue():
+    """One worker pool per process; jobs outlive the script runs that started them"""
+    pipeline = get_pipeline()
+    return JobQueue(functools.partial(run_summary_job, pipeline), metrics=pipeline.metrics)
+
+def get_watched_jobs():
+    """Jobs this session started and has not shown the outcome of yet, by video ID"""
+    return st.session_state.setdefault('jobs', {})
+
+def collect_job(job, result):
+    """Store a finished job's output on ``result``, or show why it failed; True if it succeeded"""
+    for event, args in job.events:
+        if event == "captions_available":
+            show_pipeline_event(event, *args)
+        elif event == "caption_selected":
+            result.caption_label = args[0]
+        elif event == "transcript":
+            result.transcript = args[0]
+    if job.status == FAILED:
+        get_session_results().put(result)
+        if isinstance(job.error, RateLimitExceeded):
+            st.warning(f"⏳ {job.error}")
+        else:
+            st.error(f"❌ {job.error}")
+        return False
+    output = job.result
+    result.transcript, result.summary = output['transcript'], output['summary']
+    result.summary_timing, result.timings = output['summary_timing'], output['timings']
+    result.timings.on_progress = None       # Reported to the job, which is over
+    get_session_results().put(result)
+    return True
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_job_progress(job):
+    """Progress of a running summary, redrawn every JOB_POLL_SECONDS until it finishes"""
+    if job.finished:
+        st.rerun()          # The whole page picks up the result
+    st.progress(job.progress)
+    events = list(job.events)
+    transcript = next((args[0] for event, args in events if event == "transcript"), None)
+    if job.status == QUEUED:
+        st.info(f"⏳ Waiting for a free worker · {get_job_queue().position(job)} videos ahead")
+    elif transcript is None:
+        st.text("🔄 Step 1/3: Fetching video transcript...")
+    else:
+        st.text("🤖 Step 3/3: Generating AI summary...")
+    for event, args in events:
+        if event in ("caption_selected", "warning"):
+            show_pipeline_event(event, *args)
+    if transcript is not None:
+        show_transcript_preview(transcript)
+        st.markdown("---")
+        st.markdown("### 📝 **AI Generated Summary**")
+        st.markdown("".join(args[0] for event, args in events if event == "summary_chunk") or "🧠 AI is analyzing and summarizing the content...")
+
+# --- Questions about the analyzed video ---
+MAX_ANSWER_HISTORY = 10
+
+def stream_answer(question, result, timing):
+    return get_pipeline().stream_answer(question, result.index, timing)
+
+def show_answer_sources(result, timing):
+    """Timestamp links to the excerpts an answer was drawn from, and what it cost"""
+    if timing.get('sources'):
+        links = [f"[{format_timestamp(start)}](https://www.youtube.com/watch?v={result.video_id}&t={int(start)}s)"
+                 for start, _ in sorted(timing['sources'])]
+        st.markdown("📍 **Sources:** " + " · ".join(links))
+    details = [f"retrieval {timing['retrieval_seconds'] * 1000:.1f} ms"]
+    if timing.get('prompt_tokens'):
+        details.append(f"{timing['prompt_tokens']:,} prompt tokens")
+    if timing.get('cached'):
+        details.append("answer from cache")
+    elif 'first_token' in timing:
+        details.append(f"first token after {timing['first_token']:.2f}s")
+    st.caption(" · ".join(details))
 
 # --- Enhanced Streamlit User Interface ---
 st.set_page_config(
@@ -314,7 +306,7 @@ st.markdown('<h1 class="main-header">🎬 TubeTalk: Your AI YouTube Assistant</h
 st.markdown("### 🚀 Transform YouTube videos into concise summaries in seconds!")
 
 # Create tabs for better organization
-tab1, tab2, tab3 = st.tabs(["📹 Video Summary", "📊 Analytics", "ℹ️ About"])
+tab1, tab2, tab3, tab4 = st.tabs(["📹 Video Summary", "💬 Ask the Video", "📊 Analytics", "ℹ️ About"])
 
 with tab1:
     # Enhanced URL Input Section
@@ -327,7 +319,8 @@ with tab1:
         youtube_url = st.text_input(
             "Paste YouTube URL here:",
             placeholder="https://www.youtube.com/watch?v=... or https://youtu.be/...",
-            label_visibility="collapsed"
+            label_visibility="collapsed",
+            key="youtube_url"
         )
     with col2:
         st.write("")  # Spacer
@@ -336,11 +329,21 @@ with tab1:
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+    summarize_clicked = False
+    summary_finished = False
+    shown = None        # VideoResult for the URL in the box
     if youtube_url:
         try:
-            # Video Information Card
-            with st.spinner("🔍 Fetching video information..."):
-                video_title, video_thumbnail_url, video_duration = get_video_info(youtube_url)
+            # Metadata is fetched once per session; reruns reuse it
+            video_id = extract_video_id(youtube_url)
+            shown = get_session_results().get(video_id)
+            if shown is None:
+                with st.spinner("🔍 Fetching video information..."):
+                    video_title, video_thumbnail_url, video_duration = get_video_info(youtube_url)
+                shown = get_session_results().put(
+                    VideoResult(video_id, youtube_url, video_title, video_thumbnail_url, video_duration)
+                )
+            video_title, video_thumbnail_url, video_duration = shown.title, shown.thumbnail, shown.duration
             
             st.markdown("---")
             st.markdown("### 📺 Video Preview")
@@ -369,88 +372,174 @@ with tab1:
                 # MOVED: Generate button inside the video preview section
                 summarize_clicked = st.button("🚀 **Generate Summary**", type="primary", use_container_width=True)
 
-            # Generate Summary with Enhanced Effects
+            # Summaries run on the job queue, so reruns and refreshes don't cancel them
             if summarize_clicked:
-                # Progress tracking
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # Step 1: Fetching transcript
-                status_text.text("🔄 Step 1/3: Fetching video transcript...")
-                with st.spinner("📥 Downloading transcript..."):
-                    transcript = get_youtube_transcript(youtube_url)
-                    progress_bar.progress(33)
-                    time.sleep(0.5)  # Smooth progress effect
-                
-                if "Error" not in transcript:
-                    status_text.text("✅ Step 2/3: Transcript fetched successfully!")
-                    
-                    # Transcript Preview with enhanced display
-                    with st.expander("📜 **View Transcript Preview**", expanded=False):
-                        st.text_area("Full Transcript", transcript, height=200, label_visibility="collapsed", key="transcript_preview")
-                    
-                    # Step 2: Generating summary
-                    status_text.text("🤖 Step 3/3: Generating AI summary...")
-                    progress_bar.progress(66)
-                    
-                    if summarizer_chain:
-                        try:
-                            # Animated summary generation
-                            with st.spinner("🧠 AI is analyzing and summarizing the content..."):
-                                summary = summarizer_chain.invoke({"transcript": transcript})
-                                progress_bar.progress(100)
-                                time.sleep(0.5)
-                            
-                            status_text.text("✅ Summary generated successfully!")
-                            
-                            # Display Summary in Enhanced Card
-                            st.markdown("---")
-                            st.markdown("### 📝 **AI Generated Summary**")
-                            st.markdown('<div class="summary-card">', unsafe_allow_html=True)
-                            st.write(summary)
-                            st.markdown('</div>', unsafe_allow_html=True)
-                            
-                            # Enhanced Download Section
-                            col1, col2, col3 = st.columns([1, 1, 1])
-                            with col2:
-                                st.download_button(
-                                    "💾 **Download Summary**",
-                                    summary,
-                                    file_name=f"summary_{video_title[:30]}.txt",
-                                    mime="text/plain",
-                                    use_container_width=True
-                                )
-                            
-                            # Clear button
-                            if st.button("🔄 Analyze Another Video", use_container_width=True):
-                                st.rerun()
-                                
-                        except Exception as e:
-                            st.error(f"❌ Summary generation failed: {e}")
-                    else:
-                        st.error("🤖 AI service is currently unavailable. Please check your API configuration.")
-                else:
-                    st.error(f"❌ {transcript}")
-                    progress_bar.empty()
-                    status_text.empty()
+                try:
+                    get_watched_jobs()[video_id] = get_job_queue().submit(video_id, youtube_url, shown.transcript)
+                except QueueFull as e:
+                    st.warning(f"⏳ {e}")
+            job = get_watched_jobs().get(video_id)
+            if job is None and shown.summary is None:
+                # Started before the page was refreshed, or by another session
+                job = get_job_queue().get(video_id)
+                if job is not None and job.status == FAILED:
+                    job = None
+            if job is not None and job.finished:
+                get_watched_jobs().pop(video_id, None)
+                summary_finished = collect_job(job, shown)
 
+            if job is not None and not job.finished:
+                show_job_progress(job)
+            elif summary_finished:
+                # First draw of a new summary: the request's last timed stage, which fills the bar
+                shown.timings.on_progress = st.progress(job.progress).progress
+                with shown.timings.stage("render"):
+                    show_result(shown)
+                shown.timings.on_progress = None
+                record_timings(shown.timings)
+            # Any other rerun (download, tab switch, widget change) redraws the stored result
+            elif shown.summary is not None:
+                show_result(shown)
+
+        except RateLimitExceeded as e:
+            st.warning(f"⏳ {e}")
         except Exception as e:
             st.error(f"⚠️ An error occurred. Please check the URL and try again. Details: {e}")
 
 with tab2:
+    st.markdown("### 💬 Ask the Video")
+    if shown is not None and shown.transcript is not None:
+        try:
+            # Built once per video (and stored with the transcript), then reused for every question
+            if shown.index is None:
+                index_timing = {}
+                with st.spinner("🗂️ Indexing the transcript..."):
+                    shown.index = get_pipeline().transcript_index(shown.transcript, index_timing)
+                shown.index_timing = index_timing
+            index_timing = shown.index_timing
+            st.caption(
+                f"🗂️ {index_timing['index_chunks']} searchable passages · "
+                f"{'loaded' if index_timing['index_cached'] else 'indexed'} in {index_timing['index_seconds'] * 1000:.0f} ms"
+            )
+
+            with st.form("ask_form", clear_on_submit=True):
+                question = st.text_input("Your question", placeholder="What does the video say about ...?")
+                asked = st.form_submit_button("💬 Ask", type="primary")
+            if asked and question.strip():
+                answer_timing = {}
+                st.markdown(f"**❓ {question}**")
+                with st.spinner("🔎 Searching the transcript..."):
+                    answer = st.write_stream(stream_answer(question, shown, answer_timing))
+                show_answer_sources(shown, answer_timing)
+                shown.answers.append((question, answer, answer_timing))
+                del shown.answers[:-MAX_ANSWER_HISTORY]
+                get_session_results().put(shown)
+                earlier = shown.answers[-2::-1]
+            else:
+                earlier = shown.answers[::-1]
+            for earlier_question, earlier_answer, earlier_timing in earlier:
+                with st.expander(f"❓ {earlier_question}"):
+                    st.markdown(earlier_answer)
+                    show_answer_sources(shown, earlier_timing)
+        except RateLimitExceeded as e:
+            st.warning(f"⏳ {e}")
+        except Exception as e:
+            get_llm_provider().invalidate()
+            st.error(f"❌ Could not answer: {e}")
+    else:
+        st.info("👆 Enter a YouTube URL and generate a summary, then ask questions about the video here!")
+
+with tab3:
     st.markdown("### 📊 Analytics & Metrics")
-    if youtube_url and 'transcript' in locals() and "Error" not in transcript:
-        col1, col2, col3 = st.columns(3)
+    analyzed = shown if shown is not None and shown.transcript is not None else None
+    if analyzed is not None:
+        transcript = analyzed.transcript
+        # Computed once per video; reruns reuse it
+        if analyzed.analytics is None:
+            analyzed.analytics = analyze_transcript(transcript)
+        analytics = analyzed.analytics
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Transcript Length", f"{len(transcript):,} chars")
+            st.metric("Transcript Length", f"{len(transcript.text):,} chars")
         with col2:
-            st.metric("Word Count", f"{len(transcript.split()):,} words")
+            st.metric("Word Count", f"{analytics.word_count:,} words")
         with col3:
-            st.metric("Estimated Reading Time", f"{len(transcript.split())//200 + 1} min")
+            st.metric("Estimated Reading Time", f"{analytics.word_count//200 + 1} min")
+        with col4:
+            st.metric("Speaking Rate", f"{analytics.words_per_minute:.0f} wpm" if analytics.words_per_minute else "–")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Sentences", f"{analytics.sentence_count:,}" if analytics.sentence_count else "–",
+                    help="Automatic captions have no punctuation, so sentences can't be counted")
+        col2.metric("Silence", f"{analytics.silence_ratio:.0%}")
+        col3.metric("Music", f"{analytics.music_ratio:.0%}")
+        col4.metric("Scripts", " · ".join(f"{script} {share:.0%}" for script, share in list(analytics.scripts.items())[:2]) or "–")
+        if len(analytics.rate_wpm):
+            st.markdown("#### 🗣️ Speaking Rate Over Time")
+            st.line_chart({"minute": analytics.rate_seconds / 60, "words per minute": analytics.rate_wpm},
+                          x="minute", y="words per minute")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("#### 🔑 Top Keywords")
+            st.dataframe([{"keyword": word, "count": count} for word, count in analytics.keywords],
+                         use_container_width=True, hide_index=True)
+        with col2:
+            st.markdown("#### 💬 Top Phrases")
+            st.dataframe([{"phrase": phrase, "count": count} for phrase, count in analytics.phrases],
+                         use_container_width=True, hide_index=True)
+        tags = ", ".join(f"{count} {kind}" for kind, count in analytics.tag_counts.items())
+        st.caption(f"Non-speech tags: {tags or 'none'} · analyzed in {analytics.seconds * 1000:.0f} ms")
     else:
         st.info("👆 Enter a YouTube URL and generate a summary to see analytics here!")
 
-with tab3:
+    # Where the time went for this session's recent requests
+    timing_history = st.session_state.get('timing_history', [])
+    if timing_history:
+        st.markdown("#### ⏱️ Request Timings")
+        latest = timing_history[-1]
+        st.caption(f"Latest request: {latest.video_id} · {latest.total:.2f}s total")
+        if 'reduction' in latest.info:
+            st.caption(
+                f"Caption cleanup ({latest.info['caption_format']}): {latest.info['raw_chars']:,} → "
+                f"{latest.info['text_chars']:,} chars ({latest.info['reduction']:.0%} smaller)"
+            )
+        if 'tokens_before' in latest.info:
+            before, after = latest.info['tokens_before'], latest.info['tokens_after']
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Tokens Before Compaction", f"{before:,}")
+            col2.metric("Tokens Sent to AI", f"{after:,}", f"-{1 - after / before:.0%}" if before else None, delta_color="inverse")
+            col3.metric("Removed", f"{latest.info['tags_removed']} tags · {latest.info['fillers_removed']} fillers")
+            if latest.info['passages_pruned']:
+                st.caption(f"Over the {latest.info['budget_tokens']:,}-token budget: {latest.info['passages_pruned']} low-information passages dropped")
+        st.bar_chart({name: seconds for name, seconds in latest.durations.items()})
+        st.dataframe(
+            [{"video_id": t.video_id, "total_s": round(t.total, 3),
+              **{name: round(seconds, 3) for name, seconds in t.durations.items()}}
+             for t in reversed(timing_history)],
+            use_container_width=True
+        )
+        st.download_button(
+            "📤 Export Timings (JSON)",
+            json.dumps([t.to_dict() for t in timing_history], indent=2),
+            file_name="tubetalk_timings.json",
+            mime="application/json"
+        )
+
+    # How the router spread calls across models (process-wide), for tuning
+    routing = get_pipeline().router.stats()
+    if any(model['calls'] for model in routing['models'].values()):
+        st.markdown("#### 🧭 Model Routing")
+        st.dataframe(
+            [{"model": name, "tier": model['tier'], "calls": model['calls'], "errors": model['errors'],
+              "rate_limited": model['rate_limited'], "p50_s": model['p50_s'], "p90_s": model['p90_s'],
+              "cooldown_s": round(model['cooldown_s'])}
+             for name, model in routing['models'].items()],
+            use_container_width=True
+        )
+        st.bar_chart({name: model['histogram'] for name, model in routing['models'].items() if model['calls']})
+        with st.expander("Recent routing decisions"):
+            st.dataframe(list(reversed(routing['decisions'])), use_container_width=True)
+
+with tab4:
     st.markdown("### ℹ️ About TubeTalk")
     st.write("""
     **TubeTalk** transforms your YouTube watching experience by providing intelligent video summaries using cutting-edge AI technology.
@@ -478,7 +567,7 @@ with st.sidebar:
     st.markdown("### ⚡ Quick Actions")
     if youtube_url:
         st.success("✅ Video URL loaded")
-        if summarize_clicked:
+        if summary_finished:
             st.balloons()  # Celebration effect
     
     st.markdown("### 🔍 Status")
@@ -486,6 +575,31 @@ with st.sidebar:
         st.success("🤖 AI: Connected")
     else:
         st.error("🤖 AI: Disconnected")
+    llm_stats = get_llm_provider().stats()
+    st.caption(f"Model: {llm_stats['model'] or 'none'} · Probes this process: {llm_stats['probe_count']}")
+    video_stats = get_video_cache().stats()
+    st.caption(f"Video info cache: {video_stats['hits']} hits · {video_stats['misses']} misses")
+    store_stats = get_transcript_store().stats()
+    st.caption(f"Transcript cache: {store_stats['transcripts']} transcripts · {store_stats['summaries']} summaries · {store_stats['bytes'] // 1024} KB")
+    http_stats = get_pipeline().http_client.stats()
+    st.caption(
+        f"Caption HTTP: {http_stats['requests']} requests · {http_stats['connections_opened']} connections · "
+        f"{http_stats['retries']} retries · {http_stats['not_modified']} not modified"
+    )
+    usage = get_pipeline().rate_limiter.stats()
+    if usage:
+        gemini = [account for name, account in usage.items() if name.startswith("gemini")]
+        st.caption(
+            f"Gemini: {sum(a['requests'] for a in gemini)} requests · "
+            f"{sum(a['tokens_in'] + a['tokens_out'] for a in gemini):,} tokens · "
+            f"{sum(a['rejected'] for a in usage.values())} turned away while busy · "
+            f"{sum(a['waited_s'] for a in usage.values()):.1f}s queued"
+        )
+    flight_stats = get_pipeline().flights.stats()
+    st.caption(
+        f"Shared requests: {flight_stats['coalesced']} joined · {flight_stats['executions']} run · "
+        f"{flight_stats['in_flight']} in flight"
+    )
     
     st.markdown("---")
     st.markdown("### 📈 Tips")
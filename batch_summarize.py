@@ -0,0 +1,252 @@
+"""Headless batch summarization for URL lists, playlists and channel backlogs.
+
+    python batch_summarize.py --urls urls.txt --output summaries.jsonl
+    python batch_summarize.py --playlist "https://www.youtube.com/playlist?list=..." -o out.jsonl
+
+Videos flow through three stages (metadata → captions → LLM), each with its
+own worker pool, so a slow Gemini call never holds up caption downloads for
+the next videos. Each result is appended to the output JSONL as soon as it
+finishes. The output file is also the checkpoint: rerunning with the same
+output skips videos that already have an ``"ok"`` record.
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+from telemetry import METRICS_PORT, configure_json_logging, log_event, start_metrics_server
+from video_metadata import extract_video_id, list_playlist_urls
+
+METADATA_WORKERS = 4
+CAPTION_WORKERS = 4
+LLM_WORKERS = 2
+QUEUE_SIZE = 32
+
+_STOP = object()
+
+
+def load_completed(output_path):
+    """Video IDs that already have a successful record in ``output_path``"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue            # Partial line from an interrupted run
+            if record.get("status") == "ok":
+                completed.add(record["video_id"])
+    return completed
+
+
+def _ends_mid_line(path):
+    with open(path, "rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        if handle.tell() == 0:
+            return False
+        handle.seek(-1, os.SEEK_END)
+        return handle.read(1) != b"\n"
+
+
+def read_url_file(path):
+    with open(path, encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip() and not line.lstrip().startswith("#")]
+
+
+class _Stage:
+    """Worker pool that takes jobs from ``inbox`` and passes them to ``outbox``.
+
+    Failed jobs go straight to ``results``. When every worker has seen the
+    stop marker, the stage forwards it downstream.
+    """
+
+    def __init__(self, name, work, workers, inbox, outbox, results, next_workers=0):
+        self.name = name
+        self.work = work
+        self.next_workers = next_workers
+        self.inbox = inbox
+        self.outbox = outbox
+        self.results = results
+        self._running = workers
+        self._lock = threading.Lock()
+        self.threads = [
+            threading.Thread(target=self._loop, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def _loop(self):
+        while True:
+            job = self.inbox.get()
+            if job is _STOP:
+                break
+            started = time.perf_counter()
+            try:
+                self.work(job)
+            except Exception as e:
+                job["status"] = "failed"
+                job["error"] = f"{self.name}: {e}"
+            job["stage_seconds"][self.name] = round(time.perf_counter() - started, 3)
+            if job.get("status") == "failed" or self.outbox is None:
+                self.results.put(job)
+            else:
+                self.outbox.put(job)
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last:
+            if self.outbox is None:
+                self.results.put(_STOP)
+            else:
+                for _ in range(self.next_workers):
+                    self.outbox.put(_STOP)
+
+
+class BatchSummarizer:
+    """Runs URLs through a ``SummaryPipeline`` with per-stage concurrency limits"""
+
+    def __init__(self, pipeline, output_path, metadata_workers=METADATA_WORKERS,
+                 caption_workers=CAPTION_WORKERS, llm_workers=LLM_WORKERS,
+                 queue_size=QUEUE_SIZE, log=None):
+        self.pipeline = pipeline
+        self.output_path = output_path
+        self.worker_counts = (metadata_workers, caption_workers, llm_workers)
+        self.queue_size = queue_size
+        self.log = log or (lambda message: print(message, file=sys.stderr))
+
+    def run(self, urls):
+        """Summarize ``urls``, appending one JSON record per video. Returns run stats."""
+        started = time.perf_counter()
+        completed = load_completed(self.output_path)
+        stats = {"ok": 0, "failed": 0, "skipped": 0}
+
+        jobs, seen = [], set()
+        invalid = []
+        for url in urls:
+            try:
+                video_id = extract_video_id(url)
+            except ValueError as e:
+                invalid.append({"video_id": None, "url": url, "status": "failed", "error": str(e)})
+                continue
+            if video_id in completed or video_id in seen:
+                stats["skipped"] += 1
+                continue
+            seen.add(video_id)
+            jobs.append({"video_id": video_id, "url": url, "stage_seconds": {}})
+
+        metadata_q = queue.Queue(self.queue_size)
+        caption_q = queue.Queue(self.queue_size)
+        llm_q = queue.Queue(self.queue_size)
+        results = queue.Queue()
+        metadata_workers, caption_workers, llm_workers = self.worker_counts
+        stages = [
+            _Stage("metadata", self._metadata, metadata_workers, metadata_q, caption_q, results, caption_workers),
+            _Stage("captions", self._captions, caption_workers, caption_q, llm_q, results, llm_workers),
+            _Stage("llm", self._summarize, llm_workers, llm_q, None, results),
+        ]
+        for stage in stages:
+            stage.start()
+
+        def feed():
+            for job in jobs:
+                metadata_q.put(job)
+            for _ in range(metadata_workers):
+                metadata_q.put(_STOP)
+        threading.Thread(target=feed, name="feeder", daemon=True).start()
+
+        with open(self.output_path, "a", encoding="utf-8") as output:
+            if _ends_mid_line(self.output_path):
+                output.write("\n")          # Start clean after a line cut off by a crash
+            for record in invalid:
+                self._write(output, record, stats)
+            while True:
+                job = results.get()
+                if job is _STOP:
+                    break
+                job.pop("transcript", None)
+                job.setdefault("status", "ok")
+                self._write(output, job, stats)
+                done = stats["ok"] + stats["failed"]
+                self.log(f"[{done}/{len(jobs) + len(invalid)}] {job['status']:<6} {job['video_id']} {job.get('title') or job.get('error', '')}")
+
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 2)
+        stats["videos_per_minute"] = round(stats["ok"] / elapsed * 60, 2) if elapsed else 0.0
+        return stats
+
+    def _write(self, output, record, stats):
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()      # Each finished video is checkpointed immediately
+        stats[record["status"]] += 1
+        log_event("request", outcome=record["status"],
+                  **{key: value for key, value in record.items() if key not in ("status", "summary")})
+
+    # --- Stages ---
+    def _metadata(self, job):
+        job["title"], _, job["duration"] = self.pipeline.get_video_info(job["url"])
+
+    def _captions(self, job):
+        transcript = self.pipeline.get_youtube_transcript(job["url"])
+        if isinstance(transcript, str):
+            raise RuntimeError(transcript)
+        job["transcript"] = transcript
+        job["transcript_chars"] = len(transcript.text)
+        job["transcript_segments"] = len(transcript)
+
+    def _summarize(self, job):
+        timing = {}
+        job["summary"] = "".join(self.pipeline.stream_summary(job["transcript"], timing))
+        job["models"] = timing.get("models", [])
+        job["summary_cached"] = timing.get("cached", False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize many YouTube videos without the UI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--urls", help="file with one YouTube URL per line")
+    source.add_argument("--playlist", help="playlist or channel URL to expand")
+    parser.add_argument("-o", "--output", default="summaries.jsonl",
+                        help="JSONL output; also the resume checkpoint (default: %(default)s)")
+    parser.add_argument("--metadata-workers", type=int, default=METADATA_WORKERS)
+    parser.add_argument("--caption-workers", type=int, default=CAPTION_WORKERS)
+    parser.add_argument("--llm-workers", type=int, default=LLM_WORKERS)
+    parser.add_argument("--json-logs", action="store_true",
+                        help="write one JSON log line per video (and warnings) to stderr")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="serve Prometheus metrics on this port while running (0 = off)")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from pipeline import SummaryPipeline
+    load_dotenv()
+
+    urls = read_url_file(args.urls) if args.urls else list_playlist_urls(args.playlist)
+    if args.json_logs:
+        configure_json_logging()
+    pipeline = SummaryPipeline()
+    if args.metrics_port:
+        start_metrics_server(pipeline.metrics, args.metrics_port)
+    if pipeline.llm_provider.get() is None:
+        print("No Gemini model is available. Check GOOGLE_API_KEY.", file=sys.stderr)
+        return 1
+
+    stats = BatchSummarizer(
+        pipeline, args.output,
+        metadata_workers=args.metadata_workers,
+        caption_workers=args.caption_workers,
+        llm_workers=args.llm_workers,
+    ).run(urls)
+    print(json.dumps(stats), file=sys.stderr)
+    return 0 if stats["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Micro-benchmark: de-duplicating VTT/SRT parsers vs. the original ones.
+
+Run from the repository root:
+
+    python benchmarks/bench_parsers.py [--minutes 180]
+
+Generates YouTube-style rolling auto-captions (VTT) and plain SRT for a
+video of the given length and reports parse time and output size.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from subtitle_parsers import parse_srt_subtitle, parse_vtt_subtitle  # noqa: E402
+
+WORDS = ("so today we are going to look at how caching works and why it "
+         "matters for latency in real systems").split()
+
+
+def legacy_parse_vtt_subtitle(content):
+    """The original parse_vtt_subtitle from app.py, kept as the baseline"""
+    lines = content.split('\n')
+    transcript_parts = []
+    in_cue = False
+    for line in lines:
+        line = line.strip()
+        if '-->' in line:
+            in_cue = True
+            continue
+        if not line or line.isdigit() or line == 'WEBVTT':
+            in_cue = False
+            continue
+        if in_cue and line and not line.startswith('NOTE'):
+            transcript_parts.append(line)
+    return " ".join(transcript_parts)
+
+
+def legacy_parse_srt_subtitle(content):
+    """The original parse_srt_subtitle from app.py, kept as the baseline"""
+    lines = content.split('\n')
+    transcript_parts = []
+    in_cue = False
+    for line in lines:
+        line = line.strip()
+        if '-->' in line:
+            in_cue = True
+            continue
+        if not line or line.isdigit():
+            in_cue = False
+            continue
+        if in_cue and line:
+            transcript_parts.append(line)
+    return " ".join(transcript_parts)
+
+
+def timestamp(ms, sep):
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{sep}{ms:03d}"
+
+
+def make_rolling_vtt(minutes):
+    """Auto-caption layout: each 2.5 s cue repeats the previous line and
+    adds a new one with word timestamps, followed by a 10 ms echo cue."""
+    out = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    previous = ""
+    for i in range(minutes * 24):
+        start = i * 2500
+        words = [WORDS[(i * 5 + j) % len(WORDS)] for j in range(5)]
+        timed = words[0] + "".join(
+            f"<{timestamp(start + 400 * j, '.')}><c> {word}</c>" for j, word in enumerate(words[1:], 1)
+        )
+        line = " ".join(words)
+        out += [f"{timestamp(start, '.')} --> {timestamp(start + 2490, '.')} align:start position:0%",
+                previous or " ", timed, ""]
+        out += [f"{timestamp(start + 2490, '.')} --> {timestamp(start + 2500, '.')} align:start position:0%",
+                line, " ", ""]
+        previous = line
+    return "\n".join(out)
+
+
+def make_srt(minutes):
+    out = []
+    for i in range(minutes * 24):
+        start = i * 2500
+        words = [WORDS[(i * 7 + j) % len(WORDS)] for j in range(7)]
+        out += [str(i + 1), f"{timestamp(start, ',')} --> {timestamp(start + 2400, ',')}",
+                " ".join(words[:4]), "<i>" + " ".join(words[4:]) + "</i>", ""]
+    return "\n".join(out)
+
+
+def bench(label, parser, content, repeat):
+    runs = timeit.repeat(lambda: parser(content), number=1, repeat=repeat)
+    best = min(runs)
+    text = str(parser(content))
+    mb = len(content.encode()) / 1e6
+    print(f"{label:<28} {best * 1000:9.1f} ms {mb / best:8.1f} MB/s {len(text):>10,} chars")
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, content, legacy, current in (
+        ("vtt (rolling auto)", make_rolling_vtt(args.minutes), legacy_parse_vtt_subtitle, parse_vtt_subtitle),
+        ("srt", make_srt(args.minutes), legacy_parse_srt_subtitle, parse_srt_subtitle),
+    ):
+        print(f"\n{name}: {len(content.encode()) / 1e6:.2f} MB, {args.minutes} min")
+        old = bench("  legacy", legacy, content, args.repeat)
+        new = bench("  de-duplicating", current, content, args.repeat)
+        print(f"  transcript size reduction: {1 - len(new) / len(old):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""Offline benchmark: caption parsing and end-to-end summaries, no network.
+
+Run from the repository root:
+
+    python benchmarks/bench_pipeline.py [--output results.json] [--quick]
+
+yt-dlp info and caption bodies come from the recorded fixtures in
+benchmarks/fixtures (scaled to longer videos by repeating the recording with
+shifted timestamps) and the LLM is ``FakeChatModel`` with a fixed latency.
+Reports parser throughput, Q&A index build and query times, end-to-end
+latency percentiles, peak memory and LLM token counts. ``--output`` writes them as JSON, tagged with the commit.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_llm import FakeChatModel  # noqa: E402
+from llm_provider import LLMProvider  # noqa: E402
+from pipeline import SummaryPipeline  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+from subtitle_parsers import STREAM_CHUNK_BYTES, parse_subtitle, parse_subtitle_stream  # noqa: E402
+from transcript_cache import TranscriptStore  # noqa: E402
+from transcript_index import TranscriptIndex  # noqa: E402
+from video_metadata import VideoInfoCache, canonical_url  # noqa: E402
+
+FORMATS = ("json3", "vtt", "srt")
+RESULTS_SCHEMA = 3
+
+_TIMESTAMP = re.compile(r"(\d{2}):(\d{2}):(\d{2})([.,])(\d{3})")
+
+
+# --- Fixtures ---
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as handle:
+        return handle.read()
+
+
+def recorded_info():
+    return json.loads(load_fixture("talk.info.json"))
+
+
+def scaled_caption(ext, minutes):
+    """The recorded caption track repeated back to back to last about ``minutes``"""
+    content = load_fixture(f"talk.en.{ext}")
+    period_ms = recorded_info()["duration"] * 1000
+    repeats = max(1, round(minutes * 60_000 / period_ms))
+    if ext == "json3":
+        data = json.loads(content)
+        events = []
+        for index in range(repeats):
+            for event in data["events"]:
+                events.append(dict(event, tStartMs=event["tStartMs"] + index * period_ms))
+        return json.dumps({**data, "events": events}, separators=(",", ":")).encode()
+
+    header, _, body = content.partition("\n\n") if ext == "vtt" else ("", "", content)
+    parts = [header] if header else []
+    for index in range(repeats):
+        parts.append(_TIMESTAMP.sub(lambda match: _shift(match, index * period_ms), body))
+    scaled = "\n\n".join(parts)
+    if ext == "srt":
+        counter = iter(range(1, 1 << 30))
+        scaled = re.sub(r"(?m)^\d+$", lambda match: str(next(counter)), scaled)
+    return scaled.encode()
+
+
+def _shift(match, offset_ms):
+    hours, minutes, seconds, sep, millis = match.groups()
+    total = ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis) + offset_ms
+    hours, total = divmod(total, 3_600_000)
+    minutes, total = divmod(total, 60_000)
+    seconds, millis = divmod(total, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{sep}{millis:03d}"
+
+
+class OfflineResponse:
+    def __init__(self, content):
+        self.status_code = 200
+        self.content = content
+        self.headers = {}
+
+    def iter_content(self, chunk_size=1):
+        view = memoryview(self.content)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+
+    def close(self):
+        pass
+
+
+class OfflineHTTPClient:
+    """Serves fixture caption bodies in place of ``CaptionHTTPClient``.
+
+    Every video gets its own transcript (one word is tagged with the video
+    ID), so summaries are not served from the cache across videos.
+    """
+
+    def __init__(self, bodies):
+        self.bodies = bodies            # ext -> bytes
+        self.requests = 0
+
+    def get(self, url, etag=None, last_modified=None, stream=False):
+        self.requests += 1
+        video_id = re.search(r"[?&]v=([\w-]+)", url).group(1)
+        body = self.bodies[re.search(r"fmt=(\w+)", url).group(1)]
+        return OfflineResponse(body.replace(b"welcome", b"welcome-" + video_id.encode()))
+
+    def stats(self):
+        return {"requests": self.requests}
+
+
+def offline_pipeline(ext, minutes, llm, store_path):
+    """A ``SummaryPipeline`` whose only caption track is the ``ext`` fixture"""
+    def extract(url):
+        info = recorded_info()
+        recorded_id, info["id"] = info["id"], url.rsplit("=", 1)[-1]
+        info["automatic_captions"] = {
+            lang: [dict(track, url=track["url"].replace(recorded_id, info["id"]))
+                   for track in tracks if track["ext"] == ext]
+            for lang, tracks in info["automatic_captions"].items()
+        }
+        return info
+
+    return SummaryPipeline(
+        llm_provider=LLMProvider(models=["fake-benchmark"], llm_factory=lambda name: llm),
+        video_cache=VideoInfoCache(extractor=extract),
+        store=TranscriptStore(path=store_path),
+        http_client=OfflineHTTPClient({ext: scaled_caption(ext, minutes)}),
+        rate_limiter=RateLimiter(limits={}),        # Measure the pipeline, not the throttle
+    )
+
+
+# --- Measurements ---
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def peak_memory(func):
+    """Peak bytes allocated while ``func()`` runs"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def streamed(content):
+    """The body as ``response.iter_content`` would hand it over"""
+    view = memoryview(content)
+    return (bytes(view[start:start + STREAM_CHUNK_BYTES]) for start in range(0, len(view), STREAM_CHUNK_BYTES))
+
+
+PARSE_MODES = {
+    "buffered": lambda ext, content: parse_subtitle(ext, content),
+    "streaming": lambda ext, content: parse_subtitle_stream(ext, streamed(content)),
+}
+
+
+def bench_parsers(sizes, repeat):
+    results = []
+    for ext in FORMATS:
+        for minutes in sizes:
+            content = scaled_caption(ext, minutes)
+            for mode, parse in PARSE_MODES.items():
+                best = min(timeit.repeat(lambda: parse(ext, content), number=1, repeat=repeat))
+                transcript = parse(ext, content)
+                results.append({
+                    "format": ext,
+                    "mode": mode,
+                    "minutes": minutes,
+                    "bytes": len(content),
+                    "seconds": round(best, 6),
+                    "mb_per_s": round(len(content) / 1e6 / best, 2),
+                    "segments": len(transcript),
+                    "text_chars": len(transcript.text),
+                    "peak_memory_bytes": peak_memory(lambda: parse(ext, content)),
+                })
+    return results
+
+
+def bench_index(sizes, repeat, queries=50):
+    """Q&A index build time and size, and query latency, per video length"""
+    results = []
+    for minutes in sizes:
+        transcript = parse_subtitle("vtt", scaled_caption("vtt", minutes))
+        build = min(timeit.repeat(lambda: TranscriptIndex.build(transcript), number=1, repeat=repeat))
+        index = TranscriptIndex.build(transcript)
+        # Questions made of words from passages spread over the video
+        step = max(1, len(index) // queries)
+        questions = [" ".join(text.split()[:8]) for _, _, text in index.chunks[::step][:queries]]
+        latencies = []
+        for question in questions:
+            started = time.perf_counter()
+            index.search(question)
+            latencies.append(time.perf_counter() - started)
+        results.append({
+            "minutes": minutes,
+            "chunks": len(index),
+            "build_s": round(build, 6),
+            "stored_bytes": len(index.to_json()),
+            "query_s": {f"p{pct}": round(percentile(latencies, pct), 6) for pct in (50, 90, 99)},
+        })
+    return results
+
+
+def summarize_once(pipeline, url):
+    """Run one video through the pipeline; returns ``(total_s, first_token_s)``"""
+    started = time.perf_counter()
+    first_token = None
+    pipeline.get_video_info(url)
+    transcript = pipeline.get_youtube_transcript(url)
+    if isinstance(transcript, str):
+        raise RuntimeError(transcript)
+    for _ in pipeline.stream_summary(transcript, {}):
+        if first_token is None:
+            first_token = time.perf_counter() - started
+    return time.perf_counter() - started, first_token
+
+
+def bench_end_to_end(minutes, runs, llm_latency, token_latency):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in FORMATS:
+            llm = FakeChatModel(latency=llm_latency, token_latency=token_latency)
+            pipeline = offline_pipeline(ext, minutes, llm, os.path.join(tmp, f"{ext}.sqlite3"))
+            summarize_once(pipeline, canonical_url(f"bench{ext[:3]}wup"))     # Warm-up, not counted
+            llm.reset_counts()
+
+            urls = [canonical_url(f"bench{ext[:3]}{index:03d}") for index in range(runs)]
+            cold = [summarize_once(pipeline, url) for url in urls]
+            tokens = llm.token_counts()
+            warm = [summarize_once(pipeline, url) for url in urls]       # Cache hits
+            memory = peak_memory(lambda: summarize_once(pipeline, canonical_url(f"bench{ext[:3]}mem")))
+            pipeline.store.close()
+
+            totals = [total for total, _ in cold]
+            first_tokens = [first for _, first in cold]
+            results.append({
+                "format": ext,
+                "minutes": minutes,
+                "runs": runs,
+                "latency_s": {f"p{pct}": round(percentile(totals, pct), 4) for pct in (50, 90, 99)},
+                "first_token_s": {f"p{pct}": round(percentile(first_tokens, pct), 4) for pct in (50, 90, 99)},
+                "cached_latency_s": {"p50": round(percentile([total for total, _ in warm], 50), 4)},
+                "peak_memory_bytes": memory,
+                "llm_calls_per_video": tokens["calls"] / runs,
+                "prompt_tokens_per_video": tokens["prompt_tokens"] / runs,
+                "completion_tokens_per_video": tokens["completion_tokens"] / runs,
+            })
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results):
+    print(f"commit {results['commit']}  python {results['python']}")
+    print("\nparsers")
+    for row in results["parsers"]:
+        print(f"  {row['format']:<6} {row['mode']:<9} {row['minutes']:>4} min {row['bytes'] / 1e6:7.2f} MB "
+              f"{row['mb_per_s']:8.1f} MB/s  peak {row['peak_memory_bytes'] / 1e6:6.1f} MB")
+    print("\nq&a index")
+    for row in results["index"]:
+        query = row["query_s"]
+        print(f"  {row['minutes']:>4} min {row['chunks']:>5} chunks  build {row['build_s'] * 1000:7.1f} ms  "
+              f"{row['stored_bytes'] / 1e3:7.1f} KB  query p50 {query['p50'] * 1000:6.2f} ms  "
+              f"p99 {query['p99'] * 1000:6.2f} ms")
+    print("\nend to end")
+    for row in results["end_to_end"]:
+        latency, first = row["latency_s"], row["first_token_s"]
+        print(f"  {row['format']:<6} p50 {latency['p50'] * 1000:7.1f} ms  p90 {latency['p90'] * 1000:7.1f} ms  "
+              f"p99 {latency['p99'] * 1000:7.1f} ms  first token p50 {first['p50'] * 1000:7.1f} ms  "
+              f"cached p50 {row['cached_latency_s']['p50'] * 1000:6.1f} ms  "
+              f"{row['llm_calls_per_video']:.1f} calls / {row['prompt_tokens_per_video']:,.0f} prompt tokens per video")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="3,30,180", help="parser benchmark video lengths in minutes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--e2e-minutes", type=int, default=30, help="video length for the end-to-end runs")
+    parser.add_argument("--runs", type=int, default=20, help="videos per format for the end-to-end runs")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="fake model seconds to first token")
+    parser.add_argument("--token-latency", type=float, default=0.0005, help="fake model seconds per token")
+    parser.add_argument("--quick", action="store_true", help="small sizes and few runs, for CI")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.sizes, args.repeat, args.e2e_minutes, args.runs = "3,30", 2, 3, 3
+        args.llm_latency = args.token_latency = 0.0
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {
+        "schema": RESULTS_SCHEMA,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "parsers": bench_parsers(sizes, args.repeat),
+        "index": bench_index(sizes, args.repeat),
+        "end_to_end": bench_end_to_end(args.e2e_minutes, args.runs, args.llm_latency, args.token_latency),
+    }
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
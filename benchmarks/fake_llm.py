@@ -0,0 +1,81 @@
+"""Deterministic stand-in for the Gemini chat model, for offline benchmarks.
+
+The reply is built from the prompt's own words, so the same prompt always
+gets the same summary. ``latency`` is the time to the first token and
+``token_latency`` the time per streamed token, to model a real endpoint.
+``error_rate`` is the share of calls that fail with ``FakeModelError``
+(drawn from a generator seeded with ``seed``, so runs are repeatable).
+Token counts use the same 4-characters-per-token estimate as the summarizer.
+"""
+import random
+import threading
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from summarizer import estimate_tokens
+
+
+class FakeModelError(RuntimeError):
+    """An injected model failure"""
+
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.0
+    token_latency: float = 0.0
+    summary_words: int = 120
+    words_per_chunk: int = 4
+    error_rate: float = 0.0
+    seed: int = 0
+
+    _lock = PrivateAttr(default_factory=threading.Lock)
+    _counters = PrivateAttr(default_factory=lambda: {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0})
+    _random = PrivateAttr(default=None)
+
+    def model_post_init(self, context):
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self):
+        return "fake-benchmark"
+
+    def token_counts(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def reset_counts(self):
+        with self._lock:
+            for key in self._counters:
+                self._counters[key] = 0
+
+    def _reply_words(self, messages):
+        prompt = "\n".join(str(message.content) for message in messages)
+        # Words sampled across the whole prompt, so longer inputs give varied replies
+        words = prompt.split()
+        count = min(self.summary_words, len(words))
+        reply = [words[(index * 7) % len(words)] for index in range(count)] if words else []
+        with self._lock:
+            self._counters["calls"] += 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self._counters["errors"] += 1
+                raise FakeModelError("Injected model error")
+            self._counters["prompt_tokens"] += estimate_tokens(prompt)
+            self._counters["completion_tokens"] += estimate_tokens(" ".join(reply))
+        return reply
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        reply = self._reply_words(messages)
+        time.sleep(self.latency + self.token_latency * len(reply))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=" ".join(reply)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        reply = self._reply_words(messages)
+        time.sleep(self.latency)
+        for start in range(0, len(reply), self.words_per_chunk):
+            words = reply[start:start + self.words_per_chunk]
+            time.sleep(self.token_latency * len(words))
+            text = (" " if start else "") + " ".join(words)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text))
@@ -0,0 +1,324 @@
+"""Load test: many concurrent sessions against local stand-ins for YouTube and Gemini.
+
+Run from the repository root:
+
+    python benchmarks/load_test.py --sessions 1,4,16,64 [--output load.json] [--quick]
+
+Each concurrency level gets a fresh ``SummaryPipeline`` (empty caches and
+store) wired to three stand-ins:
+
+- a local HTTP server serving the recorded caption track, reached through
+  the real ``CaptionHTTPClient`` (real sockets, pooling and retries)
+- a stubbed yt-dlp extractor returning the recorded video info
+- ``FakeChatModel`` standing in for the Gemini models
+
+Each stand-in has a configurable latency and error rate. Every simulated
+session then runs what the app does for each of its videos:
+``get_video_info`` → ``get_youtube_transcript`` → ``stream_summary``. The
+report gives throughput, latency percentiles per stage, error rates by reason
+and peak traced memory per session for each level, so a deployment can be
+sized and scaling regressions caught. ``--output`` writes the same as JSON,
+tagged with the commit.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_pipeline import git_commit, percentile, recorded_info, scaled_caption  # noqa: E402
+from fake_llm import FakeChatModel  # noqa: E402
+from http_client import CaptionHTTPClient  # noqa: E402
+from llm_provider import LLMProvider  # noqa: E402
+from pipeline import LLM_CONCURRENCY, YOUTUBE_CONCURRENCY, SummaryPipeline  # noqa: E402
+from rate_limiter import RATE_LIMITS, RateLimiter  # noqa: E402
+from transcript_cache import TranscriptStore  # noqa: E402
+from video_metadata import VideoInfoCache, canonical_url  # noqa: E402
+
+RESULTS_SCHEMA = 1
+STAGES = ("metadata", "transcript", "first_token", "summary", "total")
+# Two routable models, so an injected model failure can fail over like it would in production
+FAKE_MODELS = ["gemini-2.5-flash", "gemini-2.0-flash"]
+
+
+class StubError(RuntimeError):
+    """An injected yt-dlp failure"""
+
+
+class NoTranscript(RuntimeError):
+    """``get_youtube_transcript`` returned an error message"""
+
+
+class _Faults:
+    """Latency plus a seeded chance of failure, shared by a stand-in's threads"""
+
+    def __init__(self, latency, error_rate, seed):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait_and_fail(self):
+        """Sleep for the latency; True if this call should fail"""
+        time.sleep(self.latency)
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+
+class CaptionServer:
+    """Serves the recorded ``ext`` caption track on 127.0.0.1 from a daemon thread.
+
+    ``/api/timedtext?v=<id>&fmt=<ext>`` returns the body with one word tagged
+    with the video ID, so every video has its own transcript. An injected
+    failure answers 503, which the caption client retries.
+    """
+
+    def __init__(self, ext, minutes, faults):
+        self.ext = ext
+        self.body = scaled_caption(ext, minutes)
+        self.faults = faults
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class CaptionHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"           # Keep-alive, like the real caption host
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                failed = server.faults.wait_and_fail()
+                with server._lock:
+                    server.requests += 1
+                    server.failures += failed
+                if failed:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                video_id = query.get("v", [""])[0].encode()
+                body = server.body.replace(b"welcome", b"welcome-" + video_id)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), CaptionHandler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api/timedtext"
+        threading.Thread(target=self.httpd.serve_forever, name="caption-server", daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def stub_extractor(caption_server, faults):
+    """Stands in for ``extract_with_yt_dlp``: the recorded info, with one caption track on the local server"""
+    def extract(url):
+        if faults.wait_and_fail():
+            raise StubError("Injected yt-dlp error")
+        info = recorded_info()
+        info["id"] = url.rsplit("=", 1)[-1]
+        info["subtitles"] = {}
+        info["automatic_captions"] = {
+            "en": [{"ext": caption_server.ext, "url": f"{caption_server.url}?v={info['id']}&fmt={caption_server.ext}"}]
+        }
+        return info
+
+    return extract
+
+
+def simulate_session(pipeline, urls, results):
+    """One user summarizing ``urls`` one after another; appends a record per video to ``results``.
+
+    A failed video's ``outcome`` is ``"<stage>: <exception type>"``.
+    """
+    for url in urls:
+        record = {"outcome": "ok", "stages": {}}
+        started = time.perf_counter()
+        stage = "metadata"
+        try:
+            pipeline.get_video_info(url)
+            record["stages"]["metadata"] = time.perf_counter() - started
+
+            stage, mark = "transcript", time.perf_counter()
+            transcript = pipeline.get_youtube_transcript(url)
+            record["stages"]["transcript"] = time.perf_counter() - mark
+            if isinstance(transcript, str):
+                raise NoTranscript(transcript)
+
+            stage, mark = "summary", time.perf_counter()
+            for _ in pipeline.stream_summary(transcript, {}):
+                if "first_token" not in record["stages"]:
+                    record["stages"]["first_token"] = time.perf_counter() - mark
+            record["stages"]["summary"] = time.perf_counter() - mark
+        except Exception as e:
+            record["outcome"] = f"{stage}: {type(e).__name__}"
+        record["stages"]["total"] = time.perf_counter() - started
+        results.append(record)
+
+
+def run_level(sessions, args, level_seed):
+    """Run ``sessions`` concurrent sessions against fresh stand-ins; returns the level's report row"""
+    llm = FakeChatModel(latency=args.llm_latency, token_latency=args.token_latency, seed=level_seed)
+    ytdlp_faults = _Faults(args.ytdlp_latency, 0.0, level_seed)
+    caption_faults = _Faults(args.caption_latency, 0.0, level_seed)
+    server = CaptionServer(args.format, args.minutes, caption_faults)
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline = SummaryPipeline(
+            llm_provider=LLMProvider(models=FAKE_MODELS, llm_factory=lambda name: llm),
+            video_cache=VideoInfoCache(extractor=stub_extractor(server, ytdlp_faults)),
+            store=TranscriptStore(path=os.path.join(tmp, "load.sqlite3")),
+            http_client=CaptionHTTPClient(backoff_base=args.retry_backoff),
+            rate_limiter=RateLimiter(limits=RATE_LIMITS if args.rate_limits else {}),
+            youtube_concurrency=args.youtube_concurrency,
+            llm_concurrency=args.llm_concurrency,
+        )
+        # Probe the models and load the lazily imported libraries before measuring anything
+        simulate_session(pipeline, [canonical_url("warmupvideo")], [])
+        llm.error_rate = args.llm_error_rate
+        ytdlp_faults.error_rate = args.ytdlp_error_rate
+        caption_faults.error_rate = args.caption_error_rate
+        llm.reset_counts()
+        server.requests = 0
+
+        # Distinct videos per session, plus a share of requests for one popular video
+        chooser = random.Random(level_seed)
+        urls = [
+            [canonical_url("popularvid0") if chooser.random() < args.popular_share
+             else canonical_url(f"{sessions:03d}s{session:04d}v{video:02d}")
+             for video in range(args.videos_per_session)]
+            for session in range(sessions)
+        ]
+        results = []
+        threads = [
+            threading.Thread(target=simulate_session, args=(pipeline, session_urls, results), name=f"session-{index}")
+            for index, session_urls in enumerate(urls)
+        ]
+        if args.memory:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] - baseline if args.memory else 0
+        if args.memory:
+            tracemalloc.stop()
+        tokens = llm.token_counts()
+        coalesced = pipeline.flights.stats()["coalesced"]
+        pipeline.store.close()
+    server.close()
+
+    errors = {}
+    for record in results:
+        if record["outcome"] != "ok":
+            errors[record["outcome"]] = errors.get(record["outcome"], 0) + 1
+    ok = [record for record in results if record["outcome"] == "ok"]
+    return {
+        "sessions": sessions,
+        "requests": len(results),
+        "seconds": round(elapsed, 4),
+        "videos_per_minute": round(len(ok) / elapsed * 60, 2) if elapsed else 0.0,
+        "error_rate": round(sum(errors.values()) / len(results), 4) if results else 0.0,
+        "errors": errors,
+        "latency_s": {
+            stage: {f"p{pct}": round(percentile([r["stages"][stage] for r in ok], pct), 4) for pct in (50, 90, 99)}
+            for stage in STAGES
+        },
+        "peak_memory_per_session_bytes": peak // sessions if args.memory else None,
+        "llm_calls": tokens["calls"],
+        "llm_errors": tokens["errors"],
+        "caption_requests": server.requests,
+        "caption_failures": server.failures,
+        "coalesced_requests": coalesced,
+    }
+
+
+def print_report(results):
+    print(f"commit {results['commit']}  python {results['python']}")
+    print(f"\n{'sessions':>8} {'videos/min':>10} {'errors':>7} {'total p50':>10} {'p99':>8} "
+          f"{'metadata':>9} {'transcript':>10} {'1st token':>10} {'summary':>8} {'mem/session':>12}")
+    for row in results["levels"]:
+        latency = row["latency_s"]
+        memory = row["peak_memory_per_session_bytes"]
+        print(f"{row['sessions']:>8} {row['videos_per_minute']:>10.1f} {row['error_rate']:>7.1%} "
+              f"{latency['total']['p50'] * 1000:>8.0f}ms {latency['total']['p99'] * 1000:>6.0f}ms "
+              f"{latency['metadata']['p50'] * 1000:>7.0f}ms {latency['transcript']['p50'] * 1000:>8.0f}ms "
+              f"{latency['first_token']['p50'] * 1000:>8.0f}ms {latency['summary']['p50'] * 1000:>6.0f}ms "
+              + (f"{memory / 1e6:>9.1f} MB" if memory is not None else f"{'–':>12}"))
+        if row["errors"]:
+            print(f"{'':>8} errors: " + ", ".join(f"{reason} {count}" for reason, count in sorted(row["errors"].items())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", help="concurrency levels to run, in sessions (default 1,4,16,64)")
+    parser.add_argument("--videos-per-session", type=int, default=3)
+    parser.add_argument("--popular-share", type=float, default=0.0,
+                        help="share of requests for one shared popular video (exercises coalescing and caches)")
+    parser.add_argument("--format", default="vtt", choices=("json3", "vtt", "srt"), help="caption format served")
+    parser.add_argument("--minutes", type=int, default=30, help="video length")
+    parser.add_argument("--ytdlp-latency", type=float, default=0.5, help="stub yt-dlp seconds per extraction")
+    parser.add_argument("--ytdlp-error-rate", type=float, default=0.0)
+    parser.add_argument("--caption-latency", type=float, default=0.1, help="caption server seconds per response")
+    parser.add_argument("--caption-error-rate", type=float, default=0.0, help="share of caption responses that are 503s")
+    parser.add_argument("--retry-backoff", type=float, default=0.5, help="caption client backoff base, in seconds")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="fake model seconds to first token")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="fake model seconds per token")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--youtube-concurrency", type=int, default=YOUTUBE_CONCURRENCY)
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_CONCURRENCY)
+    parser.add_argument("--rate-limits", action="store_true", help="apply the configured upstream rate limits")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip tracing memory (tracing slows the run down)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="small levels and no latency, for CI")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.sessions, args.videos_per_session, args.minutes = args.sessions or "1,4", 2, 3
+        args.ytdlp_latency = args.caption_latency = args.llm_latency = args.token_latency = 0.0
+        args.retry_backoff = 0.01
+
+    args.sessions = args.sessions or "1,4,16,64"
+
+    results = {
+        "schema": RESULTS_SCHEMA,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "levels": [
+            run_level(int(sessions), args, args.seed + index)
+            for index, sessions in enumerate(args.sessions.split(","))
+        ],
+    }
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+CAPTION_WORKERS = int(os.getenv("TUBETALK_CAPTION_WORKERS", "4"))
+
+
+def fetch_first_success(candidates, fetch, max_workers=CAPTION_WORKERS):
+    """Fetch ``candidates`` concurrently and return the best one that works.
+
+    ``candidates`` are in priority order and ``fetch(candidate)`` returns a
+    result or something falsy. The winner is the highest-priority candidate
+    with a truthy result, so a fast low-priority track never beats a slower
+    higher-priority one. Once the winner is known, candidates that have not
+    started are cancelled and we stop waiting for those still in flight.
+
+    Returns ``(candidate, result)``, or ``(None, None)`` if every fetch failed.
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return None, None
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(candidates))))
+    try:
+        futures = [pool.submit(fetch, candidate) for candidate in candidates]
+        for candidate, future in zip(candidates, futures):
+            try:
+                result = future.result()
+            except Exception:
+                continue
+            if result:
+                return candidate, result
+        return None, None
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
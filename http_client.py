@@ -0,0 +1,145 @@
+import os
+import random
+import threading
+import time
+
+POOL_SIZE = int(os.getenv("TUBETALK_HTTP_POOL_SIZE", "16"))
+MAX_RETRIES = int(os.getenv("TUBETALK_HTTP_RETRIES", "3"))
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 8.0
+REQUEST_TIMEOUT = 10
+# A retried response's body up to this size is read to the end, so its
+# keep-alive connection goes back to the pool instead of being dropped
+MAX_DRAIN_BYTES = 64 * 1024
+
+
+class CaptionHTTPClient:
+    """Shared HTTP client for caption downloads.
+
+    One pooled ``requests.Session`` (keep-alive, gzip/br when available),
+    bounded retries with full-jitter exponential backoff on 429/5xx and
+    connection errors, and conditional GETs from stored ETag /
+    Last-Modified validators.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE_SECONDS, backoff_cap=BACKOFF_CAP_SECONDS,
+                 timeout=REQUEST_TIMEOUT, sleep=time.sleep, jitter=random.random):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.request import ACCEPT_ENCODING
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.sleep = sleep
+        self.jitter = jitter
+        self._transient_errors = (requests.ConnectionError, requests.Timeout)
+        self._request_errors = requests.RequestException
+
+        self.session = requests.Session()
+        # urllib3 advertises br/zstd only when it can decode them
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "retries": 0, "failures": 0, "not_modified": 0}
+
+    def get(self, url, etag=None, last_modified=None, stream=False):
+        """GET ``url`` with retries; sends conditional headers when validators are given.
+
+        With ``stream`` the body is left unread for ``iter_content``; the
+        caller must close the response.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        for attempt in range(self.max_retries + 1):
+            self._count("requests")
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+            except self._transient_errors:
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    if response.status_code == 304:
+                        self._count("not_modified")
+                    elif response.status_code >= 400:
+                        self._count("failures")
+                    return response
+                delay = self._retry_after(response)
+                self._release(response)
+                if delay is not None:
+                    self._count("retries")
+                    self.sleep(delay)
+                    continue
+            self._count("retries")
+            self.sleep(self.backoff_delay(attempt))
+
+    def backoff_delay(self, attempt):
+        """Full jitter: uniform in [0, min(cap, base * 2**attempt)]"""
+        return self.jitter() * min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+
+    def _release(self, response):
+        """Close a response that will be retried, reusing its connection when the body is short"""
+        try:
+            drained = 0
+            for chunk in response.iter_content(MAX_DRAIN_BYTES):
+                drained += len(chunk)
+                if drained > MAX_DRAIN_BYTES:
+                    break               # Long body: cheaper to drop the connection
+        except self._request_errors:
+            pass
+        finally:
+            response.close()
+
+    def _retry_after(self, response):
+        value = response.headers.get("Retry-After", "")
+        if value.isdigit():
+            return min(self.backoff_cap, float(value))
+        return None
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        """Retry counters plus connection-pool usage from urllib3"""
+        with self._lock:
+            stats = dict(self._counters)
+        pools = self.adapter.poolmanager.pools
+        pool_list = [pools[key] for key in pools.keys()]
+        stats["pools"] = len(pool_list)
+        stats["connections_opened"] = sum(pool.num_connections for pool in pool_list)
+        stats["pooled_requests"] = sum(pool.num_requests for pool in pool_list)
+        return stats
+
+
+def response_validators(response):
+    """ETag / Last-Modified from a response, for the next conditional request"""
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process-wide client so every session shares one connection pool"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CaptionHTTPClient()
+        return _client
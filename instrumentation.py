@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Stages of one summary request, in the order they normally run
+STAGES = ("metadata", "caption_download", "parse", "llm", "render")
+
+
+class RequestTimings:
+    """Wall-clock timing spans for one summary request.
+
+    Spans with the same name add up (e.g. several caption downloads).
+    Spans may overlap (caption tracks download in parallel), so ``total``
+    is the wall-clock time from creation to the end of the last span, not
+    the sum of ``durations``.
+    ``on_progress`` is called with the fraction of ``stages`` finished each
+    time a stage's span closes, so progress bars track real work.
+    """
+
+    def __init__(self, video_id=None, stages=STAGES, on_progress=None, clock=time.perf_counter):
+        self.video_id = video_id
+        self.stages = tuple(stages)
+        self.on_progress = on_progress
+        self.clock = clock
+        self.started_at = time.time()
+        self._start = clock()
+        self._end = None                # When the latest span ended
+        self.durations = {}
+        self.counts = {}
+        self.completed = set()
+        self.info = {}                  # Non-timing facts, e.g. caption format
+        self._lock = threading.Lock()   # Spans may close on worker threads
+
+    @contextmanager
+    def span(self, name):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            end = self.clock()
+            self.record(name, end - start, end)
+
+    def record(self, name, seconds, end=None):
+        """Add a span of ``seconds`` that ended at ``end`` (by default, now)"""
+        end = self.clock() if end is None else end
+        with self._lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self._end = end if self._end is None else max(self._end, end)
+
+    def complete(self, name):
+        """Mark a stage finished (also used for stages that were skipped)"""
+        with self._lock:
+            self.completed.add(name)
+            done = sum(1 for stage in self.stages if stage in self.completed)
+        if self.on_progress:
+            self.on_progress(done / len(self.stages))
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage and mark it complete when it ends"""
+        with self.span(name):
+            yield
+        self.complete(name)
+
+    @property
+    def total(self):
+        return 0.0 if self._end is None else self._end - self._start
+
+    def to_dict(self):
+        return {
+            "video_id": self.video_id,
+            "started_at": self.started_at,
+            "total_seconds": round(self.total, 4),
+            "info": self.info,
+            "stages": {
+                name: {"seconds": round(seconds, 4), "count": self.counts[name]}
+                for name, seconds in self.durations.items()
+            },
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+
+@contextmanager
+def maybe_span(timings, name):
+    """``timings.span(name)`` when timings are being collected, else a no-op"""
+    if timings is None:
+        yield
+    else:
+        with timings.span(name):
+            yield
+
+
+def maybe_complete(timings, *names):
+    """``timings.complete(name)`` for each name when timings are being collected"""
+    if timings is not None:
+        for name in names:
+            timings.complete(name)
@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Summaries run at once, summaries allowed to wait for a worker, and how
+# long one may run before it is reported as failed
+JOB_WORKERS = int(os.getenv("TUBETALK_JOB_WORKERS", "4"))
+JOB_QUEUE_DEPTH = int(os.getenv("TUBETALK_JOB_QUEUE_DEPTH", "32"))
+JOB_TIMEOUT_SECONDS = float(os.getenv("TUBETALK_JOB_TIMEOUT_SECONDS", "600"))
+# Finished jobs kept so a page that was refreshed or rerun can still pick up the result
+JOB_KEEP_FINISHED = 32
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFull(RuntimeError):
+    """Every worker is busy and the queue is at its depth limit"""
+
+    def __init__(self, depth):
+        self.depth = depth
+        super().__init__(f"TubeTalk is busy with {depth} videos waiting, try again in a minute")
+
+
+class JobTimeout(TimeoutError):
+    """A job ran longer than its queue's timeout"""
+
+
+class Job:
+    """One queued call, its status and the progress events it has reported so far.
+
+    ``emit(event, *args)`` is the ``on_event`` callback handed to the work;
+    readers on other threads poll ``status``, ``events`` and ``progress``.
+    Once the job is past its deadline ``emit`` raises ``JobTimeout``, so
+    work that reports progress stops at its next event.
+    """
+
+    __slots__ = ('key', 'args', 'status', 'events', 'progress', 'result', 'error',
+                 'created_at', 'started_at', 'finished_at', 'deadline', '_lock')
+
+    def __init__(self, key, args):
+        self.key = key
+        self.args = args
+        self.status = QUEUED
+        self.events = []                # (event, args), oldest first
+        self.progress = 0.0             # Fraction reported by the "progress" event
+        self.result = None
+        self.error = None
+        self.created_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.deadline = None
+        self._lock = threading.Lock()
+
+    def emit(self, event, *args):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise JobTimeout(f"Gave up after {self.deadline - self.started_at:.0f}s")
+        with self._lock:
+            if event == "progress":
+                self.progress = args[0]
+            else:
+                self.events.append((event, args))
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def waited(self):
+        """Seconds spent queued before a worker picked the job up"""
+        return (self.started_at or time.monotonic()) - self.created_at
+
+    def _finish(self, status, result=None, error=None):
+        """Set the outcome once; False if the job had already finished (e.g. timed out)"""
+        with self._lock:
+            if self.finished:
+                return False
+            self.status, self.result, self.error = status, result, error
+            self.finished_at = time.monotonic()
+            return True
+
+
+class JobQueue:
+    """Worker pool that runs ``run(job, *args)`` off the caller's thread, one job per key.
+
+    Streamlit stops a script run on every interaction, taking any work it
+    was doing with it. Jobs submitted here keep going on daemon threads;
+    a rerun, another tab or a refreshed page finds them again by key
+    (e.g. the video ID) and polls for progress and the result. Submitting
+    a key that is already queued or running returns that job. At most
+    ``max_queued`` jobs wait for a worker; past that ``submit`` raises
+    ``QueueFull``. A job still running after ``timeout`` seconds is marked
+    failed with ``JobTimeout``; its worker is freed when the work next
+    reports progress or returns.
+    """
+
+    def __init__(self, run, workers=JOB_WORKERS, max_queued=JOB_QUEUE_DEPTH, timeout=JOB_TIMEOUT_SECONDS,
+                 keep_finished=JOB_KEEP_FINISHED, metrics=None):
+        self.run = run
+        self.workers = workers
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.keep_finished = keep_finished
+        self.metrics = metrics
+        self._jobs = OrderedDict()      # key -> latest Job; finished ones in the order they finished
+        self._waiting = deque()
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        if metrics is not None:
+            metrics.add_collector(self._collect_metrics)
+
+    def submit(self, key, *args):
+        """Queue ``run(job, *args)`` under ``key`` and return its ``Job``"""
+        with self._cond:
+            job = self._get(key)
+            if job is not None and not job.finished:
+                return job
+            if len(self._waiting) >= self.max_queued:
+                self._count("rejected")
+                raise QueueFull(len(self._waiting))
+            job = Job(key, args)
+            self._jobs.pop(key, None)
+            self._jobs[key] = job
+            self._waiting.append(job)
+            self._cond.notify()
+            return job
+
+    def get(self, key):
+        """The latest job for ``key`` (running, queued or recently finished), or None"""
+        with self._cond:
+            return self._get(key)
+
+    def position(self, job):
+        """Jobs ahead of ``job`` in the queue (0 once it is running)"""
+        with self._cond:
+            for ahead, waiting in enumerate(self._waiting):
+                if waiting is job:
+                    return ahead
+            return 0
+
+    def stats(self):
+        with self._cond:
+            jobs = [self._get(key) for key in list(self._jobs)]
+            return {
+                "workers": self.workers,
+                "queued": len(self._waiting),
+                "running": sum(1 for job in jobs if job is not None and job.status == RUNNING),
+                "finished": sum(1 for job in jobs if job is not None and job.finished),
+            }
+
+    def _get(self, key):
+        job = self._jobs.get(key)
+        if job is not None and job.status == RUNNING and time.monotonic() > job.deadline:
+            if job._finish(FAILED, error=JobTimeout(f"Gave up after {self.timeout:.0f}s")):
+                self._finished(job)
+        return job
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._waiting)
+                job = self._waiting.popleft()
+                job.status = RUNNING
+                job.started_at = time.monotonic()
+                job.deadline = job.started_at + self.timeout
+            if self.metrics is not None:
+                self.metrics.observe("tubetalk_job_queue_seconds", job.waited)
+            try:
+                result = self.run(job, *job.args)
+            except Exception as e:
+                finished = job._finish(FAILED, error=e)
+            else:
+                finished = job._finish(DONE, result=result)
+            if finished:
+                with self._cond:
+                    self._finished(job)
+
+    def _finished(self, job):
+        """Count ``job``'s outcome and drop the oldest finished jobs over ``keep_finished``"""
+        self._count("ok" if job.status == DONE else type(job.error).__name__)
+        if self._jobs.get(job.key) is job:
+            self._jobs.move_to_end(job.key)
+        finished = [key for key, kept in self._jobs.items() if kept.finished]
+        for key in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[key]
+
+    def _count(self, outcome):
+        if self.metrics is not None:
+            self.metrics.inc("tubetalk_jobs_total", outcome=outcome)
+
+    def _collect_metrics(self):
+        stats = self.stats()
+        yield "tubetalk_jobs", {"status": QUEUED}, stats["queued"]
+        yield "tubetalk_jobs", {"status": RUNNING}, stats["running"]
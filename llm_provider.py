@@ -0,0 +1,98 @@
+import logging
+import os
+import threading
+import time
+
+from telemetry import log_event
+
+# Try available models in order of preference
+MODELS_TO_TRY = [
+    "gemini-2.5-flash",          # Fast and free - should work
+    "gemini-2.0-flash",          # Good alternative
+    "gemini-2.5-pro",            # Pro version
+    "gemini-flash-latest",       # Latest flash
+    "gemini-pro-latest",         # Latest pro
+]
+
+MODEL_TTL_SECONDS = 30 * 60     # Re-check the chosen model every 30 minutes
+FAILURE_TTL_SECONDS = 60        # Back off after all models failed
+
+
+def create_gemini_llm(model_name):
+    """Build a Gemini chat model (imported lazily, it is slow to import)"""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=0.3,
+        google_api_key=os.getenv("GOOGLE_API_KEY")
+    )
+
+
+class LLMProvider:
+    """Process-wide LLM handle.
+
+    Probes ``models`` in order once, remembers the first one that answers and
+    hands the same object to every caller until the TTL expires or a caller
+    reports a failure through ``invalidate()``.
+    """
+
+    def __init__(self, models=None, llm_factory=create_gemini_llm,
+                 ttl=MODEL_TTL_SECONDS, failure_ttl=FAILURE_TTL_SECONDS,
+                 clock=time.monotonic):
+        self.models = list(models or MODELS_TO_TRY)
+        self.llm_factory = llm_factory
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.clock = clock
+        self.probe_count = 0          # Number of probe rounds run
+        self.probe_calls = 0          # Number of test prompts sent
+        self.probe_failures = 0       # Test prompts that raised
+        self.model_name = None
+        self._llm = None
+        self._expires_at = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the cached LLM, probing only when nothing valid is cached"""
+        with self._lock:
+            if self._expires_at is None or self.clock() >= self._expires_at:
+                self._probe()
+            return self._llm
+
+    def invalidate(self):
+        """Forget the current model so the next get() probes again"""
+        with self._lock:
+            self._llm = None
+            self.model_name = None
+            self._expires_at = None
+
+    def stats(self):
+        return {
+            "model": self.model_name,
+            "probe_count": self.probe_count,
+            "probe_calls": self.probe_calls,
+            "probe_failures": self.probe_failures,
+        }
+
+    def _probe(self):
+        self.probe_count += 1
+        for model_name in self.models:
+            try:
+                llm = self.llm_factory(model_name)
+                # Test the model with a simple prompt
+                self.probe_calls += 1
+                llm.invoke("Say 'Hello' in one word.")
+            except Exception as e:
+                # Expected while a model is retired or over quota, but worth seeing
+                self.probe_failures += 1
+                log_event("model_probe_failed", level=logging.WARNING, model=model_name,
+                          reason=type(e).__name__, error=str(e))
+                continue
+            self._llm = llm
+            self.model_name = model_name
+            self._expires_at = self.clock() + self.ttl
+            return
+
+        self._llm = None
+        self.model_name = None
+        self._expires_at = self.clock() + self.failure_ttl
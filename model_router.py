@@ -0,0 +1,259 @@
+import os
+import threading
+import time
+from collections import deque
+
+from llm_provider import MODELS_TO_TRY, create_gemini_llm
+from rate_limiter import RateLimitExceeded
+from summarizer import CHARS_PER_TOKEN, estimate_tokens
+
+# Flash models are fast and cheap for ordinary videos; pro models handle
+# long inputs better. Models missing here are treated as flash.
+MODEL_TIERS = {
+    "gemini-2.5-flash": "flash",
+    "gemini-2.0-flash": "flash",
+    "gemini-flash-latest": "flash",
+    "gemini-2.5-pro": "pro",
+    "gemini-pro-latest": "pro",
+}
+# Transcripts at least this long prefer the pro models
+LONG_TRANSCRIPT_TOKENS = int(os.getenv("TUBETALK_LONG_TRANSCRIPT_TOKENS", "30000"))
+
+LATENCY_WINDOW = 50             # Calls kept per model for latency percentiles
+ERROR_WINDOW = 20               # Calls kept per model for the error rate
+MAX_ERROR_RATE = 0.5            # Above this (with MIN_ERROR_SAMPLES calls) a model rests
+MIN_ERROR_SAMPLES = 4
+ERROR_COOLDOWN_SECONDS = 30
+RATE_LIMIT_COOLDOWN_SECONDS = 60
+UNKNOWN_LATENCY_SECONDS = 5.0   # Assumed for models with no calls yet
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 40)
+MAX_DECISIONS = 50
+
+
+def is_rate_limited(error):
+    """True for quota / 429 errors from the Gemini client (or anything that looks like one)"""
+    for attr in ("status_code", "code"):
+        if getattr(error, attr, None) == 429:
+            return True
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests"):
+        return True
+    message = str(error).lower()
+    return "429" in message or "quota" in message or "rate limit" in message
+
+
+class _ModelStats:
+    __slots__ = ('calls', 'errors', 'rate_limited', 'latencies', 'outcomes', 'histogram', 'cooldown_until')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.outcomes = deque(maxlen=ERROR_WINDOW)    # True for a failed call
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.cooldown_until = 0.0
+
+    @property
+    def error_rate(self):
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def percentile(self, pct):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _prompt_text(value):
+    """Text of a prompt value, message chunk or string"""
+    if isinstance(value, str):
+        return value
+    if hasattr(value, "to_string"):
+        return value.to_string()
+    content = getattr(value, "content", "")
+    return content if isinstance(content, str) else str(content)
+
+
+class ModelRouter:
+    """Picks a model per call and fails over to the next one on errors.
+
+    Candidates are ordered by tier first (flash for short transcripts, pro
+    for ones of ``long_tokens`` or more), then by rolling median latency
+    scaled up by the recent error rate, then by configured order. Models
+    that hit a rate limit or fail too often rest for a cooldown period.
+
+    ``runnable(tokens)`` gives a LangChain runnable that can replace a chat
+    model in a chain. Each call through it walks the candidate list until
+    one model answers.
+
+    With a ``limiter`` (``RateLimiter``) every call first takes a Gemini
+    request slot and its prompt tokens for that model; a model whose queue
+    is too long is skipped like a failing one.
+
+    With ``metrics`` (``telemetry.Metrics``) each call's latency, or its
+    failure reason, is also exported per model.
+    """
+
+    def __init__(self, models=None, llm_factory=create_gemini_llm, tiers=None,
+                 long_tokens=LONG_TRANSCRIPT_TOKENS, clock=time.monotonic, limiter=None, metrics=None):
+        self.models = list(models or MODELS_TO_TRY)
+        self.limiter = limiter
+        self.metrics = metrics
+        self.llm_factory = llm_factory
+        self.tiers = dict(MODEL_TIERS if tiers is None else tiers)
+        self.long_tokens = long_tokens
+        self.clock = clock
+        self._llms = {}
+        self._stats = {name: _ModelStats() for name in self.models}
+        self._decisions = deque(maxlen=MAX_DECISIONS)
+        self._lock = threading.Lock()
+
+    def size_class(self, tokens):
+        return "long" if tokens >= self.long_tokens else "short"
+
+    def configured_order(self, tokens):
+        """Models for a transcript of ``tokens`` in preference order, ignoring live stats.
+
+        Stable across calls, so it can go into a cache key: changing the
+        model list or tiers changes it.
+        """
+        preferred = "pro" if self.size_class(tokens) == "long" else "flash"
+        return sorted(self.models, key=lambda name: (self.tiers.get(name, "flash") != preferred, self.models.index(name)))
+
+    def route(self, tokens):
+        """Models to try for a transcript of ``tokens``, best first.
+
+        Resting models are left out unless every model is resting.
+        """
+        preferred = "pro" if self.size_class(tokens) == "long" else "flash"
+        now = self.clock()
+        with self._lock:
+            ready = [name for name in self.models if self._stats[name].cooldown_until <= now]
+            candidates = ready or sorted(self.models, key=lambda name: self._stats[name].cooldown_until)
+
+            def score(name):
+                stats = self._stats[name]
+                latency = stats.percentile(50)
+                latency = UNKNOWN_LATENCY_SECONDS if latency is None else latency
+                return (
+                    self.tiers.get(name, "flash") != preferred,
+                    latency * (1 + 4 * stats.error_rate),
+                    self.models.index(name),
+                )
+
+            return sorted(candidates, key=score)
+
+    def stream(self, prompt, tokens, served=None):
+        """Stream ``prompt`` from the best available model.
+
+        A model that fails before its first chunk is skipped and the next
+        one is tried. Once output has been produced a failure is re-raised,
+        since the partial answer cannot be taken back. The serving model's
+        name is appended to ``served`` if given.
+        """
+        order = self.route(tokens)
+        decision = {"tokens": tokens, "size_class": self.size_class(tokens), "order": order,
+                    "model": None, "failovers": 0}
+        errors, busy = [], []
+        prompt_tokens = estimate_tokens(_prompt_text(prompt)) if self.limiter is not None else 0
+        try:
+            for name in order:
+                if self.limiter is not None:
+                    try:
+                        self.limiter.acquire("gemini", name, tokens=prompt_tokens)
+                    except RateLimitExceeded as e:
+                        busy.append(e)
+                        decision["failovers"] += 1
+                        continue
+                started = self.clock()
+                produced = 0            # Characters streamed so far
+                try:
+                    for chunk in self._llm(name).stream(prompt):
+                        produced += len(_prompt_text(chunk))
+                        yield chunk
+                except Exception as e:
+                    self.record(name, self.clock() - started, error=e)
+                    if produced:
+                        raise
+                    errors.append(f"{name}: {e}")
+                    decision["failovers"] += 1
+                    continue
+                self.record(name, self.clock() - started)
+                if self.limiter is not None:
+                    self.limiter.record("gemini", name, tokens_out=produced // CHARS_PER_TOKEN)
+                decision["model"] = name
+                if served is not None:
+                    served.append(name)
+                return
+            if busy and not errors:
+                raise min(busy, key=lambda e: e.retry_after)
+            raise RuntimeError("All models failed: " + "; ".join(errors + [str(e) for e in busy]))
+        finally:
+            with self._lock:
+                self._decisions.append(decision)
+
+    def runnable(self, tokens, served=None):
+        """A runnable that routes every call as for a transcript of ``tokens``"""
+        from langchain_core.runnables import RunnableGenerator
+
+        def route_calls(prompts):
+            for prompt in prompts:
+                yield from self.stream(prompt, tokens, served)
+
+        return RunnableGenerator(route_calls)
+
+    def record(self, name, seconds, error=None):
+        """Update the model's rolling stats after one call"""
+        if self.metrics is not None:
+            if error is None:
+                self.metrics.observe("tubetalk_llm_call_seconds", seconds, model=name)
+            else:
+                reason = "rate_limited" if is_rate_limited(error) else type(error).__name__
+                self.metrics.inc("tubetalk_llm_errors_total", model=name, reason=reason)
+        with self._lock:
+            stats = self._stats.setdefault(name, _ModelStats())
+            stats.calls += 1
+            stats.outcomes.append(error is not None)
+            if error is None:
+                stats.latencies.append(seconds)
+                bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+                stats.histogram[bucket] += 1
+                return
+            stats.errors += 1
+            if is_rate_limited(error):
+                stats.rate_limited += 1
+                stats.cooldown_until = self.clock() + RATE_LIMIT_COOLDOWN_SECONDS
+            elif len(stats.outcomes) >= MIN_ERROR_SAMPLES and stats.error_rate > MAX_ERROR_RATE:
+                stats.cooldown_until = self.clock() + ERROR_COOLDOWN_SECONDS
+
+    def stats(self):
+        """Per-model counters, latency percentiles and histograms, plus recent routing decisions"""
+        now = self.clock()
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        with self._lock:
+            return {
+                "models": {
+                    name: {
+                        "tier": self.tiers.get(name, "flash"),
+                        "calls": stats.calls,
+                        "errors": stats.errors,
+                        "rate_limited": stats.rate_limited,
+                        "error_rate": stats.error_rate,
+                        "p50_s": stats.percentile(50),
+                        "p90_s": stats.percentile(90),
+                        "cooldown_s": max(0.0, stats.cooldown_until - now),
+                        "histogram": dict(zip(labels, stats.histogram)),
+                    }
+                    for name, stats in self._stats.items()
+                },
+                "decisions": list(self._decisions),
+            }
+
+    def _llm(self, name):
+        with self._lock:
+            llm = self._llms.get(name)
+        if llm is None:
+            llm = self.llm_factory(name)
+            with self._lock:
+                llm = self._llms.setdefault(name, llm)
+        return llm
@@ -0,0 +1,585 @@
+import logging
+import os
+import threading
+import time
+
+from caption_fetcher import fetch_first_success
+from http_client import get_http_client, response_validators
+from instrumentation import maybe_complete, maybe_span
+from llm_provider import LLMProvider
+from model_router import ModelRouter
+from rate_limiter import RateLimiter, RateLimitExceeded, Throttle
+from single_flight import SingleFlight
+from subtitle_parsers import STREAM_CHUNK_BYTES, parse_subtitle, parse_subtitle_stream, select_caption_track
+from summarizer import ChunkedSummarizer, estimate_tokens
+from telemetry import Metrics, log_event
+from transcript_cache import TranscriptStore, summary_key
+from transcript_compaction import compact_transcript
+from transcript_index import QA_TOP_K, TranscriptIndex, format_timestamp, index_key
+from video_metadata import VideoInfoCache, extract_video_id
+
+# RequestTimings stages covered by get_youtube_transcript
+FETCH_STAGES = ("metadata", "caption_download", "parse")
+# Process-wide caps on concurrent requests, shared by every session
+YOUTUBE_CONCURRENCY = int(os.getenv("TUBETALK_YOUTUBE_CONCURRENCY", "8"))
+LLM_CONCURRENCY = int(os.getenv("TUBETALK_LLM_CONCURRENCY", "4"))
+
+prompt_template = """
+You are an expert in summarizing YouTube videos.
+You will be given a transcript of a YouTube video and your job is to provide a concise summary.
+
+Please provide a well-structured summary that includes:
+1. Main topic and key points
+2. Important insights or findings
+3. Conclusion or main takeaways
+
+Here is the transcript:
+{transcript}
+
+Summary:
+"""
+
+qa_prompt_template = """
+You are answering a question about a YouTube video using excerpts from its transcript.
+Each excerpt starts with its time range in the video.
+
+Answer using only these excerpts. After each fact, cite the time it comes from in square brackets, e.g. [12:34].
+If the excerpts do not contain the answer, say so.
+
+Excerpts:
+{context}
+
+Question: {question}
+
+Answer:
+"""
+
+
+def caption_label(lang, kind):
+    language = "English" if lang == 'en' else lang
+    return f"{language} manual subtitles" if kind == 'manual' else f"{language} automatic captions"
+
+
+def _ignore_event(event, *args):
+    pass
+
+
+class _TimedChunks:
+    """Iterates over a streamed body, adding up the seconds spent waiting for it"""
+
+    __slots__ = ('_chunks', 'waited', 'failed')
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.waited = 0.0
+        self.failed = False         # The download itself broke off
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise
+        except Exception:
+            self.failed = True
+            raise
+        finally:
+            self.waited += time.perf_counter() - started
+
+
+class SummaryPipeline:
+    """Fetch → parse → summarize (and answer questions), shared by the Streamlit app and the batch CLI.
+
+    Holds the process-wide LLM provider and model router, video info
+    cache, transcript store and HTTP client. Importing this module is cheap
+    and has no side effects: yt-dlp, requests, LangChain and Gemini load
+    only when first used. Progress the UI may want to show is reported
+    through an ``on_event(event, *args)`` callback instead of being
+    rendered here:
+
+    - ``"captions_available", manual_languages, auto_languages``
+    - ``"caption_selected", label``
+    - ``"warning", message``
+
+    Concurrent requests for the same video (from different sessions or
+    batch workers) are coalesced: one metadata lookup, one caption fetch and
+    one LLM call per video and model, with the result fanned out to every
+    caller. Requests to YouTube and to the model are capped process-wide,
+    both in concurrency and in rate (see ``RateLimiter``); a request that
+    would queue too long fails with a "busy, try again" message.
+
+    ``metrics`` (``telemetry.Metrics``) gets per-stage latency histograms
+    (metadata, caption fetch and parse per format, LLM), cache hits and
+    misses, request outcomes and failure reasons, plus the counters the
+    HTTP client, rate limiter and caches already keep.
+    """
+
+    def __init__(self, llm_provider=None, video_cache=None, store=None, http_client=None,
+                 prompt_template=prompt_template, youtube_concurrency=YOUTUBE_CONCURRENCY,
+                 llm_concurrency=LLM_CONCURRENCY, router=None, rate_limiter=None, metrics=None,
+                 qa_prompt_template=qa_prompt_template, qa_top_k=QA_TOP_K):
+        self.metrics = metrics or Metrics()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        youtube_slots = threading.BoundedSemaphore(youtube_concurrency)
+        self.caption_throttle = Throttle(self.rate_limiter, "captions", youtube_slots)
+        self.llm_limiter = threading.BoundedSemaphore(llm_concurrency)
+        self.flights = SingleFlight()
+        self.llm_provider = llm_provider or LLMProvider()
+        self.router = router or ModelRouter(
+            self.llm_provider.models, self.llm_provider.llm_factory,
+            limiter=self.rate_limiter, metrics=self.metrics,
+        )
+        self.video_cache = video_cache or VideoInfoCache(limiter=Throttle(self.rate_limiter, "yt_dlp", youtube_slots))
+        self.store = store or TranscriptStore()
+        self.http_client = http_client or get_http_client()
+        self.prompt_template = prompt_template
+        self.qa_prompt_template = qa_prompt_template
+        self.qa_top_k = qa_top_k
+        self.metrics.add_collector(self._collect_metrics)
+
+    # --- LLM ---
+    def summarizer(self, tokens=0, served=None):
+        """Summarizer routed for a transcript of ``tokens``, or None if no model answers.
+
+        Each model call inside it goes through the router, so a failing model
+        is replaced by the next one without restarting the summary. The
+        models that answered are appended to ``served``.
+        """
+        if self.llm_provider.get() is None:
+            return None
+        # Long transcripts are chunked and summarized map-reduce style
+        return ChunkedSummarizer(self.router.runnable(tokens, served), self.prompt_template, limiter=self.llm_limiter)
+
+    def _model_config(self, tokens):
+        """Cache key part for the models that may answer a request of ``tokens``"""
+        return f"routed:{self.router.size_class(tokens)}:{','.join(self.router.configured_order(tokens))}"
+
+    def stream_summary(self, transcript, timing):
+        """Yield the summary of a ``Transcript`` as it streams from the chain,
+        reusing a stored summary for the same transcript, model list and prompt.
+
+        The transcript is compacted first (see ``compact_transcript``).
+
+        Fills ``timing`` with seconds to the first token and to the end,
+        ``compaction`` (token counts before and after), ``shared`` when
+        another caller's identical request was joined and ``models`` (the
+        models that answered) when this call ran the chain.
+        """
+        try:
+            yield from self._stream_summary(transcript, timing)
+        except Exception as e:
+            self.metrics.inc("tubetalk_requests_total", kind="summary", outcome="error", reason=type(e).__name__)
+            raise
+        self.metrics.inc("tubetalk_requests_total", kind="summary", outcome="ok")
+
+    def _stream_summary(self, transcript, timing):
+        started = time.perf_counter()
+        timing['compaction'] = {}
+        transcript = compact_transcript(transcript, stats=timing['compaction'])
+        tokens = estimate_tokens(transcript.text)
+        key = summary_key(transcript.text, self._model_config(tokens), self.prompt_template)
+        summary = self.store.get_summary(key)
+        self.metrics.inc("tubetalk_cache_requests_total", cache="summary", result="miss" if summary is None else "hit")
+        if summary is not None:
+            timing['first_token'] = timing['total'] = time.perf_counter() - started
+            timing['cached'] = True
+            yield summary
+            return
+
+        # Only a miss needs a model, so a stored summary is served even while Gemini is down
+        served = []
+        summarizer = self.summarizer(tokens, served)
+        if summarizer is None:
+            raise RuntimeError("AI service is currently unavailable. Please check your API configuration.")
+        chunks, leader = self.flights.stream(
+            ("summary", key), lambda: self._generate_summary(summarizer, transcript, key)
+        )
+        first = True
+        for chunk in chunks:
+            if first:
+                timing['first_token'] = time.perf_counter() - started
+                first = False
+            yield chunk
+        timing['total'] = time.perf_counter() - started
+        timing['cached'] = False
+        timing['shared'] = not leader
+        if leader:
+            timing['models'] = sorted(set(served))
+
+    def _generate_summary(self, summarizer, transcript, key):
+        # Another flight for this key may have finished since the caller's lookup
+        summary = self.store.get_summary(key)
+        if summary is not None:
+            yield summary
+            return
+        parts = []
+        with self.metrics.stage("llm"):
+            for chunk in summarizer.stream({"transcript": transcript.text}):
+                parts.append(chunk)
+                yield chunk
+        self.store.put_summary(key, "".join(parts))
+
+    # --- Questions about a video ---
+    def transcript_index(self, transcript, timing=None):
+        """The retrieval index for a ``Transcript``, read from the store or built once.
+
+        Fills ``timing`` with ``index_seconds``, ``index_cached`` and ``index_chunks``.
+        """
+        timing = {} if timing is None else timing
+        started = time.perf_counter()
+        key = index_key(transcript.text)
+        index, cached = self.flights.do(("index", key), lambda: self._load_index(transcript, key))
+        timing['index_seconds'] = time.perf_counter() - started
+        timing['index_cached'] = cached
+        timing['index_chunks'] = len(index)
+        return index
+
+    def _load_index(self, transcript, key):
+        data = self.store.get_index(key)
+        index = TranscriptIndex.from_json(data) if data is not None else None
+        self.metrics.inc("tubetalk_cache_requests_total", cache="index", result="miss" if index is None else "hit")
+        if index is not None:
+            return index, True
+        with self.metrics.stage("index_build"):
+            index = TranscriptIndex.build(transcript)
+        self.store.put_index(key, index.to_json())
+        return index, False
+
+    def stream_answer(self, question, index, timing):
+        """Yield an answer to ``question`` from the transcript chunks most relevant to it.
+
+        Only the ``qa_top_k`` best BM25 matches go to the model, so every
+        question costs a small prompt whatever the video's length. Answers
+        to the same question over the same excerpts are stored.
+
+        Fills ``timing`` with ``retrieval_seconds``, ``sources`` (``(start,
+        end)`` of the excerpts sent), ``prompt_tokens``, ``total``,
+        ``cached``, and ``first_token`` and ``models`` when the model ran.
+        """
+        started = time.perf_counter()
+        with self.metrics.stage("retrieval"):
+            hits = index.search(question, self.qa_top_k)
+        timing['retrieval_seconds'] = time.perf_counter() - started
+        timing['sources'] = [(start, end) for _, start, end, _ in hits]
+        timing['prompt_tokens'] = 0
+        timing['cached'] = False
+        if not hits:
+            timing['total'] = time.perf_counter() - started
+            self.metrics.inc("tubetalk_requests_total", kind="question", outcome="no_match")
+            yield "Nothing in the transcript seems to match that question. Try other words."
+            return
+
+        context = "\n\n".join(
+            f"[{format_timestamp(start)}–{format_timestamp(end)}] {text}" for _, start, end, text in hits
+        )
+        prompt = self.qa_prompt_template.format(context=context, question=question.strip())
+        tokens = estimate_tokens(prompt)
+        timing['prompt_tokens'] = tokens
+        key = summary_key(prompt, f"qa:{self._model_config(tokens)}", self.qa_prompt_template)
+        answer = self.store.get_summary(key)
+        self.metrics.inc("tubetalk_cache_requests_total", cache="answer", result="miss" if answer is None else "hit")
+        if answer is not None:
+            timing['total'] = time.perf_counter() - started
+            timing['cached'] = True
+            self.metrics.inc("tubetalk_requests_total", kind="question", outcome="ok")
+            yield answer
+            return
+        if self.llm_provider.get() is None:
+            raise RuntimeError("AI service is currently unavailable. Please check your API configuration.")
+
+        from langchain_core.output_parsers import StrOutputParser
+        served = []
+        chain = self.router.runnable(tokens, served) | StrOutputParser()
+        parts = []
+        try:
+            with self.llm_limiter, self.metrics.stage("qa_llm"):
+                for chunk in chain.stream(prompt):
+                    if not parts:
+                        timing['first_token'] = time.perf_counter() - started
+                    parts.append(chunk)
+                    yield chunk
+        except Exception as e:
+            self.metrics.inc("tubetalk_requests_total", kind="question", outcome="error", reason=type(e).__name__)
+            raise
+        self.store.put_summary(key, "".join(parts))
+        self.metrics.inc("tubetalk_requests_total", kind="question", outcome="ok")
+        timing['total'] = time.perf_counter() - started
+        timing['models'] = sorted(set(served))
+
+    # --- Video info ---
+    def get_video_info(self, url):
+        """Return ``(title, thumbnail_url, duration_seconds)``"""
+        video_id = extract_video_id(url)
+        return self.flights.do(("info", video_id), lambda: self._load_video_info(url, video_id))
+
+    def _load_video_info(self, url, video_id):
+        info_dict = self.store.get_video(video_id)
+        if info_dict is None:
+            with self.metrics.stage("metadata"):
+                full_info = self.video_cache.get(url)
+            info_dict = {key: full_info.get(key) for key in ('title', 'thumbnail', 'duration')}
+            self.store.put_video(video_id, info_dict)
+        video_title = info_dict.get('title') or 'No title found'
+        video_thumbnail_url = info_dict.get('thumbnail', None)
+        video_duration = info_dict.get('duration') or 0
+        return video_title, video_thumbnail_url, video_duration
+
+    # --- Transcripts ---
+    def get_youtube_transcript(self, url, timings=None, on_event=_ignore_event):
+        """Return the video's timed ``Transcript``, or an error message string.
+
+        A caller that joins a fetch already in flight gets the leader's
+        events replayed to its own ``on_event`` once the fetch is done.
+        """
+        try:
+            video_id = extract_video_id(url)
+        except ValueError as e:
+            return f"Error fetching transcript: {str(e)}"
+
+        events = []
+
+        def record_event(event, *args):
+            events.append((event, args))
+            on_event(event, *args)
+
+        transcript, leader_events = self.flights.do(
+            ("transcript", video_id),
+            lambda: (self._fetch_transcript(url, video_id, timings, record_event), events),
+        )
+        if leader_events is not events:
+            # Joined another caller's fetch: its stages finished there
+            maybe_complete(timings, *FETCH_STAGES)
+            for event, args in leader_events:
+                on_event(event, *args)
+        if isinstance(transcript, str):
+            self.metrics.inc("tubetalk_requests_total", kind="transcript", outcome="error")
+        else:
+            self.metrics.inc("tubetalk_requests_total", kind="transcript", outcome="ok")
+        return transcript
+
+    def _fetch_transcript(self, url, video_id, timings, on_event):
+        cached = None
+        try:
+            store = self.store
+
+            # Reuse a transcript fetched earlier for this video while it is fresh
+            with maybe_span(timings, "metadata"):
+                cached = store.get_transcript(video_id)
+            if cached:
+                cached_lang, cached_kind, cached_transcript = cached
+                validators = store.get_transcript_validators(video_id, cached_lang, cached_kind)
+                if store.is_transcript_fresh(validators):
+                    self.metrics.inc("tubetalk_cache_requests_total", cache="transcript", result="hit")
+                    on_event("caption_selected", f"cached {caption_label(cached_lang, cached_kind)}")
+                    maybe_complete(timings, *FETCH_STAGES)
+                    return cached_transcript
+
+            # Reuses the extraction done for the video preview
+            with maybe_span(timings, "metadata"), self.metrics.stage("metadata"):
+                info_dict = self.video_cache.get(url)
+            maybe_complete(timings, "metadata")
+
+            # Check for available subtitles
+            subtitles = info_dict.get('subtitles') or {}
+            automatic_captions = info_dict.get('automatic_captions') or {}
+            on_event("captions_available", list(subtitles.keys())[:5], list(automatic_captions.keys())[:5])
+
+            # A stale stored track is revalidated with a conditional GET first
+            if cached:
+                track = select_caption_track((subtitles if cached_kind == 'manual' else automatic_captions).get(cached_lang))
+                if track:
+                    response = self.download_subtitle(track['url'], timings, validators, ext=track['ext'])
+                    if response is not None and response.status_code == 304:
+                        self.metrics.inc("tubetalk_cache_requests_total", cache="transcript", result="revalidated")
+                        store.mark_transcript_revalidated(video_id, cached_lang, cached_kind)
+                        on_event("caption_selected", f"cached {caption_label(cached_lang, cached_kind)} (unchanged upstream)")
+                        maybe_complete(timings, "caption_download", "parse")
+                        return cached_transcript
+                    # Changed upstream: the new body is already here, so don't download it again below
+                    transcript = self._parse_revalidated(response, track['ext'], cached_kind, timings)
+                    if transcript:
+                        self.metrics.inc("tubetalk_cache_requests_total", cache="transcript", result="refreshed")
+                        on_event("caption_selected", caption_label(cached_lang, cached_kind))
+                        store.put_transcript(video_id, cached_lang, cached_kind, transcript, **response_validators(response))
+                        return transcript
+
+            self.metrics.inc("tubetalk_cache_requests_total", cache="transcript", result="miss")
+
+            # Candidate tracks in priority order:
+            # manual English, automatic English, then the first 3 manual
+            # languages, then the first 3 automatic languages. Each uses the
+            # cheapest format available for that track.
+            ordered = []
+            if 'en' in subtitles:
+                ordered.append(('en', 'manual', subtitles['en']))
+            if 'en' in automatic_captions:
+                ordered.append(('en', 'auto', automatic_captions['en']))
+            ordered += [(lang, 'manual', subtitles[lang]) for lang in list(subtitles.keys())[:3] if lang != 'en']
+            ordered += [(lang, 'auto', automatic_captions[lang]) for lang in list(automatic_captions.keys())[:3] if lang != 'en']
+            candidates = []
+            for lang, kind, tracks in ordered:
+                track = select_caption_track(tracks)
+                if track:
+                    candidates.append((lang, kind, track))
+
+            # Download all candidates at once; the highest-priority success wins.
+            # Warnings from worker threads are reported afterwards, from here.
+            warnings, busy = [], []
+
+            def fetch(candidate):
+                try:
+                    return self.download_and_parse_subtitle(candidate[2], timings, warnings, kind=candidate[1])
+                except RateLimitExceeded as e:
+                    busy.append(e)
+
+            winner, result = fetch_first_success(candidates, fetch)
+            for message in list(warnings):
+                on_event("warning", message)
+            if winner:
+                lang, kind, _ = winner
+                transcript, validators, parse_stats = result
+                if timings is not None:
+                    timings.info.update(parse_stats)
+                on_event("caption_selected", caption_label(lang, kind))
+                store.put_transcript(video_id, lang, kind, transcript, **validators)
+                return transcript
+
+            if busy:
+                raise min(busy, key=lambda e: e.retry_after)
+            log_event("no_captions", level=logging.WARNING, video_id=video_id, tracks_tried=len(candidates))
+            return "Error: No subtitles or captions available for this video."
+
+        except RateLimitExceeded as e:
+            log_event("transcript_rate_limited", level=logging.WARNING, video_id=video_id,
+                      upstream=e.upstream, retry_after=round(e.retry_after, 1), stale_fallback=bool(cached))
+            # A stale stored transcript beats none while YouTube is throttled
+            if cached:
+                on_event("warning", f"{e}. Showing the stored transcript without rechecking it.")
+                on_event("caption_selected", f"cached {caption_label(cached[0], cached[1])}")
+                maybe_complete(timings, *FETCH_STAGES)
+                return cached[2]
+            return f"Error: {e}"
+        except Exception as e:
+            log_event("transcript_failed", level=logging.WARNING, video_id=video_id,
+                      reason=type(e).__name__, error=str(e))
+            return f"Error fetching transcript: {str(e)}"
+
+    def download_subtitle(self, url, timings=None, validators=None, ext="unknown"):
+        """GET a caption track through the shared HTTP client.
+
+        Sends a conditional request when ``validators`` (etag / last_modified)
+        are given. Returns the response for 200 and 304, otherwise None.
+        ``ext`` labels the fetch in the metrics.
+        """
+        validators = validators or {}
+        with maybe_span(timings, "caption_download"), self.metrics.stage("caption_fetch", format=ext), \
+                self.caption_throttle:
+            response = self.http_client.get(
+                url, etag=validators.get('etag'), last_modified=validators.get('last_modified')
+            )
+            response.content  # Read the body inside the download span
+        if response.status_code in (200, 304):
+            return response
+        self.metrics.inc("tubetalk_stage_errors_total", stage="caption_fetch", format=ext,
+                         reason=f"http_{response.status_code}")
+        return None
+
+    def _parse_revalidated(self, response, ext, kind, timings):
+        """Transcript from a 200 answer to a conditional GET, or None if there is none to use"""
+        if response is None or response.status_code != 200:
+            return None
+        parse_stats = {'caption_format': ext}
+        try:
+            maybe_complete(timings, "caption_download")
+            with maybe_span(timings, "parse"), self.metrics.stage("parse", format=ext):
+                transcript = parse_subtitle(ext, response.content, parse_stats, kind)
+        except Exception as e:
+            log_event("caption_track_failed", level=logging.WARNING, format=ext,
+                      reason=type(e).__name__, error=str(e))
+            return None
+        if not transcript:
+            return None
+        if timings is not None:
+            timings.info.update(parse_stats)
+        maybe_complete(timings, "parse")
+        return transcript
+
+    def download_and_parse_subtitle(self, track, timings=None, warnings=None, kind='auto'):
+        """Download one caption track and return ``(transcript, validators, parse_stats)``, or None
+
+        The track's ``ext`` from yt-dlp picks the parser, and its ``kind``
+        (``'manual'`` or ``'auto'``) whether rolling repeats are collapsed.
+        The body is parsed chunk by chunk as it arrives (see
+        ``parse_subtitle_stream``), so it is never held in memory whole.
+        Time spent waiting on the network counts as ``caption_download``,
+        the rest as ``parse``. Failures are appended to ``warnings``; a
+        ``RateLimitExceeded`` is raised so the caller can report it.
+        """
+        ext = track.get('ext', 'unknown')
+        try:
+            with self.metrics.stage("caption_fetch", format=ext), self.caption_throttle:
+                started = time.perf_counter()
+                response = self.http_client.get(track['url'], stream=True)
+                try:
+                    if response.status_code != 200:
+                        self.metrics.inc("tubetalk_stage_errors_total", stage="caption_fetch", format=ext,
+                                         reason=f"http_{response.status_code}")
+                        return None
+                    parse_stats = {'caption_format': ext}
+                    body = _TimedChunks(response.iter_content(STREAM_CHUNK_BYTES))
+                    downloaded = time.perf_counter() - started
+                    started = time.perf_counter()
+                    try:
+                        transcript = parse_subtitle_stream(ext, body, parse_stats, kind)
+                    except Exception as e:
+                        if not body.failed:
+                            self.metrics.inc("tubetalk_stage_errors_total", stage="parse", format=ext,
+                                             reason=type(e).__name__)
+                        raise
+                    finally:
+                        parsed = time.perf_counter() - started - body.waited
+                        self.metrics.observe("tubetalk_stage_seconds", parsed, stage="parse", format=ext)
+                        if timings is not None:
+                            timings.record("caption_download", downloaded + body.waited)
+                            timings.record("parse", parsed)
+                finally:
+                    response.close()
+            if not transcript:
+                self.metrics.inc("tubetalk_stage_errors_total", stage="parse", format=ext, reason="empty")
+                return None
+            # Streamed: the download and the parse end together
+            maybe_complete(timings, "caption_download", "parse")
+            return transcript, response_validators(response), parse_stats
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            log_event("caption_track_failed", level=logging.WARNING, format=ext,
+                      reason=type(e).__name__, error=str(e))
+            if warnings is not None:
+                warnings.append(f"Subtitle parsing error ({ext}): {e}")
+            return None
+
+    def _collect_metrics(self):
+        """Counters kept by the components themselves, for ``Metrics.render``"""
+        video_stats = self.video_cache.stats()
+        for result, key in (("hit", "hits"), ("miss", "misses")):
+            yield "tubetalk_cache_requests_total", {"cache": "video_info", "result": result}, video_stats[key]
+        http_stats = self.http_client.stats()
+        for result, key in (("sent", "requests"), ("retried", "retries"), ("failed", "failures"),
+                            ("not_modified", "not_modified")):
+            if key in http_stats:
+                yield "tubetalk_http_requests_total", {"result": result}, http_stats[key]
+        for name, usage in self.rate_limiter.stats().items():
+            upstream, _, key = name.partition(":")
+            labels = {"upstream": upstream, "key": key} if key else {"upstream": upstream}
+            yield "tubetalk_upstream_requests_total", labels, usage["requests"]
+            yield "tubetalk_upstream_rejected_total", labels, usage["rejected"]
+            yield "tubetalk_upstream_queued_seconds_total", labels, round(usage["waited_s"], 3)
+            if upstream == "gemini":
+                yield "tubetalk_llm_tokens_total", {"model": key, "direction": "in"}, usage["tokens_in"]
+                yield "tubetalk_llm_tokens_total", {"model": key, "direction": "out"}, usage["tokens_out"]
+        yield "tubetalk_coalesced_requests_total", {}, self.flights.stats()["coalesced"]
+        yield "tubetalk_cache_bytes", {}, self.store.stats()["bytes"]
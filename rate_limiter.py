@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+
+# Sustained request (and token) rates per upstream. Gemini limits apply to
+# each model separately; upstreams missing here are not rate limited.
+RATE_LIMITS = {
+    "gemini": {
+        "requests_per_minute": float(os.getenv("TUBETALK_GEMINI_RPM", "60")),
+        "tokens_per_minute": float(os.getenv("TUBETALK_GEMINI_TPM", "1000000")),
+    },
+    "yt_dlp": {"requests_per_minute": float(os.getenv("TUBETALK_YTDLP_RPM", "60"))},
+    "captions": {"requests_per_minute": float(os.getenv("TUBETALK_CAPTION_RPM", "300"))},
+}
+# Requests queue for at most this long before failing with RateLimitExceeded
+MAX_WAIT_SECONDS = float(os.getenv("TUBETALK_RATE_LIMIT_WAIT_SECONDS", "30"))
+# Bucket size: how many seconds' worth of the rate may be spent at once
+BURST_SECONDS = 10
+
+UPSTREAM_NAMES = {"gemini": "Gemini", "yt_dlp": "YouTube", "captions": "YouTube captions"}
+
+
+class RateLimitExceeded(RuntimeError):
+    """A request would have had to queue longer than its deadline"""
+
+    def __init__(self, upstream, retry_after):
+        self.upstream = upstream
+        self.retry_after = retry_after
+        super().__init__(
+            f"{UPSTREAM_NAMES.get(upstream, upstream)} is busy right now, try again in {retry_after:.0f}s"
+        )
+
+
+class TokenBucket:
+    """Refills at ``rate`` units per second up to ``capacity``.
+
+    Reservations may take the level below zero; later callers then wait
+    for the debt to refill, which queues them in arrival order.
+    """
+
+    __slots__ = ('rate', 'capacity', 'level', 'updated')
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = now
+
+    def wait_for(self, cost, now):
+        """Seconds until ``cost`` units are available (0 if they are now)"""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        return max(0.0, (cost - self.level) / self.rate)
+
+    def take(self, cost):
+        self.level -= cost
+
+
+class RateLimiter:
+    """Token buckets per upstream (and key, e.g. the Gemini model), shared
+    by every session in the process, plus a running account of usage.
+
+    ``acquire`` blocks until the request may go out. If that would take
+    longer than the deadline it raises ``RateLimitExceeded`` at once,
+    without using up any of the budget.
+    """
+
+    def __init__(self, limits=None, max_wait=MAX_WAIT_SECONDS, clock=time.monotonic, sleep=time.sleep):
+        self.limits = RATE_LIMITS if limits is None else limits
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets = {}      # (upstream, key) -> [(bucket, unit)]
+        self._accounts = {}     # (upstream, key) -> usage counters
+        self._lock = threading.Lock()
+
+    def acquire(self, upstream, key=None, tokens=0, max_wait=None):
+        """Wait for a request slot (plus ``tokens`` for token-limited upstreams).
+
+        Returns the seconds spent waiting.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        with self._lock:
+            now = self.clock()
+            account = self._account(upstream, key)
+            buckets = self._get_buckets(upstream, key, now)
+            costs = [1 if unit == "requests" else tokens for _, unit in buckets]
+            wait = max([bucket.wait_for(cost, now) for (bucket, _), cost in zip(buckets, costs)], default=0.0)
+            if wait > max_wait:
+                account["rejected"] += 1
+                raise RateLimitExceeded(upstream, wait)
+            for (bucket, _), cost in zip(buckets, costs):
+                bucket.take(cost)
+            account["requests"] += 1
+            account["tokens_in"] += tokens
+            account["waited_s"] += wait
+        if wait:
+            self.sleep(wait)
+        return wait
+
+    def record(self, upstream, key=None, tokens_out=0):
+        """Add the tokens a finished request produced to the account"""
+        with self._lock:
+            self._account(upstream, key)["tokens_out"] += tokens_out
+
+    def stats(self):
+        """Usage per ``"upstream"`` or ``"upstream:key"``"""
+        with self._lock:
+            return {
+                upstream if key is None else f"{upstream}:{key}": dict(account)
+                for (upstream, key), account in self._accounts.items()
+            }
+
+    def _account(self, upstream, key):
+        account = self._accounts.get((upstream, key))
+        if account is None:
+            account = self._accounts[(upstream, key)] = {
+                "requests": 0, "tokens_in": 0, "tokens_out": 0, "waited_s": 0.0, "rejected": 0,
+            }
+        return account
+
+    def _get_buckets(self, upstream, key, now):
+        buckets = self._buckets.get((upstream, key))
+        if buckets is None:
+            buckets = []
+            for name, per_minute in self.limits.get(upstream, {}).items():
+                rate = per_minute / 60
+                unit = "requests" if name == "requests_per_minute" else "tokens"
+                buckets.append((TokenBucket(rate, max(1.0, rate * BURST_SECONDS), now), unit))
+            self._buckets[(upstream, key)] = buckets
+        return buckets
+
+
+class Throttle:
+    """Reusable context manager: a rate-limited slot for one upstream, and
+    optionally a concurrency cap (``semaphore``) held until the block ends"""
+
+    def __init__(self, limiter, upstream, semaphore=None):
+        self.limiter = limiter
+        self.upstream = upstream
+        self.semaphore = semaphore
+
+    def __enter__(self):
+        self.limiter.acquire(self.upstream)
+        if self.semaphore is not None:
+            self.semaphore.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.semaphore is not None:
+            self.semaphore.release()
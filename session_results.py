@@ -0,0 +1,85 @@
+import os
+from collections import OrderedDict
+
+# Videos kept per browser session, and the text they may hold between them
+SESSION_MAX_RESULTS = int(os.getenv("TUBETALK_SESSION_MAX_RESULTS", "5"))
+SESSION_MAX_CHARS = int(os.getenv("TUBETALK_SESSION_MAX_CHARS", "2000000"))
+
+
+class VideoResult:
+    """What one session has produced for one video so far: metadata first,
+    then the transcript, then the summary and its timings, and any
+    questions asked about it"""
+
+    __slots__ = ('video_id', 'url', 'title', 'thumbnail', 'duration', 'transcript', 'caption_label',
+                 'summary', 'summary_timing', 'timings', 'index', 'index_timing', 'answers', 'analytics')
+
+    def __init__(self, video_id, url, title=None, thumbnail=None, duration=0):
+        self.video_id = video_id
+        self.url = url
+        self.title = title
+        self.thumbnail = thumbnail
+        self.duration = duration
+        self.transcript = None          # Transcript
+        self.caption_label = None       # e.g. "English automatic captions"
+        self.summary = None
+        self.summary_timing = {}        # As filled by SummaryPipeline.stream_summary
+        self.timings = None             # RequestTimings of the run that produced it
+        self.index = None               # TranscriptIndex for questions
+        self.index_timing = {}          # As filled by SummaryPipeline.transcript_index
+        self.answers = []               # (question, answer, timing), oldest first
+        self.analytics = None           # TranscriptAnalytics, computed on first view
+
+    @property
+    def size(self):
+        """Characters held, which dominate the entry's memory"""
+        return ((len(self.transcript.text) if self.transcript else 0) + len(self.summary or "")
+                + sum(len(question) + len(answer) for question, answer, _ in self.answers))
+
+
+class SessionResults:
+    """Bounded LRU of ``VideoResult`` keyed by video ID, one per Streamlit session.
+
+    Streamlit reruns the whole script on every interaction, so anything not
+    kept here is lost on the next click. Reruns render from these entries
+    without touching the network or the model. The least recently viewed
+    entries are evicted once there are more than ``max_entries`` or their
+    text exceeds ``max_chars``; the newest entry is always kept.
+    """
+
+    def __init__(self, max_entries=SESSION_MAX_RESULTS, max_chars=SESSION_MAX_CHARS):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.evictions = 0
+        self._entries = OrderedDict()     # video_id -> VideoResult
+
+    def get(self, video_id):
+        result = self._entries.get(video_id)
+        if result is not None:
+            self._entries.move_to_end(video_id)
+        return result
+
+    def put(self, result):
+        """Add or refresh ``result`` (call again after filling in more of it) and return it"""
+        self._entries[result.video_id] = result
+        self._entries.move_to_end(result.video_id)
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.chars > self.max_chars
+        ):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def latest(self):
+        """The most recently viewed result, or None"""
+        return next(reversed(self._entries.values()), None)
+
+    @property
+    def chars(self):
+        return sum(result.size for result in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, video_id):
+        return video_id in self._entries
@@ -0,0 +1,127 @@
+import threading
+from concurrent.futures import Future
+
+
+class _Abandoned(Exception):
+    """The leading caller stopped before producing a result"""
+
+
+class _SharedStream:
+    """Items produced once and replayed to every reader, including late joiners"""
+
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def push(self, item):
+        with self._cond:
+            self.items.append(item)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def reader(self):
+        index = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: index < len(self.items) or self.done)
+                items = self.items[index:]
+                index = len(self.items)
+                if not items:
+                    if self.error is not None:
+                        raise self.error
+                    return
+            yield from items
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key does the work; callers arriving while it is
+    in flight wait for it and share its result or exception. Nothing is
+    kept once the call finishes, caching is left to the stores.
+    """
+
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Return ``func()``, shared with concurrent callers using the same ``key``.
+
+        If the leader is interrupted by something other than an ``Exception``
+        (e.g. Streamlit stopping its script), a waiting caller takes over.
+        """
+        while True:
+            future, leader = self._join(key, Future)
+            if not leader:
+                try:
+                    return future.result()
+                except _Abandoned:
+                    continue
+            try:
+                result = func()
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            except BaseException:
+                future.set_exception(_Abandoned())
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                self._leave(key, future)
+
+    def stream(self, key, produce):
+        """Iterate over ``produce()``, shared with concurrent callers using the same ``key``.
+
+        The generator runs on its own thread, so it finishes (and its side
+        effects happen) even if every reader stops early. Returns
+        ``(iterator, leader)``; ``leader`` is False for callers that joined
+        a stream already in flight.
+        """
+        shared, leader = self._join(key, _SharedStream)
+        if leader:
+            threading.Thread(
+                target=self._produce, args=(key, shared, produce), name=f"single-flight-{key!r}", daemon=True
+            ).start()
+        return shared.reader(), leader
+
+    def stats(self):
+        with self._lock:
+            return {"executions": self.executions, "coalesced": self.coalesced, "in_flight": len(self._flights)}
+
+    def _produce(self, key, shared, produce):
+        try:
+            for item in produce():
+                shared.push(item)
+        except Exception as e:
+            shared.finish(e)
+        else:
+            shared.finish()
+        finally:
+            self._leave(key, shared)
+
+    def _join(self, key, factory):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = factory()
+            self.executions += 1
+            return flight, True
+
+    def _leave(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
@@ -0,0 +1,371 @@
+import codecs
+import html
+import json
+import re
+import xml.etree.ElementTree as ElementTree
+
+from transcript_segments import TranscriptBuilder, parse_timestamp
+
+# Caption formats in order of preference. json3 is structured and the
+# cheapest to parse; the XML (srv*/ttml) formats are the most expensive.
+CAPTION_FORMAT_PREFERENCE = ('json3', 'vtt', 'srv3', 'srv2', 'srv1', 'srt', 'ttml')
+# Read size for streamed caption bodies
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def select_caption_track(tracks):
+    """Pick the cheapest-to-parse track from a yt-dlp subtitle track list.
+
+    Returns None when no track is in a format we can parse.
+    """
+    by_ext = {}
+    for track in tracks or []:
+        if track.get('url'):
+            by_ext.setdefault(track.get('ext'), track)
+    for ext in CAPTION_FORMAT_PREFERENCE:
+        if ext in by_ext:
+            return by_ext[ext]
+    return None
+
+
+def parse_subtitle(ext, content, stats=None, kind='auto'):
+    """Parse a downloaded caption body (bytes or str) in format ``ext``
+    into a timed ``Transcript``.
+
+    For vtt/srt, ``stats`` (a dict) receives the de-duplication numbers;
+    ``kind`` is the track's ``'manual'`` or ``'auto'`` (see ``parse_vtt_subtitle``).
+    """
+    if ext == 'json3':
+        return parse_json_subtitle(json.loads(content))
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    if ext == 'vtt':
+        return parse_vtt_subtitle(content, stats, kind)
+    if ext == 'srt':
+        return parse_srt_subtitle(content, stats, kind)
+    if ext in ('srv1', 'srv2', 'srv3', 'ttml'):
+        return parse_xml_subtitle(content)
+    raise ValueError(f"Unsupported caption format: {ext}")
+
+
+def parse_subtitle_stream(ext, chunks, stats=None, kind='auto'):
+    """``parse_subtitle`` for a body arriving as an iterable of byte chunks
+    (e.g. ``response.iter_content()``); the whole body is never held at once"""
+    builder = TranscriptBuilder()
+    for start, end, text in iter_subtitle_segments(ext, chunks, stats, kind):
+        builder.add(start, end, text)
+    transcript = builder.build()
+    if stats is not None and 'raw_chars' in stats:
+        _text_stats(transcript, stats)
+    return transcript
+
+
+def iter_subtitle_segments(ext, chunks, stats=None, kind='auto'):
+    """Yield ``(start, end, text)`` segments as the chunks of a caption body arrive.
+
+    json3, vtt and srt are parsed incrementally, holding about one event or
+    cue beyond the current chunk. The XML formats are rare (see
+    ``CAPTION_FORMAT_PREFERENCE``) and are parsed from the joined body.
+    """
+    if ext == 'json3':
+        for event in _iter_json3_events(_decode_chunks(chunks)):
+            segment = _json3_segment(event)
+            if segment is not None:
+                yield segment
+    elif ext in ('vtt', 'srt'):
+        yield from _cue_segments(_iter_cues(_iter_lines(_decode_chunks(chunks))), stats, kind)
+    elif ext in ('srv1', 'srv2', 'srv3', 'ttml'):
+        yield from parse_xml_subtitle(b"".join(chunks))
+    else:
+        raise ValueError(f"Unsupported caption format: {ext}")
+
+
+def parse_json_subtitle(data):
+    """Parse JSON3 subtitle format (one segment per event)"""
+    builder = TranscriptBuilder()
+    for event in data.get('events', []):
+        segment = _json3_segment(event)
+        if segment is not None:
+            builder.add(*segment)
+    return builder.build()
+
+
+def _json3_segment(event):
+    """``(start, end, text)`` for a json3 event, or None for events without text segments"""
+    if 'segs' not in event:
+        return None
+    event_parts = []
+    for seg in event['segs']:
+        if 'utf8' in seg:
+            text = seg['utf8'].strip()
+            if text and text not in ['\n', ' ']:
+                event_parts.append(text)
+    start = event.get('tStartMs', 0) / 1000
+    return start, start + event.get('dDurationMs', 0) / 1000, " ".join(event_parts)
+
+
+# --- Incremental reading ---
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"     # What str.splitlines splits on
+
+
+def _decode_chunks(chunks):
+    """UTF-8 text from byte chunks; multi-byte characters may straddle chunks"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for chunk in chunks:
+        text = chunk if isinstance(chunk, str) else decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _iter_lines(texts):
+    """Lines (without terminators, as ``str.splitlines``) from text arriving in pieces"""
+    pending = ""
+    for text in texts:
+        text = pending + text
+        lines = text.splitlines()
+        pending = ""
+        # The last line may continue in the next piece, or be half of a "\r\n"
+        if text[-1] == '\r':
+            pending = lines.pop() + '\r'
+        elif text[-1] not in _LINE_BREAKS:
+            pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending.rstrip('\r')
+
+
+class _JsonStream:
+    """Reads JSON values one at a time from text arriving in pieces.
+
+    Only the unread part of the text is buffered, so walking a large array
+    holds one element at a time.
+    """
+
+    __slots__ = ('_texts', '_buffer', '_pos', '_done')
+
+    def __init__(self, texts):
+        self._texts = iter(texts)
+        self._buffer = ""
+        self._pos = 0
+        self._done = False
+
+    def peek(self):
+        """Next non-whitespace character, or "" at the end of the input"""
+        while True:
+            self._pos = _JSON_WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._more():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Malformed json3 captions: expected {char!r} at offset {self._pos}")
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._done:
+                    raise
+            else:
+                # A number or literal at the very end of the buffer may continue in the next piece
+                if end < len(self._buffer) or self._done:
+                    self._pos = end
+                    return value
+            self._more()
+
+    def _more(self):
+        text = next(self._texts, None)
+        if text is None:
+            self._done = True
+            return False
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+
+def _iter_json3_events(texts):
+    """Yield the items of the top-level ``"events"`` array of a json3 body one by one"""
+    stream = _JsonStream(texts)
+    stream.expect("{")
+    while stream.peek() not in ("}", ""):
+        key = stream.value()
+        stream.expect(":")
+        if key == "events" and stream.peek() == "[":
+            stream.expect("[")
+            while stream.peek() != "]":
+                yield stream.value()
+                if stream.peek() == ",":
+                    stream.expect(",")
+            stream.expect("]")
+        else:
+            stream.value()              # pens, window styles, ... are not needed
+        if stream.peek() == ",":
+            stream.expect(",")
+    stream.expect("}")
+
+
+# Inline cue markup: <c>, <c.colorE5E5E5>, <i>, <v Speaker>, <00:00:01.500> ...
+_CUE_TAG = re.compile(r"<[^>]*>")
+# Drop a repeated run of words between cues only if it is at least this long
+# (or is the whole cue), so genuine one-word repeats survive
+MIN_OVERLAP_WORDS = 3
+# Words of earlier cues kept for that comparison; a cue only ever repeats
+# the tail of the previous one or two
+OVERLAP_WINDOW_WORDS = 200
+
+
+def parse_vtt_subtitle(content, stats=None, kind='auto'):
+    """Parse WebVTT subtitle format.
+
+    Strips inline cue markup. For ``kind='auto'`` it also collapses the
+    text that YouTube's rolling auto-captions repeat from one cue to the
+    next, so each segment holds only the words its cue added. Manual
+    tracks keep every cue as written, since a repeated line there is
+    repeated speech. If ``stats`` is a dict it receives the raw and
+    cleaned sizes and the reduction ratio.
+    """
+    return _join_cues(_iter_cues(content.splitlines()), stats, kind)
+
+
+def parse_srt_subtitle(content, stats=None, kind='auto'):
+    """Parse SRT subtitle format (same cleanup as ``parse_vtt_subtitle``)"""
+    return _join_cues(_iter_cues(content.splitlines()), stats, kind)
+
+
+def _iter_cues(text_lines):
+    """Yield ``(start, end, lines)`` for each cue, in order.
+
+    A cue starts at its timing line (the only line containing ``-->``) and
+    ends at the next empty line, so headers, NOTE/STYLE blocks and cue
+    identifiers are skipped. YouTube puts whitespace-only lines inside
+    rolling cues; those do not end the cue.
+    """
+    lines = []
+    in_cue = False
+    start = end = 0.0
+    for raw_line in text_lines:
+        line = raw_line.strip()
+        if '-->' in line:
+            if lines:
+                yield start, end, lines
+            start, end = _parse_cue_timing(line)
+            lines = []
+            in_cue = True
+        elif not raw_line:
+            if lines:
+                yield start, end, lines
+            lines = []
+            in_cue = False
+        elif in_cue and line:
+            lines.append(line)
+    if lines:
+        yield start, end, lines
+
+
+def _parse_cue_timing(line):
+    # "00:00:01.000 --> 00:00:02.500 align:start position:0%"
+    start, _, rest = line.partition('-->')
+    try:
+        return parse_timestamp(start), parse_timestamp(rest.split()[0])
+    except (ValueError, IndexError):
+        return 0.0, 0.0
+
+
+def _join_cues(cues, stats=None, kind='auto'):
+    builder = TranscriptBuilder()
+    for start, end, text in _cue_segments(cues, stats, kind):
+        builder.add(start, end, text)
+    transcript = builder.build()
+    if stats is not None:
+        _text_stats(transcript, stats)
+    return transcript
+
+
+def _cue_segments(cues, stats=None, kind='auto'):
+    """Yield ``(start, end, text)`` per cue; for auto tracks, minus the words repeated from the previous cues.
+
+    Only the last ``OVERLAP_WINDOW_WORDS`` (or more) words are remembered
+    for the comparison. If ``stats`` is a dict it receives ``raw_chars``
+    once the cues run out.
+    """
+    words = []
+    raw_chars = 0
+    append = _append_new_words if kind == 'auto' else list.extend
+    for start, end, lines in cues:
+        cue_start = len(words)
+        for line in lines:
+            raw_chars += len(line) + 1
+            if '<' in line:
+                line = _CUE_TAG.sub("", line)
+            if '&' in line:
+                line = html.unescape(line)
+            append(words, line.split())
+        yield start, end, " ".join(words[cue_start:])
+        if len(words) > 2 * OVERLAP_WINDOW_WORDS:
+            del words[:-OVERLAP_WINDOW_WORDS]
+    if stats is not None:
+        stats['raw_chars'] = max(raw_chars - 1, 0)
+
+
+def _text_stats(transcript, stats):
+    raw_chars = stats['raw_chars']
+    stats['text_chars'] = len(transcript.text)
+    stats['reduction'] = 1 - len(transcript.text) / (raw_chars + 1) if raw_chars else 0.0
+
+
+def _append_new_words(words, new_words):
+    """Append ``new_words`` minus any prefix that repeats the end of ``words``"""
+    if not new_words:
+        return
+    if words and new_words[0] not in words[-len(new_words):]:
+        words.extend(new_words)     # Fast path: no possible overlap
+        return
+    longest = min(len(words), len(new_words))
+    for size in range(longest, 0, -1):
+        if size < MIN_OVERLAP_WORDS and size != len(new_words):
+            break
+        if words[-size:] == new_words[:size]:
+            words.extend(new_words[size:])
+            return
+    words.extend(new_words)
+
+
+def parse_xml_subtitle(content):
+    """Parse YouTube's XML formats (srv1 <text>, srv2/srv3 and TTML <p>)"""
+    root = ElementTree.fromstring(content)
+    builder = TranscriptBuilder()
+
+    for element in root.iter():
+        tag = element.tag.rsplit('}', 1)[-1]     # Drop the TTML namespace
+        if tag in ('text', 'p'):
+            text = html.unescape(" ".join("".join(element.itertext()).split()))
+            start, end = _xml_timing(element.attrib)
+            builder.add(start, end, text)
+
+    return builder.build()
+
+
+def _xml_timing(attrib):
+    try:
+        if 'start' in attrib:                   # srv1: seconds
+            start = float(attrib['start'])
+            return start, start + float(attrib.get('dur', 0))
+        if 't' in attrib:                       # srv2/srv3: milliseconds
+            start = int(attrib['t']) / 1000
+            return start, start + int(attrib.get('d', 0)) / 1000
+        if 'begin' in attrib:                   # TTML: clock time
+            start = parse_timestamp(attrib['begin'])
+            return start, parse_timestamp(attrib['end']) if 'end' in attrib else start
+    except ValueError:
+        pass
+    return 0.0, 0.0
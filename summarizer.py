@@ -0,0 +1,174 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+# Chunking settings, overridable from the environment
+CHUNK_TOKENS = int(os.getenv("TUBETALK_CHUNK_TOKENS", "6000"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("TUBETALK_CHUNK_OVERLAP_TOKENS", "200"))
+SUMMARY_WORKERS = int(os.getenv("TUBETALK_SUMMARY_WORKERS", "4"))
+
+CHARS_PER_TOKEN = 4
+
+map_prompt_template = """
+You are an expert in summarizing YouTube videos.
+Below is part {part} of {total} of a video transcript.
+Summarize the key points, insights and facts from this part only.
+Be concise and do not add an introduction or conclusion.
+
+Transcript part:
+{transcript}
+
+Summary of this part:
+"""
+
+reduce_prompt_template = """
+You are an expert in summarizing YouTube videos.
+Below are summaries of consecutive parts of one video, in order.
+Combine them into a single concise summary, removing repetition.
+
+Part summaries:
+{summaries}
+
+Please provide a well-structured summary that includes:
+1. Main topic and key points
+2. Important insights or findings
+3. Conclusion or main takeaways
+
+Summary:
+"""
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English)"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_transcript(text, chunk_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """Split ``text`` on word boundaries into overlapping, token-budgeted chunks"""
+    words = text.split()
+    if not words:
+        return []
+    budget = chunk_tokens * CHARS_PER_TOKEN
+    overlap = min(overlap_tokens, chunk_tokens // 2) * CHARS_PER_TOKEN
+
+    chunks = []
+    start = 0
+    while start < len(words):
+        end, size = start, 0
+        while end < len(words) and (end == start or size + len(words[end]) + 1 <= budget):
+            size += len(words[end]) + 1
+            end += 1
+        chunks.append(" ".join(words[start:end]))
+        if end == len(words):
+            break
+        # Step back so the next chunk repeats the last ``overlap`` characters
+        next_start, carried = end, 0
+        while next_start > start + 1 and carried + len(words[next_start - 1]) + 1 <= overlap:
+            next_start -= 1
+            carried += len(words[next_start]) + 1
+        start = next_start
+    return chunks
+
+
+class ChunkedSummarizer:
+    """Drop-in replacement for ``prompt | llm | output_parser``.
+
+    Transcripts that fit in one chunk use the single-call chain. Longer
+    ones are split, each chunk is summarized on a bounded thread pool, and
+    the part summaries are merged group by group until one summary is left.
+
+    ``limiter`` (e.g. a semaphore shared across summarizers) is held around
+    every model call, to cap concurrent requests to the model process-wide.
+    """
+
+    def __init__(self, llm, prompt_template, chunk_tokens=CHUNK_TOKENS,
+                 overlap_tokens=CHUNK_OVERLAP_TOKENS, max_workers=SUMMARY_WORKERS, limiter=None):
+        # langchain_core takes longer to import than the rest of the app
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.max_workers = max(1, max_workers)
+        self.limiter = limiter or nullcontext()
+        output_parser = StrOutputParser()
+        self.single_chain = (
+            PromptTemplate(template=prompt_template, input_variables=["transcript"])
+            | llm | output_parser
+        )
+        self.map_chain = (
+            PromptTemplate(template=map_prompt_template, input_variables=["part", "total", "transcript"])
+            | llm | output_parser
+        )
+        self.reduce_chain = (
+            PromptTemplate(template=reduce_prompt_template, input_variables=["summaries"])
+            | llm | output_parser
+        )
+
+    def invoke(self, inputs):
+        return "".join(self.stream(inputs))
+
+    def stream(self, inputs):
+        """Yield the summary as the model produces it.
+
+        For chunked transcripts the map and intermediate reduce steps run
+        first; only the final reduce is streamed.
+        """
+        transcript = inputs["transcript"]
+        if estimate_tokens(transcript) <= self.chunk_tokens:
+            with self.limiter:
+                yield from self.single_chain.stream({"transcript": transcript})
+            return
+
+        chunks = split_transcript(transcript, self.chunk_tokens, self.overlap_tokens)
+        total = len(chunks)
+        summaries = self._run_all(self.map_chain, [
+            {"part": i + 1, "total": total, "transcript": chunk}
+            for i, chunk in enumerate(chunks)
+        ])
+        yield from self.stream_reduce(summaries)
+
+    def reduce(self, summaries):
+        """Merge part summaries hierarchically, keeping their order"""
+        return "".join(self.stream_reduce(summaries))
+
+    def stream_reduce(self, summaries):
+        while True:
+            groups = self._group(summaries)
+            if len(groups) == 1:
+                with self.limiter:
+                    yield from self.reduce_chain.stream({"summaries": self._join(groups[0])})
+                return
+            summaries = self._run_all(self.reduce_chain, [
+                {"summaries": self._join(group)} for group in groups
+            ])
+
+    def _group(self, summaries):
+        # Pack consecutive summaries into groups that fit one prompt
+        groups, current, size = [], [], 0
+        for summary in summaries:
+            tokens = estimate_tokens(summary)
+            if current and size + tokens > self.chunk_tokens:
+                groups.append(current)
+                current, size = [], 0
+            current.append(summary)
+            size += tokens
+        groups.append(current)
+        # Always make progress, even if every summary is oversized
+        if len(groups) == len(summaries) > 1:
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        return groups
+
+    @staticmethod
+    def _join(summaries):
+        return "\n\n".join(f"Part {i + 1}:\n{summary}" for i, summary in enumerate(summaries))
+
+    def _run_all(self, chain, inputs):
+        def invoke(chain_input):
+            with self.limiter:
+                return chain.invoke(chain_input)
+
+        if len(inputs) == 1:
+            return [invoke(inputs[0])]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(inputs))) as pool:
+            return list(pool.map(invoke, inputs))
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Port for the Prometheus sidecar; unset or 0 leaves it off
+METRICS_PORT = int(os.getenv("TUBETALK_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("TUBETALK_METRICS_HOST", "127.0.0.1")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+METRIC_HELP = {
+    "tubetalk_stage_seconds": ("histogram", "Time spent in each pipeline stage"),
+    "tubetalk_stage_errors_total": ("counter", "Pipeline stage failures by reason"),
+    "tubetalk_cache_requests_total": ("counter", "Cache lookups by cache and result"),
+    "tubetalk_requests_total": ("counter", "Transcript and summary requests by outcome"),
+    "tubetalk_llm_call_seconds": ("histogram", "Latency of successful model calls"),
+    "tubetalk_llm_errors_total": ("counter", "Failed model calls by model and reason"),
+    "tubetalk_upstream_requests_total": ("counter", "Requests let through by the rate limiter"),
+    "tubetalk_upstream_rejected_total": ("counter", "Requests turned away by the rate limiter"),
+    "tubetalk_upstream_queued_seconds_total": ("counter", "Time requests spent queued by the rate limiter"),
+    "tubetalk_llm_tokens_total": ("counter", "Estimated Gemini tokens by model and direction"),
+    "tubetalk_http_requests_total": ("counter", "Caption HTTP requests by result"),
+    "tubetalk_coalesced_requests_total": ("counter", "Requests that joined an identical one in flight"),
+    "tubetalk_cache_bytes": ("gauge", "Size of the persistent cache payloads"),
+    "tubetalk_jobs_total": ("counter", "Finished or rejected background jobs by outcome"),
+    "tubetalk_job_queue_seconds": ("histogram", "Time background jobs waited for a worker"),
+    "tubetalk_jobs": ("gauge", "Background jobs queued or running"),
+}
+
+request_log = logging.getLogger("tubetalk.requests")
+
+
+def log_event(event, level=logging.INFO, **fields):
+    """Write one JSON log line (``{"ts": ..., "event": ..., **fields}``)"""
+    if request_log.isEnabledFor(level):
+        request_log.log(level, json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str))
+
+
+def log_request(timings, outcome, **fields):
+    """One ``"request"`` line for a finished request: its ``RequestTimings``
+    (video ID, stage durations, caption format, token counts) plus ``fields``
+    such as ``transcript_chars``, ``models`` and ``error``"""
+    log_event("request", outcome=outcome, **timings.to_dict(), **fields)
+
+
+def configure_json_logging(stream=None):
+    """Send the JSON event log to stderr (or ``stream``); safe to call more than once"""
+    if not any(getattr(handler, "_tubetalk_json", False) for handler in request_log.handlers):
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler._tubetalk_json = True
+        request_log.addHandler(handler)
+    request_log.setLevel(logging.INFO)
+    request_log.propagate = False
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class Metrics:
+    """Counters and latency histograms, rendered in the Prometheus text format.
+
+    Collectors (callables returning ``(name, labels_dict, value)`` samples)
+    expose counters the components already keep, read at render time.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counters = {}         # (name, labels) -> value
+        self._histograms = {}       # (name, labels) -> [bucket counts..., sum, count]
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[index] += 1
+                    break
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    @contextmanager
+    def stage(self, stage, **labels):
+        """Time a block as ``stage``; exceptions are counted by type and re-raised"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.inc("tubetalk_stage_errors_total", stage=stage, reason=type(e).__name__, **labels)
+            raise
+        finally:
+            self.observe("tubetalk_stage_seconds", time.perf_counter() - started, stage=stage, **labels)
+
+    def value(self, name, **labels):
+        """Current counter value, or the observation count of a histogram"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key in self._histograms:
+                return self._histograms[key][-1]
+            return self._counters.get(key, 0)
+
+    def add_collector(self, collect):
+        self._collectors.append(collect)
+
+    def render(self):
+        families = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                families.setdefault(name, []).append(f"{name}{_labels(labels)} {value}")
+            for (name, labels), histogram in self._histograms.items():
+                lines = families.setdefault(name, [])
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), histogram[:-2] + [histogram[-1] - sum(histogram[:-2])]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram[-2]}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram[-1]}")
+        for collect in self._collectors:
+            for name, labels, value in collect():
+                families.setdefault(name, []).append(f"{name}{_labels(tuple(sorted(labels.items())))} {value}")
+
+        out = []
+        for name in sorted(families):
+            kind, help_text = METRIC_HELP.get(name, ("untyped", name))
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(families[name])
+        return "\n".join(out) + "\n"
+
+
+def start_metrics_server(metrics, port=METRICS_PORT, host=METRICS_HOST):
+    """Serve ``GET /metrics`` from a daemon thread; returns the server, or None if the port is taken"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:
+        log_event("metrics_server_failed", level=logging.WARNING, port=port, error=str(e))
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-sidecar", daemon=True).start()
+    log_event("metrics_server_started", host=host, port=server.server_address[1])
+    return server
@@ -0,0 +1,27 @@
+import pytest
+
+
+class FakeClock:
+    """Time that only moves when a test says so.
+
+    Returns ``now``, first advanced by ``step`` on every read (0 by
+    default). ``sleep`` advances it instantly and records the seconds asked for.
+    """
+
+    def __init__(self, step=0.0):
+        self.now = 0.0
+        self.step = step
+        self.slept = []
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+
+from batch_summarize import BatchSummarizer, load_completed
+from transcript_segments import Transcript
+
+
+class StubPipeline:
+    """Duck-typed SummaryPipeline that tracks per-stage concurrency"""
+
+    def __init__(self, delay=0.02, no_captions=()):
+        self.delay = delay
+        self.no_captions = set(no_captions)
+        self.active = {"metadata": 0, "captions": 0, "llm": 0}
+        self.peak = dict(self.active)
+        self._lock = threading.Lock()
+
+    def _enter(self, stage):
+        with self._lock:
+            self.active[stage] += 1
+            self.peak[stage] = max(self.peak[stage], self.active[stage])
+        time.sleep(self.delay)
+        with self._lock:
+            self.active[stage] -= 1
+
+    def get_video_info(self, url):
+        self._enter("metadata")
+        return f"title {url[-11:]}", None, 60
+
+    def get_youtube_transcript(self, url):
+        self._enter("captions")
+        if url[-11:] in self.no_captions:
+            return "Error: No subtitles or captions available for this video."
+        return Transcript.from_text(f"transcript of {url[-11:]}")
+
+    def stream_summary(self, transcript, timing):
+        self._enter("llm")
+        timing["cached"] = False
+        timing["models"] = ["stub-model"]
+        yield "summary: "
+        yield transcript.text
+
+
+def _urls(count):
+    return [f"https://www.youtube.com/watch?v=vid{index:08d}" for index in range(count)]
+
+
+def _records(path):
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_batch_writes_one_record_per_video_within_stage_limits(tmp_path):
+    output = tmp_path / "out.jsonl"
+    pipeline = StubPipeline(no_captions={"vid00000003"})
+    urls = _urls(12) + ["not a url", _urls(1)[0]]
+
+    stats = BatchSummarizer(
+        pipeline, str(output), metadata_workers=3, caption_workers=2, llm_workers=1, log=lambda message: None
+    ).run(urls)
+
+    records = _records(output)
+    assert stats["ok"] == 11 and stats["failed"] == 2 and stats["skipped"] == 1
+    assert len(records) == 13
+    by_id = {record["video_id"]: record for record in records}
+    assert by_id["vid00000000"]["summary"] == "summary: transcript of vid00000000"
+    assert by_id["vid00000000"]["models"] == ["stub-model"]
+    assert by_id["vid00000003"]["status"] == "failed"
+    assert by_id["vid00000003"]["error"].startswith("captions: Error")
+    assert by_id[None]["error"] == "Invalid YouTube URL format"
+    assert all("transcript" not in record for record in records)
+    assert pipeline.peak["metadata"] <= 3
+    assert pipeline.peak["captions"] <= 2
+    assert pipeline.peak["llm"] == 1
+
+
+def test_rerun_resumes_from_output_and_retries_failures(tmp_path):
+    output = tmp_path / "out.jsonl"
+    BatchSummarizer(
+        StubPipeline(delay=0, no_captions={"vid00000001"}), str(output), log=lambda message: None
+    ).run(_urls(4))
+    with open(output, "a", encoding="utf-8") as handle:
+        handle.write('{"video_id": "vid0000')      # Interrupted mid-write
+
+    assert load_completed(str(output)) == {"vid00000000", "vid00000002", "vid00000003"}
+
+    stats = BatchSummarizer(StubPipeline(delay=0), str(output), log=lambda message: None).run(_urls(4))
+    assert stats["skipped"] == 3 and stats["ok"] == 1
+    assert load_completed(str(output)) == {"vid00000000", "vid00000001", "vid00000002", "vid00000003"}
@@ -0,0 +1,45 @@
+import importlib.util
+import json
+import os
+
+BENCH_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "bench_pipeline.py")
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location("bench_pipeline", BENCH_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_scaled_fixtures_parse_to_the_same_text_in_every_format():
+    bench = _load_bench()
+    from subtitle_parsers import parse_subtitle
+
+    texts = {ext: parse_subtitle(ext, bench.scaled_caption(ext, 10)).text for ext in bench.FORMATS}
+    assert texts["json3"] == texts["vtt"] == texts["srt"]
+    transcript = parse_subtitle("vtt", bench.scaled_caption("vtt", 10))
+    assert 9 * 60 < transcript.duration < 11 * 60
+
+
+def test_quick_run_writes_machine_readable_results(tmp_path, capsys):
+    bench = _load_bench()
+    output = tmp_path / "results.json"
+    bench.main(["--quick", "--output", str(output)])
+
+    results = json.loads(output.read_text())
+    assert results["schema"] == bench.RESULTS_SCHEMA
+    assert {row["format"] for row in results["parsers"]} == set(bench.FORMATS)
+    assert all(row["mb_per_s"] > 0 and row["peak_memory_bytes"] > 0 for row in results["parsers"])
+    segments = {}
+    for row in results["parsers"]:
+        segments.setdefault((row["format"], row["minutes"]), {})[row["mode"]] = row["segments"]
+    assert all(set(modes) == set(bench.PARSE_MODES) and len(set(modes.values())) == 1 for modes in segments.values())
+    assert [row["minutes"] for row in results["index"]] == [3, 30]
+    assert all(row["chunks"] > 0 and row["query_s"]["p50"] <= row["query_s"]["p99"] for row in results["index"])
+    for row in results["end_to_end"]:
+        assert row["latency_s"]["p50"] <= row["latency_s"]["p99"]
+        assert row["first_token_s"]["p50"] <= row["latency_s"]["p50"]
+        assert row["llm_calls_per_video"] == 1
+        assert row["prompt_tokens_per_video"] > 0
+    assert "end to end" in capsys.readouterr().out
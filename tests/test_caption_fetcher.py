@@ -0,0 +1,90 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from caption_fetcher import fetch_first_success
+from http_client import CaptionHTTPClient
+
+# path -> (delay seconds, status, body)
+ROUTES = {
+    "/en-manual": (0.3, 200, "manual english"),
+    "/en-auto": (0.0, 200, "auto english"),
+    "/broken": (0.0, 500, ""),
+    "/slow-broken": (0.3, 404, ""),
+    "/de-auto": (0.0, 200, "auto german"),
+    "/never": (2.0, 200, "too late"),
+}
+
+
+class StubCaptionHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requested.append(self.path)
+        delay, status, body = ROUTES[self.path]
+        time.sleep(delay)
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def caption_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCaptionHandler)
+    server.requested = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", server
+    server.shutdown()
+
+
+def make_fetch(base):
+    client = CaptionHTTPClient(max_retries=0)
+
+    def fetch(path):
+        response = client.get(base + path)
+        return response.text if response.status_code == 200 else None
+    return fetch
+
+
+def test_priority_wins_over_speed(caption_server):
+    base, _ = caption_server
+    winner, text = fetch_first_success(["/en-manual", "/en-auto", "/de-auto"], make_fetch(base))
+    assert (winner, text) == ("/en-manual", "manual english")
+
+
+def test_failures_fall_through_in_priority_order(caption_server):
+    base, _ = caption_server
+    winner, text = fetch_first_success(["/slow-broken", "/broken", "/de-auto", "/en-auto"], make_fetch(base))
+    assert (winner, text) == ("/de-auto", "auto german")
+
+
+def test_all_failing_returns_none(caption_server):
+    base, _ = caption_server
+    assert fetch_first_success(["/broken", "/slow-broken"], make_fetch(base)) == (None, None)
+    assert fetch_first_success([], make_fetch(base)) == (None, None)
+
+
+def test_candidates_run_concurrently(caption_server):
+    base, _ = caption_server
+    started = time.perf_counter()
+    winner, _ = fetch_first_success(["/slow-broken", "/en-manual"], make_fetch(base), max_workers=2)
+    assert winner == "/en-manual"
+    assert time.perf_counter() - started < 0.55
+
+
+def test_lower_priority_work_is_cancelled_after_a_win(caption_server):
+    base, server = caption_server
+    server.requested.clear()
+    started = time.perf_counter()
+    winner, _ = fetch_first_success(["/en-auto"] + ["/never"] * 5, make_fetch(base), max_workers=2)
+    assert winner == "/en-auto"
+    # We do not wait for the in-flight slow request, and queued ones never start
+    assert time.perf_counter() - started < 1.0
+    time.sleep(0.1)
+    assert server.requested.count("/never") <= 2
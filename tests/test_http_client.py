@@ -0,0 +1,122 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_client import CaptionHTTPClient, response_validators
+
+ETAG = '"v1"'
+
+
+class FlakyCaptionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"     # keep-alive, so connections can be reused
+
+    def do_GET(self):
+        server = self.server
+        server.hits[self.path] = server.hits.get(self.path, 0) + 1
+        hit = server.hits[self.path]
+        server.headers_seen.append(dict(self.headers))
+        server.clients.add(self.client_address)
+        if self.path == "/flaky" and hit <= 2:
+            return self._reply(503, b"")
+        if self.path == "/busy" and hit <= 2:
+            return self._reply(503, b"Service busy, try again. " * 400)
+        if self.path == "/throttled" and hit == 1:
+            return self._reply(429, b"", {"Retry-After": "1"})
+        if self.path == "/down":
+            return self._reply(500, b"")
+        if self.path == "/missing":
+            return self._reply(404, b"")
+        if self.headers.get("If-None-Match") == ETAG:
+            return self._reply(304, b"")
+        self._reply(200, b"WEBVTT\n\n00:00.000 --> 00:01.000\nhello", {"ETag": ETAG})
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def running_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyCaptionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def server(running_server):
+    running_server.hits = {}
+    running_server.headers_seen = []
+    running_server.clients = set()
+    return running_server
+
+
+def make_client(sleeps, **kwargs):
+    return CaptionHTTPClient(sleep=sleeps.append, jitter=lambda: 1.0, **kwargs)
+
+
+def test_retries_transient_errors_with_backoff(server):
+    sleeps = []
+    client = make_client(sleeps, max_retries=3, backoff_base=0.5)
+    response = client.get(server.base + "/flaky")
+    assert response.status_code == 200
+    assert sleeps == [0.5, 1.0]
+    assert client.stats()["retries"] == 2
+    assert client.stats()["requests"] == 3
+
+
+def test_streamed_retries_reuse_the_connection(server):
+    sleeps = []
+    client = make_client(sleeps)
+    response = client.get(server.base + "/busy", stream=True)
+    assert response.status_code == 200
+    assert b"".join(response.iter_content(1024)).startswith(b"WEBVTT")
+    response.close()
+    assert client.stats()["requests"] == 3
+    assert len(server.clients) == 1          # Each 503 was released to the pool, not dropped or leaked
+
+
+def test_honours_retry_after(server):
+    sleeps = []
+    client = make_client(sleeps, backoff_cap=0.25)
+    assert client.get(server.base + "/throttled").status_code == 200
+    assert sleeps == [0.25]
+
+
+def test_gives_up_after_max_retries(server):
+    sleeps = []
+    client = make_client(sleeps, max_retries=2)
+    assert client.get(server.base + "/down").status_code == 500
+    assert len(sleeps) == 2
+    assert client.stats()["failures"] == 1
+
+
+def test_client_errors_are_not_retried(server):
+    sleeps = []
+    client = make_client(sleeps)
+    assert client.get(server.base + "/missing").status_code == 404
+    assert sleeps == []
+
+
+def test_conditional_request_and_connection_reuse(server):
+    client = make_client([])
+    first = client.get(server.base + "/track.vtt")
+    validators = response_validators(first)
+    assert validators["etag"] == ETAG
+    second = client.get(server.base + "/track.vtt", **validators)
+    assert second.status_code == 304
+    assert "gzip" in server.headers_seen[0]["Accept-Encoding"]
+    stats = client.stats()
+    assert stats["not_modified"] == 1
+    assert stats["connections_opened"] == 1
+    assert stats["pooled_requests"] == 2
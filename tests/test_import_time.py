@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous enough for a slow CI machine; the core imports in ~40 ms locally
+IMPORT_BUDGET_MS = 250
+# Loaded lazily, on first use
+HEAVY_MODULES = ("streamlit", "yt_dlp", "langchain_core", "langchain_google_genai", "requests", "dotenv")
+
+
+def _import_times(statement):
+    """``{module: cumulative microseconds}`` from ``python -X importtime``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_core_modules_import_without_heavy_dependencies():
+    times = _import_times("import pipeline, batch_summarize")
+    assert not [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+
+
+def test_core_import_time_budget():
+    times = _import_times("import pipeline")
+    assert times["pipeline"] / 1000 < IMPORT_BUDGET_MS
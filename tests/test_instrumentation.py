@@ -0,0 +1,40 @@
+import json
+
+from instrumentation import RequestTimings
+
+
+def test_spans_accumulate_and_export_json(clock):
+    clock.step = 0.5
+    timings = RequestTimings(video_id="vid", clock=clock)
+    with timings.span("caption_download"):
+        pass
+    with timings.span("caption_download"):
+        pass
+    with timings.span("parse"):
+        pass
+    data = json.loads(timings.to_json())
+    assert data["video_id"] == "vid"
+    assert data["stages"]["caption_download"] == {"seconds": 1.0, "count": 2}
+    assert data["total_seconds"] == 3.0     # From creation to the end of the last span
+
+
+def test_total_is_wall_clock_when_spans_overlap(clock):
+    timings = RequestTimings(clock=clock)
+    clock.now = 4.0
+    timings.record("caption_download", 3.0)     # Two parallel downloads over the same 3 seconds
+    timings.record("caption_download", 3.0)
+    assert timings.durations["caption_download"] == 6.0
+    assert timings.total == 4.0
+
+
+def test_progress_follows_completed_stages():
+    progress = []
+    timings = RequestTimings(stages=("a", "b", "c", "d"), on_progress=progress.append)
+    with timings.stage("a"):
+        pass
+    timings.complete("b")
+    timings.complete("b")
+    timings.complete("unknown")
+    with timings.stage("d"):
+        pass
+    assert progress == [0.25, 0.5, 0.5, 0.5, 0.75]
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobTimeout, QueueFull
+from telemetry import Metrics
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _stub_stages(release, calls):
+    """fetch → parse → summarize with stubbed stages; summarize waits for ``release``"""
+    def run(job, url):
+        calls.append((url, threading.current_thread().name))
+        job.emit("caption_selected", "English automatic captions")
+        job.emit("progress", 0.4)
+        transcript = f"transcript of {url}"
+        job.emit("progress", 0.6)
+        release.wait(5)
+        for word in ("A", " short", " summary"):
+            job.emit("summary_chunk", word)
+        job.emit("progress", 1.0)
+        return {"transcript": transcript, "summary": "A short summary"}
+    return run
+
+
+def test_jobs_run_off_the_callers_thread_and_report_progress():
+    release, calls = threading.Event(), []
+    jobs = JobQueue(_stub_stages(release, calls), workers=2)
+
+    job = jobs.submit("abc", "https://youtu.be/abc")
+    _wait_until(lambda: job.progress == 0.6)
+    assert job.status == RUNNING and not job.finished
+    assert jobs.submit("abc", "https://youtu.be/abc") is job       # Same video: same job
+    assert jobs.get("abc") is job
+
+    release.set()
+    _wait_until(lambda: job.finished)
+    assert job.status == DONE and job.result["summary"] == "A short summary"
+    assert job.events[0] == ("caption_selected", ("English automatic captions",))
+    assert "".join(args[0] for event, args in job.events if event == "summary_chunk") == "A short summary"
+    assert len(calls) == 1 and calls[0][1].startswith("job-worker-")
+
+    again = jobs.submit("abc", "https://youtu.be/abc")               # Finished jobs may be rerun
+    assert again is not job
+
+
+def test_queue_depth_bounds_waiting_jobs():
+    release, calls = threading.Event(), []
+    metrics = Metrics()
+    jobs = JobQueue(_stub_stages(release, calls), workers=1, max_queued=2, metrics=metrics)
+
+    running = jobs.submit("a", "a")
+    _wait_until(lambda: running.status == RUNNING)
+    second, third = jobs.submit("b", "b"), jobs.submit("c", "c")
+    assert (second.status, third.status) == (QUEUED, QUEUED)
+    assert jobs.position(second) == 0 and jobs.position(third) == 1
+    with pytest.raises(QueueFull):
+        jobs.submit("d", "d")
+    assert jobs.stats() == {"workers": 1, "queued": 2, "running": 1, "finished": 0}
+
+    release.set()
+    _wait_until(lambda: third.finished)
+    assert [url for url, _ in calls] == ["a", "b", "c"]
+    assert metrics.value("tubetalk_jobs_total", outcome="ok") == 3
+    assert metrics.value("tubetalk_jobs_total", outcome="rejected") == 1
+    assert metrics.value("tubetalk_job_queue_seconds") == 3
+
+
+def test_failed_and_timed_out_jobs():
+    def fail(job):
+        raise RuntimeError("no captions")
+
+    jobs = JobQueue(fail, workers=1)
+    job = jobs.submit("x")
+    _wait_until(lambda: job.finished)
+    assert job.status == FAILED and str(job.error) == "no captions"
+
+    stuck = threading.Event()
+
+    def slow(job):
+        job.emit("progress", 0.2)
+        stuck.wait(5)
+        job.emit("progress", 0.5)          # Past the deadline: stops the work here
+        return "too late"
+
+    jobs = JobQueue(slow, workers=1, timeout=0.05)
+    job = jobs.submit("y")
+    _wait_until(lambda: job.status == RUNNING)
+    time.sleep(0.1)
+    assert jobs.get("y").status == FAILED and isinstance(job.error, JobTimeout)
+    stuck.set()
+    _wait_until(lambda: jobs.stats()["running"] == 0)
+    assert job.result is None and job.progress == 0.2
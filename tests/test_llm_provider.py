@@ -0,0 +1,60 @@
+from llm_provider import LLMProvider
+
+
+class FakeLLM:
+    def __init__(self, name, fails=False):
+        self.name = name
+        self.fails = fails
+
+    def invoke(self, prompt):
+        if self.fails:
+            raise RuntimeError(f"{self.name} unavailable")
+        return "Hello"
+
+
+def make_provider(failing=(), **kwargs):
+    return LLMProvider(
+        models=["a", "b", "c"],
+        llm_factory=lambda name: FakeLLM(name, fails=name in failing),
+        **kwargs
+    )
+
+
+def test_probes_once_and_reuses_model():
+    provider = make_provider(failing={"a"})
+    first = provider.get()
+    for _ in range(10):
+        assert provider.get() is first
+    assert provider.model_name == "b"
+    assert provider.probe_count == 1
+    assert provider.probe_calls == 2
+
+
+def test_reprobes_after_ttl_expires(clock):
+    provider = make_provider(ttl=100, clock=clock)
+    provider.get()
+    clock.now = 99
+    provider.get()
+    assert provider.probe_count == 1
+    clock.now = 100
+    provider.get()
+    assert provider.probe_count == 2
+
+
+def test_invalidate_forces_reprobe():
+    provider = make_provider()
+    provider.get()
+    provider.invalidate()
+    assert provider.model_name is None
+    provider.get()
+    assert provider.probe_count == 2
+
+
+def test_all_models_failing_backs_off(clock):
+    provider = make_provider(failing={"a", "b", "c"}, failure_ttl=60, clock=clock)
+    assert provider.get() is None
+    assert provider.get() is None
+    assert provider.probe_count == 1
+    clock.now = 60
+    provider.get()
+    assert provider.probe_count == 2
@@ -0,0 +1,42 @@
+import importlib.util
+import json
+import os
+
+LOAD_TEST_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "load_test.py")
+
+
+def _load_harness():
+    spec = importlib.util.spec_from_file_location("load_test", LOAD_TEST_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_quick_run_reports_every_level(tmp_path, capsys):
+    harness = _load_harness()
+    output = tmp_path / "load.json"
+    harness.main(["--quick", "--no-memory", "--output", str(output)])
+
+    results = json.loads(output.read_text())
+    assert results["schema"] == harness.RESULTS_SCHEMA
+    assert [level["sessions"] for level in results["levels"]] == [1, 4]
+    for level in results["levels"]:
+        assert level["requests"] == level["sessions"] * 2 and level["error_rate"] == 0.0
+        assert level["videos_per_minute"] > 0 and level["caption_requests"] == level["requests"]
+        assert set(level["latency_s"]) == set(harness.STAGES)
+        assert level["latency_s"]["first_token"]["p50"] <= level["latency_s"]["total"]["p50"]
+    assert "videos/min" in capsys.readouterr().out
+
+
+def test_injected_failures_are_counted_by_reason():
+    harness = _load_harness()
+    results = harness.main([
+        "--quick", "--sessions", "4", "--no-memory", "--ytdlp-error-rate", "1",
+    ])
+    level = results["levels"][0]
+    assert level["error_rate"] == 1.0 and level["errors"] == {"metadata: StubError": level["requests"]}
+
+    results = harness.main(["--quick", "--sessions", "2", "--caption-error-rate", "0.5", "--llm-error-rate", "0.5"])
+    level = results["levels"][0]
+    assert level["caption_failures"] > 0 and level["llm_errors"] > 0
+    assert level["peak_memory_per_session_bytes"] > 0
@@ -0,0 +1,127 @@
+import pytest
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from model_router import ModelRouter, is_rate_limited
+
+
+class QuotaError(Exception):
+    status_code = 429
+
+
+class FakeModel:
+    """Streams its name word by word; can fail before or after the first chunk"""
+
+    def __init__(self, name, clock, latency=1.0, error=None, fail_after_first=False):
+        self.name = name
+        self.clock = clock
+        self.latency = latency
+        self.error = error
+        self.fail_after_first = fail_after_first
+        self.calls = 0
+
+    def stream(self, prompt):
+        self.calls += 1
+        self.clock.now += self.latency
+        if self.error and not self.fail_after_first:
+            raise self.error
+        yield f"{self.name}:"
+        if self.error:
+            raise self.error
+        yield " done"
+
+
+TIERS = {"flash-a": "flash", "flash-b": "flash", "pro": "pro"}
+
+
+def make_router(clock, **models):
+    fakes = {name: FakeModel(name, clock, **models.get(name, {})) for name in TIERS}
+    router = ModelRouter(models=list(TIERS), llm_factory=fakes.__getitem__, tiers=TIERS,
+                         long_tokens=1000, clock=clock)
+    return router, fakes
+
+
+def test_short_transcripts_prefer_flash_and_long_ones_pro(clock):
+    router, _ = make_router(clock)
+    assert router.route(100) == ["flash-a", "flash-b", "pro"]
+    assert router.route(5000) == ["pro", "flash-a", "flash-b"]
+
+
+def test_configured_order_ignores_live_stats(clock):
+    router, _ = make_router(clock, **{"flash-a": {"error": QuotaError("quota")}})
+    "".join(router.stream("prompt", 100))
+    assert router.route(100) == ["flash-b", "pro"]          # flash-a is resting
+    assert router.configured_order(100) == ["flash-a", "flash-b", "pro"]
+    assert router.configured_order(5000) == ["pro", "flash-a", "flash-b"]
+
+
+def test_faster_model_in_the_same_tier_moves_ahead(clock):
+    router, _ = make_router(clock, **{"flash-a": {"latency": 4.0}, "flash-b": {"latency": 0.5}})
+    for _ in range(3):
+        "".join(router.stream("prompt", 100))
+    # The unmeasured flash-b was untried; once measured it wins
+    router.record("flash-b", 0.5)
+    assert router.route(100)[0] == "flash-b"
+
+
+def test_fails_over_to_the_next_model_before_any_output(clock):
+    router, fakes = make_router(clock, **{"flash-a": {"error": RuntimeError("boom")}})
+    assert "".join(router.stream("prompt", 100)) == "flash-b: done"
+    decision = router.stats()["decisions"][-1]
+    assert decision["model"] == "flash-b" and decision["failovers"] == 1
+
+
+def test_failure_after_output_is_not_retried(clock):
+    router, fakes = make_router(clock, **{"flash-a": {"error": RuntimeError("cut off"), "fail_after_first": True}})
+    with pytest.raises(RuntimeError, match="cut off"):
+        "".join(router.stream("prompt", 100))
+    assert fakes["flash-b"].calls == 0
+
+
+def test_rate_limited_model_rests_for_the_cooldown(clock):
+    router, fakes = make_router(clock, **{"flash-a": {"error": QuotaError("Resource exhausted")}})
+    "".join(router.stream("prompt", 100))
+    assert "flash-a" not in router.route(100)
+    assert router.stats()["models"]["flash-a"]["rate_limited"] == 1
+
+    clock.now += 61
+    assert router.route(100)[0] == "flash-b"      # Back, but behind the healthy model
+    assert "flash-a" in router.route(100)
+
+
+def test_repeated_errors_put_a_model_in_cooldown(clock):
+    router, _ = make_router(clock)
+    for _ in range(4):
+        router.record("pro", 1.0, error=RuntimeError("500"))
+    assert "pro" not in router.route(5000)
+
+
+def test_all_models_failing_raises_with_every_error(clock):
+    router, _ = make_router(clock, **{name: {"error": RuntimeError(f"{name} down")} for name in TIERS})
+    with pytest.raises(RuntimeError, match="flash-a down.*flash-b down.*pro down"):
+        "".join(router.stream("prompt", 100))
+
+
+def test_runnable_works_inside_a_chain_and_reports_the_serving_model(clock):
+    router, _ = make_router(clock, **{"flash-a": {"error": QuotaError("quota")}})
+    served = []
+    chain = PromptTemplate.from_template("{transcript}") | router.runnable(100, served) | StrOutputParser()
+    assert chain.invoke({"transcript": "hello"}) == "flash-b: done"
+    assert "".join(chain.stream({"transcript": "hello"})) == "flash-b: done"
+    assert served == ["flash-b", "flash-b"]
+
+
+def test_stats_expose_latency_histograms(clock):
+    router, _ = make_router(clock)
+    router.record("pro", 0.3)
+    router.record("pro", 3.0)
+    pro = router.stats()["models"]["pro"]
+    assert pro["calls"] == 2
+    assert pro["histogram"]["<=0.5s"] == 1 and pro["histogram"]["<=5s"] == 1
+
+
+def test_rate_limit_detection():
+    assert is_rate_limited(QuotaError())
+    assert is_rate_limited(RuntimeError("429 Too Many Requests"))
+    assert is_rate_limited(RuntimeError("You exceeded your current quota"))
+    assert not is_rate_limited(RuntimeError("500 internal"))
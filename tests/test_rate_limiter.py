@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from model_router import ModelRouter
+from rate_limiter import RateLimiter, RateLimitExceeded, Throttle
+
+
+def make_limiter(clock, limits, max_wait=30):
+    return RateLimiter(limits, max_wait=max_wait, clock=clock, sleep=clock.sleep)
+
+
+def test_burst_then_requests_queue_at_the_sustained_rate(clock):
+    # 6 per minute: a burst of 1 (10 s worth), then one every 10 s
+    limiter = make_limiter(clock, {"captions": {"requests_per_minute": 6}})
+    waits = [limiter.acquire("captions") for _ in range(4)]
+    assert waits == [0.0, 10.0, 10.0, 10.0]
+    assert clock.now == 30.0
+
+
+def test_waiters_are_queued_in_arrival_order(clock):
+    limiter = make_limiter(clock, {"yt_dlp": {"requests_per_minute": 60}})   # Bucket of 10
+    for _ in range(10):
+        limiter.acquire("yt_dlp")
+    # Reservations stack up: the next callers wait 1 s, 2 s, 3 s from now
+    limiter.sleep = lambda seconds: None
+    assert [limiter.acquire("yt_dlp") for _ in range(3)] == [1.0, 2.0, 3.0]
+
+
+def test_deadline_rejects_without_spending_the_budget(clock):
+    limiter = make_limiter(clock, {"captions": {"requests_per_minute": 6}}, max_wait=5)
+    limiter.acquire("captions")
+    with pytest.raises(RateLimitExceeded) as raised:
+        limiter.acquire("captions")
+    assert raised.value.retry_after == pytest.approx(10.0)
+    assert "try again in 10s" in str(raised.value)
+    clock.now += 10
+    assert limiter.acquire("captions") == 0.0
+    assert limiter.stats()["captions"]["rejected"] == 1
+
+
+def test_gemini_tokens_are_limited_and_accounted_per_model(clock):
+    limiter = make_limiter(clock, {"gemini": {"requests_per_minute": 600, "tokens_per_minute": 6000}})
+    limiter.acquire("gemini", "flash", tokens=1000)
+    limiter.record("gemini", "flash", tokens_out=200)
+    # The bucket holds 10 s worth (1000 tokens), all spent; 1500 more take 15 s at 100/s
+    assert limiter.acquire("gemini", "flash", tokens=1500) == pytest.approx(15.0)
+    assert limiter.acquire("gemini", "pro", tokens=800) == 0.0           # Separate bucket
+    assert limiter.stats()["gemini:flash"] == {
+        "requests": 2, "tokens_in": 2500, "tokens_out": 200, "waited_s": 15.0, "rejected": 0,
+    }
+
+
+def test_unlisted_upstreams_are_not_limited_but_still_counted(clock):
+    limiter = make_limiter(clock, {})
+    assert all(limiter.acquire("captions") == 0.0 for _ in range(100))
+    assert limiter.stats()["captions"]["requests"] == 100
+
+
+def test_throttle_caps_concurrency_and_rate(clock):
+    limiter = make_limiter(clock, {"captions": {"requests_per_minute": 600}})
+    slots = threading.BoundedSemaphore(1)
+    throttle = Throttle(limiter, "captions", slots)
+    with throttle:
+        assert not slots.acquire(blocking=False)
+    with throttle:
+        pass
+    assert limiter.stats()["captions"]["requests"] == 2
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = name
+
+    def stream(self, prompt):
+        yield f"{self.name} answered"
+
+
+def test_router_skips_a_model_whose_queue_is_too_long(clock):
+    limiter = make_limiter(clock, {"gemini": {"requests_per_minute": 6}}, max_wait=1)
+    router = ModelRouter(models=["a", "b"], llm_factory=FakeModel, tiers={}, clock=clock, limiter=limiter)
+    assert "".join(router.stream("prompt", 10)) == "a answered"
+    assert "".join(router.stream("prompt", 10)) == "b answered"
+    with pytest.raises(RateLimitExceeded):
+        "".join(router.stream("prompt", 10))
+    assert limiter.stats()["gemini:a"]["tokens_out"] > 0
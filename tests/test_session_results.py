@@ -0,0 +1,40 @@
+from session_results import SessionResults, VideoResult
+from transcript_segments import Transcript
+
+
+def _result(video_id, text=""):
+    result = VideoResult(video_id, f"https://youtu.be/{video_id}", title=video_id)
+    if text:
+        result.transcript = Transcript.from_text(text)
+    return result
+
+
+def test_results_are_kept_per_video_and_refreshed_in_place():
+    results = SessionResults(max_entries=3)
+    result = results.put(_result("a"))
+    result.summary = "short summary"
+    results.put(result)
+
+    assert results.get("a").summary == "short summary"
+    assert len(results) == 1 and results.latest() is result
+
+
+def test_least_recently_viewed_result_is_evicted_first():
+    results = SessionResults(max_entries=2)
+    results.put(_result("a"))
+    results.put(_result("b"))
+    results.get("a")                    # Viewing "a" again keeps it
+    results.put(_result("c"))
+
+    assert "a" in results and "c" in results and "b" not in results
+    assert results.evictions == 1
+
+
+def test_text_budget_bounds_memory_but_keeps_the_newest_result():
+    results = SessionResults(max_entries=10, max_chars=100)
+    results.put(_result("a", "x" * 60))
+    results.put(_result("b", "y" * 60))
+    assert "a" not in results and results.chars == 60
+
+    results.put(_result("c", "z" * 500))     # Over budget on its own, still shown
+    assert len(results) == 1 and "c" in results
@@ -0,0 +1,219 @@
+import threading
+import time
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from llm_provider import LLMProvider
+from pipeline import SummaryPipeline
+from single_flight import SingleFlight
+from transcript_cache import TranscriptStore
+from transcript_segments import Transcript
+from video_metadata import VideoInfoCache
+
+
+def _run_together(count, func):
+    """Call ``func()`` from ``count`` threads released at the same moment"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = func()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return "result"
+
+    assert _run_together(8, lambda: flights.do("key", work)) == ["result"] * 8
+    assert len(calls) == 1
+    assert flights.stats() == {"executions": 1, "coalesced": 7, "in_flight": 0}
+    # Finished flights are not cached
+    assert flights.do("key", work) == "result" and len(calls) == 2
+
+
+def test_waiters_get_the_leaders_exception():
+    flights = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    results = _run_together(4, lambda: flights.do("key", fail))
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flights.stats()["executions"] == 1
+
+
+def test_waiter_takes_over_when_the_leader_is_interrupted():
+    flights = SingleFlight()
+    leader_started = threading.Event()
+
+    def interrupted():
+        leader_started.set()
+        time.sleep(0.1)
+        raise KeyboardInterrupt
+
+    def leader():
+        with pytest.raises(KeyboardInterrupt):
+            flights.do("key", interrupted)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    leader_started.wait()
+    assert flights.do("key", lambda: "recovered") == "recovered"
+    thread.join()
+    assert flights.stats()["executions"] == 2
+
+
+def test_stream_is_replayed_to_late_joiners_and_runs_to_completion():
+    flights = SingleFlight()
+    finished = threading.Event()
+
+    def produce():
+        for word in ("one", "two", "three"):
+            time.sleep(0.03)
+            yield word
+        finished.set()
+
+    first, first_leads = flights.stream("key", produce)
+    assert next(first) == "one"
+    second, second_leads = flights.stream("key", produce)
+    assert (first_leads, second_leads) == (True, False)
+    assert list(second) == ["one", "two", "three"]
+    first.close()               # A reader leaving early does not stop the producer
+    assert finished.wait(1)
+
+
+def test_stream_errors_reach_every_reader():
+    flights = SingleFlight()
+
+    def produce():
+        yield "partial"
+        raise RuntimeError("model went away")
+
+    chunks, _ = flights.stream("key", produce)
+    assert next(chunks) == "partial"
+    with pytest.raises(RuntimeError):
+        list(chunks)
+
+
+class CountingLLM:
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt_value):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        prompt = prompt_value if isinstance(prompt_value, str) else prompt_value.to_string()
+        return "summary of " + prompt.split()[-2]
+
+
+@pytest.fixture
+def make_pipeline(tmp_path):
+    stores = []
+
+    def make(llm, extractor=None, **kwargs):
+        store = TranscriptStore(path=str(tmp_path / f"cache{len(stores)}.sqlite3"))
+        stores.append(store)
+        return SummaryPipeline(
+            llm_provider=LLMProvider(models=["fake"], llm_factory=lambda name: RunnableLambda(llm)),
+            video_cache=VideoInfoCache(extractor=extractor or (lambda url: {})),
+            store=store,
+            http_client=object(),
+            **kwargs,
+        )
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_identical_summaries_in_flight_make_one_llm_call(make_pipeline):
+    llm = CountingLLM(delay=0.2)
+    pipeline = make_pipeline(llm)
+    pipeline.llm_provider.get()
+    llm.calls = 0
+    transcript = Transcript.from_text("a short talk about caching")
+
+    timings = [{} for _ in range(6)]
+    results = _run_together(6, lambda: "".join(pipeline.stream_summary(transcript, timings.pop())))
+
+    assert len(set(results)) == 1 and results[0].startswith("summary of")
+    assert llm.calls == 1
+    assert pipeline.flights.stats()["coalesced"] >= 1
+
+
+def test_llm_concurrency_is_capped_across_different_videos(make_pipeline):
+    llm = CountingLLM(delay=0.05)
+    pipeline = make_pipeline(llm, llm_concurrency=2)
+    pipeline.llm_provider.get()
+    counter = iter(range(100))
+
+    _run_together(6, lambda: "".join(pipeline.stream_summary(Transcript.from_text(f"talk {next(counter)} x"), {})))
+    assert llm.max_active == 2
+
+
+def test_concurrent_video_lookups_extract_once(make_pipeline):
+    extractions = []
+
+    def extractor(url):
+        extractions.append(url)
+        time.sleep(0.1)
+        return {"id": "dQw4w9WgXcQ", "title": "Shared", "duration": 60}
+
+    pipeline = make_pipeline(CountingLLM(0), extractor=extractor)
+    results = _run_together(5, lambda: pipeline.get_video_info("https://youtu.be/dQw4w9WgXcQ"))
+    assert results == [("Shared", None, 60)] * 5
+    assert len(extractions) == 1
+
+
+def test_stored_summary_is_served_without_probing_the_model(make_pipeline):
+    pipeline = make_pipeline(CountingLLM(0))
+    transcript = Transcript.from_text("a short talk about caching")
+    summary = "".join(pipeline.stream_summary(transcript, {}))
+
+    def down(prompt):
+        raise RuntimeError("Gemini is down")
+
+    # A restart while Gemini is down: the stored summary still comes back, with no model calls
+    restarted = SummaryPipeline(
+        llm_provider=LLMProvider(models=["fake"], llm_factory=lambda name: RunnableLambda(down)),
+        store=pipeline.store, http_client=object(),
+    )
+    timing = {}
+    assert "".join(restarted.stream_summary(transcript, timing)) == summary
+    assert timing['cached'] and restarted.llm_provider.probe_calls == 0
+
+    # A different model list misses
+    other = SummaryPipeline(
+        llm_provider=LLMProvider(models=["other"], llm_factory=lambda name: RunnableLambda(CountingLLM(0))),
+        store=pipeline.store, http_client=object(),
+    )
+    timing = {}
+    "".join(other.stream_summary(transcript, timing))
+    assert timing['cached'] is False
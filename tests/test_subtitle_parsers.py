@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+
+from subtitle_parsers import iter_subtitle_segments, parse_subtitle, parse_subtitle_stream, select_caption_track
+
+
+def tracks(*exts):
+    return [{"ext": ext, "url": f"https://captions.test/track.{ext}"} for ext in exts]
+
+
+def test_prefers_json3_whatever_the_order():
+    assert select_caption_track(tracks("vtt", "srv3", "json3", "ttml"))["ext"] == "json3"
+
+
+def test_falls_back_in_preference_order():
+    assert select_caption_track(tracks("ttml", "srt", "srv1"))["ext"] == "srv1"
+    assert select_caption_track(tracks("srt", "vtt"))["ext"] == "vtt"
+
+
+def test_unknown_formats_are_not_selected():
+    assert select_caption_track(tracks("xyz")) is None
+    assert select_caption_track([]) is None
+    assert select_caption_track(None) is None
+
+
+def test_json3_is_parsed_from_bytes():
+    body = json.dumps({"events": [
+        {"tStartMs": 0, "segs": [{"utf8": "hello"}, {"utf8": " world"}]},
+        {"tStartMs": 900, "segs": [{"utf8": "\n"}]},
+    ]}).encode()
+    assert parse_subtitle("json3", body).text == "hello world"
+
+
+@pytest.mark.parametrize("ext, body", [
+    ("srv1", '<transcript><text start="0" dur="1">it&amp;#39;s</text><text start="1">fine</text></transcript>'),
+    ("srv3", '<timedtext format="3"><body><p t="0" d="1"><s>it&#39;s</s><s> fine</s></p></body></timedtext>'),
+    ("ttml", '<tt xmlns="http://www.w3.org/ns/ttml"><body><div><p begin="0s">it\'s</p><p>fine</p></div></body></tt>'),
+])
+def test_xml_formats_yield_text_not_markup(ext, body):
+    assert parse_subtitle(ext, body.encode()).text == "it's fine"
+
+
+def test_vtt_and_srt_dispatch_by_ext():
+    vtt = b"WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nhello\n"
+    srt = b"1\n00:00:00,000 --> 00:00:01,000\nhello\n"
+    assert parse_subtitle("vtt", vtt).text == "hello"
+    assert parse_subtitle("srt", srt).text == "hello"
+
+
+def test_unsupported_format_raises():
+    with pytest.raises(ValueError):
+        parse_subtitle("xyz", b"")
+
+
+def _chunks(body, size):
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.mark.parametrize("ext, name", [("vtt", "rolling_auto.en.vtt"), ("srt", "manual.en.srt")])
+@pytest.mark.parametrize("size", [1, 3, 64, 4096])
+def test_streamed_cues_match_the_buffered_parse(ext, name, size):
+    with open(os.path.join(FIXTURES, name), "rb") as handle:
+        body = handle.read()
+    body = body.replace(b"\n", b"\r\n") if size == 3 else body      # "\r\n" split across chunks
+    buffered, streamed = {}, {}
+    assert parse_subtitle_stream(ext, _chunks(body, size), streamed) == parse_subtitle(ext, body, buffered)
+    assert streamed == buffered
+
+
+@pytest.mark.parametrize("size", [1, 5, 4096])
+def test_streamed_json3_matches_the_buffered_parse(size):
+    body = json.dumps({
+        "wireMagic": "pb3", "pens": [{}], "wsWinStyles": [{"mhModeHint": 2}], "version": 10,
+        "events": [{"tStartMs": 0, "dDurationMs": 1500, "id": 1}] + [
+            {"tStartMs": index * 1000, "dDurationMs": 1200, "segs": [{"utf8": "café"}, {"utf8": f" {index}"}]}
+            for index in range(50)
+        ],
+        "trailer": 12345,
+    }, indent=1).encode()
+    assert parse_subtitle_stream("json3", _chunks(body, size)) == parse_subtitle("json3", body)
+
+
+def test_streamed_segments_arrive_before_the_body_ends():
+    body = b"WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nfirst\n\n00:00:01.000 --> 00:00:02.000\nsecond\n\n"
+    received = []
+
+    def chunks():
+        for chunk in _chunks(body, 16):
+            received.append(chunk)
+            yield chunk
+
+    first = next(iter_subtitle_segments("vtt", chunks()))
+    assert first == (0.0, 1.0, "first") and len(b"".join(received)) < len(body)
+
+
+def test_truncated_json3_stream_raises():
+    body = json.dumps({"events": [{"tStartMs": 0, "segs": [{"utf8": "hello"}]}]}).encode()
+    with pytest.raises(ValueError):
+        parse_subtitle_stream("json3", _chunks(body[:-10], 4))
@@ -0,0 +1,86 @@
+import re
+import threading
+import time
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from summarizer import ChunkedSummarizer, estimate_tokens, split_transcript
+
+
+class FakeLLM:
+    """Answers map prompts with the chunk's first word and reduce prompts with the parts it saw"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt_value):
+        prompt = prompt_value.to_string()
+        with self._lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if "Transcript part:" in prompt:
+            part = re.search(r"part (\d+) of", prompt).group(1)
+            return f"[{part}]"
+        if "Part summaries:" in prompt:
+            return "".join(re.findall(r"\[[\d,]+\]", prompt)).replace("][", ",")
+        return "single"
+
+
+def words(n, start=0):
+    return " ".join(f"w{i}" for i in range(start, start + n))
+
+
+def test_split_respects_budget_and_overlaps():
+    text = words(1000)
+    chunks = split_transcript(text, chunk_tokens=100, overlap_tokens=10)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 101 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split()[0] in previous.split()
+    assert chunks[-1].split()[-1] == "w999"
+
+
+def test_short_transcript_uses_single_call():
+    llm = FakeLLM()
+    summarizer = ChunkedSummarizer(RunnableLambda(llm), "Summarize: {transcript}", chunk_tokens=1000)
+    assert summarizer.invoke({"transcript": words(50)}) == "single"
+    assert len(llm.prompts) == 1
+
+
+def test_map_runs_concurrently_and_reduce_keeps_order():
+    llm = FakeLLM(delay=0.02)
+    summarizer = ChunkedSummarizer(
+        RunnableLambda(llm), "Summarize: {transcript}",
+        chunk_tokens=50, overlap_tokens=5, max_workers=3
+    )
+    result = summarizer.invoke({"transcript": words(400)})
+    total = len(split_transcript(words(400), 50, 5))
+    assert result == "[" + ",".join(str(i) for i in range(1, total + 1)) + "]"
+    assert llm.max_active == 3
+
+
+def test_reduce_is_hierarchical_when_summaries_do_not_fit():
+    llm = FakeLLM()
+    summarizer = ChunkedSummarizer(RunnableLambda(llm), "{transcript}", chunk_tokens=20)
+    result = summarizer.reduce([f"[{i}] " + "x" * 40 for i in range(1, 9)])
+    reduce_calls = [p for p in llm.prompts if "Part summaries:" in p]
+    assert len(reduce_calls) > 1
+    assert result == "[1,2,3,4,5,6,7,8]"
+
+
+def test_stream_yields_tokens_incrementally():
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="Main topic: streaming works")]))
+    summarizer = ChunkedSummarizer(llm, "Summarize: {transcript}", chunk_tokens=1000)
+    chunks = list(summarizer.stream({"transcript": words(50)}))
+    assert len(chunks) > 1
+    assert "".join(chunks) == "Main topic: streaming works"
@@ -0,0 +1,111 @@
+import importlib.util
+import io
+import json
+import logging
+import os
+import urllib.request
+
+import pytest
+
+from llm_provider import LLMProvider
+from telemetry import Metrics, configure_json_logging, request_log, start_metrics_server
+
+BENCH_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "bench_pipeline.py")
+
+
+@pytest.fixture
+def json_log():
+    stream = io.StringIO()
+    configure_json_logging(stream)
+    yield lambda: [json.loads(line) for line in stream.getvalue().splitlines()]
+    for handler in list(request_log.handlers):
+        request_log.removeHandler(handler)
+    request_log.setLevel(logging.NOTSET)
+
+
+def test_render_uses_the_prometheus_text_format():
+    metrics = Metrics(buckets=(0.1, 1))
+    metrics.inc("tubetalk_cache_requests_total", cache="summary", result="hit")
+    metrics.observe("tubetalk_stage_seconds", 0.5, stage="parse", format="vtt")
+    metrics.observe("tubetalk_stage_seconds", 5, stage="parse", format="vtt")
+    metrics.add_collector(lambda: [("tubetalk_cache_bytes", {}, 42)])
+
+    lines = metrics.render().splitlines()
+    assert "# TYPE tubetalk_stage_seconds histogram" in lines
+    assert 'tubetalk_cache_requests_total{cache="summary",result="hit"} 1' in lines
+    assert 'tubetalk_stage_seconds_bucket{format="vtt",stage="parse",le="0.1"} 0' in lines
+    assert 'tubetalk_stage_seconds_bucket{format="vtt",stage="parse",le="1"} 1' in lines
+    assert 'tubetalk_stage_seconds_bucket{format="vtt",stage="parse",le="+Inf"} 2' in lines
+    assert 'tubetalk_stage_seconds_count{format="vtt",stage="parse"} 2' in lines
+    assert "tubetalk_cache_bytes 42" in lines
+
+
+def test_stage_counts_failures_by_reason():
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.stage("parse", format="srt"):
+            raise ValueError("bad timestamp")
+    assert metrics.value("tubetalk_stage_errors_total", stage="parse", format="srt", reason="ValueError") == 1
+    assert metrics.value("tubetalk_stage_seconds", stage="parse", format="srt") == 1
+
+
+def test_sidecar_serves_metrics():
+    metrics = Metrics()
+    metrics.inc("tubetalk_requests_total", kind="summary", outcome="ok")
+    server = start_metrics_server(metrics, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert 'tubetalk_requests_total{kind="summary",outcome="ok"} 1' in response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_failed_model_probes_are_logged(json_log):
+    def factory(name):
+        raise RuntimeError(f"{name} is retired")
+
+    provider = LLMProvider(models=["old", "older"], llm_factory=factory)
+    assert provider.get() is None
+    assert provider.stats()["probe_failures"] == 2
+    assert [(entry["event"], entry["model"]) for entry in json_log()] == [
+        ("model_probe_failed", "old"), ("model_probe_failed", "older"),
+    ]
+
+
+def test_pipeline_reports_stages_caches_and_models(tmp_path, json_log):
+    spec = importlib.util.spec_from_file_location("bench_pipeline", BENCH_PATH)
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    pipeline = bench.offline_pipeline("vtt", 2, bench.FakeChatModel(), str(tmp_path / "cache.db"))
+    url = "https://www.youtube.com/watch?v=abcdefghijk"
+
+    transcript = pipeline.get_youtube_transcript(url)
+    for _ in range(2):
+        "".join(pipeline.stream_summary(transcript, {}))
+    pipeline.get_youtube_transcript(url)
+
+    metrics = pipeline.metrics
+    assert metrics.value("tubetalk_stage_seconds", stage="caption_fetch", format="vtt") == 1
+    assert metrics.value("tubetalk_stage_seconds", stage="parse", format="vtt") == 1
+    assert metrics.value("tubetalk_stage_seconds", stage="llm") == 1
+    assert metrics.value("tubetalk_llm_call_seconds", model="fake-benchmark") == 1
+    assert metrics.value("tubetalk_cache_requests_total", cache="summary", result="hit") == 1
+    assert metrics.value("tubetalk_cache_requests_total", cache="transcript", result="hit") == 1
+    assert metrics.value("tubetalk_requests_total", kind="transcript", outcome="ok") == 2
+    rendered = metrics.render()
+    assert 'tubetalk_cache_requests_total{cache="video_info",result="miss"} 1' in rendered
+    assert 'tubetalk_http_requests_total{result="sent"} 1' in rendered
+
+    # A track that fails to download is logged and counted instead of vanishing
+    def broken_get(url, etag=None, last_modified=None, stream=False):
+        raise ConnectionError("connection reset")
+
+    pipeline.http_client.get = broken_get
+    assert pipeline.download_and_parse_subtitle({"url": url + "&fmt=vtt", "ext": "vtt"}) is None
+    failures = [entry for entry in json_log() if entry["event"] == "caption_track_failed"]
+    assert [(entry["format"], entry["reason"]) for entry in failures] == [("vtt", "ConnectionError")]
+    assert metrics.value("tubetalk_stage_errors_total", stage="caption_fetch", format="vtt",
+                         reason="ConnectionError") == 1
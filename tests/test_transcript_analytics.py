@@ -0,0 +1,71 @@
+import importlib.util
+import os
+
+from subtitle_parsers import parse_subtitle
+from transcript_analytics import analyze_transcript
+from transcript_segments import Transcript, TranscriptBuilder
+
+BENCH_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "bench_pipeline.py")
+
+# The Analytics tab targets well under 100 ms for a 3-hour transcript (~35 ms
+# measured here, best of three). The assert allows 5x that target so only a
+# regression to per-word Python loops fails, not a busy shared runner.
+ANALYTICS_BUDGET_S = 0.5
+
+
+def _transcript(cues):
+    builder = TranscriptBuilder()
+    for start, end, text in cues:
+        builder.add(start, end, text)
+    return builder.build()
+
+
+TALK = _transcript([
+    (0.0, 10.0, "[Music]"),
+    (10.0, 20.0, "Caching makes slow pages fast. Caching needs invalidation!"),
+    (20.0, 30.0, "Cache invalidation is hard, they say. (applause)"),
+    (40.0, 50.0, "Кэш тоже важен. Caching again."),
+    (50.0, 60.0, "♪ ♪"),
+])
+
+
+def test_counts_timing_and_tags():
+    analytics = analyze_transcript(TALK)
+    assert analytics.word_count == TALK.word_count
+    assert analytics.sentence_count == 5
+    assert analytics.duration == 60.0 and analytics.speech_seconds == 50.0
+    assert analytics.silence_ratio == 10.0 / 60.0              # 30 s – 40 s has no captions
+    assert analytics.music_ratio == 20.0 / 60.0
+    assert analytics.tag_counts == {"music": 3, "applause": 1}
+    assert list(analytics.rate_seconds) == [0, 10, 20, 30, 40, 50]
+    assert list(analytics.rate_wpm) == [6, 48, 42, 0, 30, 12]    # Words in each 10 s bin, per minute
+
+
+def test_keywords_phrases_and_scripts():
+    analytics = analyze_transcript(TALK)
+    assert analytics.keywords[0] == ("caching", 3)
+    assert ("invalidation", 2) in analytics.keywords
+    assert "they" not in dict(analytics.keywords)               # Stopword
+    assert analytics.phrases == []                             # No two-word phrase repeats
+    assert list(analytics.scripts) == ["Latin", "Cyrillic"]
+    assert abs(sum(analytics.scripts.values()) - 1.0) < 1e-9
+
+
+def test_untimed_and_empty_transcripts():
+    analytics = analyze_transcript(Transcript.from_text("just some words without timing words"))
+    assert analytics.word_count == 6 and analytics.words_per_minute is None
+    assert len(analytics.rate_wpm) == 0 and analytics.keywords[0] == ("words", 2)
+    assert analyze_transcript(TranscriptBuilder().build()).word_count == 0
+
+
+def test_three_hour_transcript_is_fast():
+    spec = importlib.util.spec_from_file_location("bench_pipeline", BENCH_PATH)
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    transcript = parse_subtitle("vtt", bench.scaled_caption("vtt", 180))
+
+    analytics = min((analyze_transcript(transcript) for _ in range(3)), key=lambda result: result.seconds)
+    assert analytics.seconds < ANALYTICS_BUDGET_S
+    assert analytics.word_count == transcript.word_count
+    assert 100 < analytics.words_per_minute < 250
+    assert len(analytics.rate_wpm) <= 120 and analytics.phrases
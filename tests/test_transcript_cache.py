@@ -0,0 +1,143 @@
+import random
+import sqlite3
+
+from instrumentation import RequestTimings
+from pipeline import SummaryPipeline
+from subtitle_parsers import parse_vtt_subtitle
+from transcript_cache import TranscriptStore, summary_key
+from transcript_segments import Transcript
+from video_metadata import VideoInfoCache
+
+
+def noise(seed):
+    # ~450 bytes that zlib cannot shrink much
+    return random.Random(seed).randbytes(400).hex()
+
+
+def make_store(tmp_path, clock, **kwargs):
+    clock.step = 1          # Every read is a later moment, so access order is unambiguous
+    return TranscriptStore(path=str(tmp_path / "cache.sqlite3"), clock=clock, **kwargs)
+
+
+def test_transcripts_round_trip_and_persist(tmp_path, clock):
+    store = make_store(tmp_path, clock)
+    transcript = parse_vtt_subtitle("WEBVTT\n\n00:01.000 --> 00:02.500\nhello\n\n00:03.000 --> 00:04.000\nworld\n")
+    store.put_transcript("vid", "en", "auto", transcript)
+    store.close()
+
+    store = make_store(tmp_path, clock)
+    assert store.get_transcript("vid", "en", "auto") == ("en", "auto", transcript)
+    assert store.get_transcript("vid", "en", "manual") is None
+    language, kind, loaded = store.get_transcript("vid")
+    assert loaded.text == "hello world"
+    assert loaded.segment(1) == (3.0, 4.0, "world")
+    assert store.get_transcript("other") is None
+
+
+def test_transcript_validators_and_revalidation(tmp_path, clock):
+    store = make_store(tmp_path, clock)
+    store.put_transcript("vid", "en", "auto", Transcript.from_text("text"), etag='"abc"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    validators = store.get_transcript_validators("vid", "en", "auto")
+    assert validators["etag"] == '"abc"'
+    assert store.is_transcript_fresh(validators, max_age=100)
+    assert not store.is_transcript_fresh(validators, max_age=1)
+    store.mark_transcript_revalidated("vid", "en", "auto")
+    assert store.get_transcript_validators("vid", "en", "auto")["fetched_at"] > validators["fetched_at"]
+
+
+class ChangingCaptions:
+    """Caption host whose track changes between requests and ignores validators"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, etag=None, last_modified=None, stream=False):
+        self.requests.append(etag)
+        version = len(self.requests)
+        response = type("Response", (), {})()
+        response.status_code = 200
+        response.content = f"WEBVTT\n\n00:00.000 --> 00:01.000\nversion {version}\n".encode()
+        response.headers = {"ETag": f'"v{version}"'}
+        response.iter_content = lambda chunk_size: iter([response.content])
+        response.close = lambda: None
+        return response
+
+
+def test_changed_track_is_taken_from_the_conditional_request(tmp_path, clock):
+    http_client = ChangingCaptions()
+    info = {"subtitles": {}, "automatic_captions": {"en": [{"ext": "vtt", "url": "https://captions/vid"}]}}
+    store = make_store(tmp_path, clock)
+    pipeline = SummaryPipeline(video_cache=VideoInfoCache(extractor=lambda url: info), store=store,
+                               http_client=http_client)
+    url = "https://www.youtube.com/watch?v=abcdefghijk"
+    assert pipeline.get_youtube_transcript(url).text == "version 1"
+
+    clock.now += 10 ** 7             # Stale: revalidate with the stored ETag
+    assert pipeline.get_youtube_transcript(url).text == "version 2"
+    assert http_client.requests == [None, '"v1"']     # No second download of the changed track
+    assert store.get_transcript_validators("abcdefghijk", "en", "auto")["etag"] == '"v2"'
+
+
+def test_fetch_stages_complete_as_they_finish(tmp_path, clock):
+    http_client = ChangingCaptions()
+    info = {"subtitles": {}, "automatic_captions": {"en": [{"ext": "vtt", "url": "https://captions/vid"}]}}
+    pipeline = SummaryPipeline(video_cache=VideoInfoCache(extractor=lambda url: info), store=make_store(tmp_path, clock),
+                               http_client=http_client)
+    url = "https://www.youtube.com/watch?v=abcdefghijk"
+    progress = []
+
+    def on_progress(fraction):
+        progress.append((fraction, len(http_client.requests)))
+
+    pipeline.get_youtube_transcript(url, RequestTimings(on_progress=on_progress))
+    assert progress == [(0.2, 0), (0.4, 1), (0.6, 1)]       # metadata before the download starts
+
+    progress.clear()
+    pipeline.get_youtube_transcript(url, RequestTimings(on_progress=on_progress))
+    assert progress == [(0.2, 1), (0.4, 1), (0.6, 1)]       # Fresh stored copy: all skipped at once
+
+
+def test_old_cache_files_gain_validator_columns(tmp_path, clock):
+    path = tmp_path / "cache.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE transcripts (video_id TEXT NOT NULL, language TEXT NOT NULL, kind TEXT NOT NULL, "
+        "data BLOB NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL, "
+        "PRIMARY KEY (video_id, language, kind))"
+    )
+    conn.commit()
+    conn.close()
+    store = TranscriptStore(path=str(path), clock=clock)
+    store.put_transcript("vid", "en", "auto", Transcript.from_text("text"), etag='"abc"')
+    assert store.get_transcript_validators("vid", "en", "auto")["etag"] == '"abc"'
+
+
+def test_summary_key_changes_with_model_and_prompt():
+    base = summary_key("transcript", "gemini-2.5-flash", "prompt {transcript}")
+    assert base == summary_key("transcript", "gemini-2.5-flash", "prompt {transcript}")
+    assert base != summary_key("transcript", "gemini-2.5-pro", "prompt {transcript}")
+    assert base != summary_key("transcript", "gemini-2.5-flash", "new prompt {transcript}")
+    assert base != summary_key("other transcript", "gemini-2.5-flash", "prompt {transcript}")
+
+
+def test_summaries_round_trip(tmp_path, clock):
+    store = make_store(tmp_path, clock)
+    key = summary_key("transcript", "model", "prompt")
+    assert store.get_summary(key) is None
+    store.put_summary(key, "a summary")
+    assert store.get_summary(key) == "a summary"
+    assert store.stats()["hits"] == 1
+    assert store.stats()["misses"] == 1
+
+
+def test_least_recently_read_rows_are_evicted_over_size_limit(tmp_path, clock):
+    store = make_store(tmp_path, clock, max_bytes=2500)
+    for key in "abc":
+        store.put_summary(key, noise(key))
+    store.get_summary("a")
+    for key in "def":
+        store.put_summary(key, noise(key))
+    assert store.stats()["bytes"] <= 2500
+    assert store.stats()["evictions"] > 0
+    assert store.get_summary("a") is not None
+    assert store.get_summary("b") is None
@@ -0,0 +1,65 @@
+from summarizer import estimate_tokens
+from transcript_compaction import clean_text, compact_transcript
+from transcript_segments import TranscriptBuilder
+
+
+def _transcript(segments):
+    builder = TranscriptBuilder()
+    for index, text in enumerate(segments):
+        builder.add(index * 2.0, index * 2.0 + 2.0, text)
+    return builder.build()
+
+
+def test_clean_text_removes_non_speech_filler_and_repeats():
+    assert clean_text("[Music] so um today we we look at uh caching [Applause]") == "so today we look at caching"
+    assert clean_text(">> Umm, I think I think it's fine (laughs) ♪♪") == "I think it's fine"
+    assert clean_text("the summary stays the same") == "the summary stays the same"
+    assert clean_text("mmm, a 5 mm bolt") == "a 5 mm bolt"
+
+
+def test_clean_text_keeps_doubled_words_that_are_meant():
+    assert clean_text("she had had enough, so so we left") == "she had had enough, so we left"
+    assert clean_text("he said that that was it, bye bye") == "he said that that was it, bye bye"
+    assert clean_text("it's it's fine") == "it's fine"
+
+
+def test_compaction_keeps_timings_and_drops_empty_segments():
+    transcript = _transcript(["[Music]", "welcome um back", "uh", "to the the channel"])
+    stats = {}
+    compacted = compact_transcript(transcript, budget_tokens=1000, stats=stats)
+
+    assert list(compacted) == [(2.0, 4.0, "welcome back"), (6.0, 8.0, "to the channel")]
+    assert stats['tags_removed'] == 1 and stats['fillers_removed'] == 2
+    assert stats['tokens_after'] < stats['tokens_before']
+    assert stats['passages_pruned'] == 0
+
+
+def test_tags_only_transcript_is_sent_as_it_was():
+    transcript = _transcript(["[Music]", "♪♪", "[Applause]"])
+    assert compact_transcript(transcript, budget_tokens=1000).text == transcript.text
+
+
+def test_over_budget_transcripts_keep_topical_passages_in_order():
+    topical = "caching layers reduce latency because caching avoids repeated latency heavy lookups"
+    chatter = "okay so yeah anyway let me just say that this is something you know"
+    segments = ["welcome everyone to this talk about caching and latency in web systems."]
+    for index in range(30):
+        # Each segment ends a sentence, so each is its own passage
+        segments.append(f"{topical} number {index}." if index % 3 == 0 else f"{chatter} {index}.")
+    segments.append("thanks for watching this talk about caching and latency see you next time.")
+    transcript = _transcript(segments)
+
+    stats = {}
+    compacted = compact_transcript(transcript, budget_tokens=estimate_tokens(transcript.text) // 2, stats=stats)
+
+    assert stats['tokens_after'] <= stats['budget_tokens']
+    assert stats['passages_pruned'] > 0
+    assert compacted.text.startswith("welcome everyone")
+    assert compacted.text.endswith("see you next time.")
+    assert compacted.text.count("caching layers") == 10       # Every topical passage survives
+    assert list(compacted.starts) == sorted(compacted.starts)
+
+
+def test_zero_budget_disables_pruning():
+    transcript = _transcript(["some words here"] * 50)
+    assert compact_transcript(transcript, budget_tokens=0).text == transcript.text
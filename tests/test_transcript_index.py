@@ -0,0 +1,73 @@
+import importlib.util
+import os
+
+from transcript_index import TranscriptIndex, format_timestamp, index_key
+from transcript_segments import TranscriptBuilder
+
+BENCH_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "bench_pipeline.py")
+
+
+def _transcript(segments):
+    builder = TranscriptBuilder()
+    for start, text in segments:
+        builder.add(start, start + 5.0, text)
+    return builder.build()
+
+
+TALK = _transcript([
+    (0, "welcome to the channel today we talk about databases"),
+    (60, "first the write ahead log makes every commit durable before it is applied"),
+    (120, "then vacuum reclaims dead rows left behind by updates and deletes"),
+    (180, "finally connection pooling keeps a few connections open for many clients"),
+    (240, "thanks for watching and see you next time"),
+])
+
+
+def test_search_ranks_the_chunk_about_the_question_first():
+    index = TranscriptIndex.build(TALK, window=60)
+    assert len(index) == 5
+    score, start, end, text = index.search("how does the write ahead log keep commits durable?", k=2)[0]
+    assert (start, end) == (60.0, 65.0) and "write ahead log" in text
+    assert index.search("vacuum dead rows", k=1)[0][1] == 120.0
+    assert index.search("kubernetes", k=3) == []
+
+
+def test_index_round_trips_through_json():
+    index = TranscriptIndex.build(TALK, window=60)
+    loaded = TranscriptIndex.from_json(index.to_json())
+    assert loaded.search("connection pooling") == index.search("connection pooling")
+    assert TranscriptIndex.from_json('{"version": -1}') is None
+
+
+def test_keys_and_timestamps():
+    assert index_key(TALK.text) == index_key(TALK.text) != index_key(TALK.text, window=30)
+    assert format_timestamp(75.9) == "1:15"
+    assert format_timestamp(3725) == "1:02:05"
+
+
+def test_questions_send_a_bounded_prompt_and_reuse_the_index(tmp_path):
+    spec = importlib.util.spec_from_file_location("bench_pipeline", BENCH_PATH)
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+    llm = bench.FakeChatModel()
+    pipeline = bench.offline_pipeline("vtt", 60, llm, str(tmp_path / "cache.db"))
+    transcript = pipeline.get_youtube_transcript("https://www.youtube.com/watch?v=abcdefghijk")
+
+    first, again = {}, {}
+    index = pipeline.transcript_index(transcript, first)
+    assert pipeline.transcript_index(transcript, again).chunks == index.chunks
+    assert first['index_cached'] is False and again['index_cached'] is True
+
+    pipeline.llm_provider.get()         # The availability probe is one call of its own
+    calls = llm.token_counts()["calls"]
+    timing = {}
+    question = " ".join(index.chunks[3][2].split()[:8])
+    answer = "".join(pipeline.stream_answer(question, index, timing))
+    assert answer and timing['models'] == ["fake-benchmark"]
+    assert 0 < len(timing['sources']) <= pipeline.qa_top_k
+    assert timing['prompt_tokens'] < len(transcript.text) // 4 // 5      # A fraction of the hour-long transcript
+    assert llm.token_counts()["calls"] == calls + 1
+
+    cached = {}
+    assert "".join(pipeline.stream_answer(question, index, cached)) == answer
+    assert cached['cached'] and llm.token_counts()["calls"] == calls + 1
@@ -0,0 +1,82 @@
+import json
+
+from subtitle_parsers import parse_json_subtitle, parse_srt_subtitle, parse_xml_subtitle
+from transcript_segments import Transcript, TranscriptBuilder, parse_timestamp
+
+
+def build(*segments):
+    builder = TranscriptBuilder()
+    for segment in segments:
+        builder.add(*segment)
+    return builder.build()
+
+
+def sample():
+    return build(
+        (0.0, 2.0, "welcome back"),
+        (2.0, 4.0, "today we look"),
+        (4.0, 6.0, "at caching"),
+        (10.0, 12.0, "thanks for watching"),
+    )
+
+
+def test_segments_share_one_text_buffer():
+    transcript = sample()
+    assert transcript.text == "welcome back today we look at caching thanks for watching"
+    assert len(transcript) == 4
+    assert transcript.segment(2) == (4.0, 6.0, "at caching")
+    assert list(transcript)[-1] == (10.0, 12.0, "thanks for watching")
+    assert transcript.word_count == 10
+    assert transcript.duration == 12.0
+
+
+def test_empty_segments_are_skipped():
+    transcript = build((0.0, 1.0, ""), (1.0, 2.0, "only"))
+    assert len(transcript) == 1
+    assert not build()
+
+
+def test_time_range_lookup():
+    transcript = sample()
+    assert transcript.index_at(4.5) == 2
+    assert transcript.index_at(-1) == 0
+    assert transcript.text_between(2.0, 6.0) == "today we look at caching"
+    assert transcript.text_between(3.0, 5.0) == "today we look at caching"
+    assert transcript.text_between(7.0, 9.0) == ""
+    assert transcript.text_between(0.0, 100.0) == transcript.text
+
+
+def test_chunk_by_time():
+    chunks = sample().chunk_by_time(5.0)
+    assert chunks == [
+        (0.0, 6.0, "welcome back today we look at caching"),
+        (10.0, 12.0, "thanks for watching"),
+    ]
+
+
+def test_json_round_trip_and_plain_text_fallback():
+    transcript = sample()
+    assert Transcript.from_json(transcript.to_json()) == transcript
+    legacy = Transcript.from_json("plain cached text")
+    assert legacy.text == "plain cached text"
+    assert len(legacy) == 1
+
+
+def test_parsers_keep_cue_timings():
+    json3 = parse_json_subtitle(json.loads(
+        '{"events": [{"tStartMs": 1500, "dDurationMs": 1000, "segs": [{"utf8": "hi"}, {"utf8": " there"}]}]}'
+    ))
+    assert json3.segment(0) == (1.5, 2.5, "hi there")
+
+    srt = parse_srt_subtitle("1\n01:00:01,250 --> 01:00:02,000\nlate cue\n")
+    assert srt.segment(0) == (3601.25, 3602.0, "late cue")
+
+    srv3 = parse_xml_subtitle('<timedtext><body><p t="500" d="250">short</p></body></timedtext>')
+    assert srv3.segment(0) == (0.5, 0.75, "short")
+
+
+def test_parse_timestamp_formats():
+    assert parse_timestamp("00:01.500") == 1.5
+    assert parse_timestamp("01:02:03,004") == 3723.004
+    assert parse_timestamp("2.5s") == 2.5
+    assert parse_timestamp("250ms") == 0.25
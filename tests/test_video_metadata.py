@@ -0,0 +1,71 @@
+import pytest
+
+from video_metadata import VideoInfoCache, extract_video_id
+
+
+class StubExtractor:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url):
+        self.calls.append(url)
+        video_id = url.split("v=")[1]
+        return {
+            "id": video_id,
+            "title": f"Video {video_id}",
+            "thumbnail": None,
+            "duration": 61,
+            "subtitles": {"en": [{"ext": "vtt", "url": "http://x/en.vtt"}]},
+            "automatic_captions": {},
+            "formats": ["large", "payload"],
+        }
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=10",
+    "https://youtu.be/dQw4w9WgXcQ?si=abc",
+    "https://m.youtube.com/shorts/dQw4w9WgXcQ",
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+])
+def test_extract_video_id(url):
+    assert extract_video_id(url) == "dQw4w9WgXcQ"
+
+
+def test_extract_video_id_rejects_other_urls():
+    with pytest.raises(ValueError):
+        extract_video_id("https://example.com/watch?v=abc")
+
+
+def test_url_variants_share_one_extraction():
+    extractor = StubExtractor()
+    cache = VideoInfoCache(extractor=extractor)
+    first = cache.get("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    second = cache.get("https://youtu.be/dQw4w9WgXcQ")
+    assert first is second
+    assert extractor.calls == ["https://www.youtube.com/watch?v=dQw4w9WgXcQ"]
+    assert "formats" not in first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    extractor = StubExtractor()
+    cache = VideoInfoCache(extractor=extractor, ttl=10, clock=clock)
+    cache.get("https://youtu.be/aaaaaaaaaaa")
+    clock.now = 10
+    cache.get("https://youtu.be/aaaaaaaaaaa")
+    assert len(extractor.calls) == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    extractor = StubExtractor()
+    cache = VideoInfoCache(extractor=extractor, max_entries=2)
+    cache.get("https://youtu.be/aaaaaaaaaaa")
+    cache.get("https://youtu.be/bbbbbbbbbbb")
+    cache.get("https://youtu.be/aaaaaaaaaaa")
+    cache.get("https://youtu.be/ccccccccccc")
+    assert cache.stats()["evictions"] == 1
+    cache.get("https://youtu.be/aaaaaaaaaaa")
+    cache.get("https://youtu.be/bbbbbbbbbbb")
+    assert len(extractor.calls) == 4
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from subtitle_parsers import parse_srt_subtitle, parse_vtt_subtitle
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def test_rolling_auto_captions_are_collapsed():
+    stats = {}
+    text = parse_vtt_subtitle((FIXTURES / "rolling_auto.en.vtt").read_text(), stats).text
+    assert text == (
+        "welcome back to the channel today we're looking at caching "
+        "[Music] in 2024 and beyond"
+    )
+    assert stats["raw_chars"] > 2 * stats["text_chars"]
+    assert 0.5 < stats["reduction"] < 1
+
+
+def test_srt_markup_is_stripped_and_real_repeats_kept():
+    stats = {}
+    text = parse_srt_subtitle((FIXTURES / "manual.en.srt").read_text(), stats, kind='manual').text
+    assert text == (
+        "Welcome back to the channel. Today we're looking at "
+        "caching & performance. No, no, no. No. 2024"
+    )
+    assert stats["reduction"] > 0
+
+
+def test_identical_manual_cues_are_both_kept():
+    srt = (
+        "1\n00:00:01,000 --> 00:00:02,000\nI don't know\n\n"
+        "2\n00:00:02,500 --> 00:00:03,500\nI don't know\n\n"
+        "3\n00:00:04,000 --> 00:00:04,500\nyes\n\n"
+        "4\n00:00:05,000 --> 00:00:05,500\nyes\n"
+    )
+    transcript = parse_srt_subtitle(srt, kind='manual')
+    assert transcript.text == "I don't know I don't know yes yes"
+    assert len(transcript) == 4
+    # The same cues on an auto track are read as rolling repeats
+    assert parse_srt_subtitle(srt, kind='auto').text == "I don't know yes"
+
+
+def test_overlapping_cue_text_is_only_emitted_once():
+    vtt = (
+        "WEBVTT\n\n"
+        "00:00.000 --> 00:02.000\nthe quick brown fox\n\n"
+        "00:02.000 --> 00:04.000\nquick brown fox jumps over\n\n"
+        "00:04.000 --> 00:06.000\nover\n"
+    )
+    assert parse_vtt_subtitle(vtt).text == "the quick brown fox jumps over"
+
+
+def test_notes_styles_and_identifiers_are_ignored():
+    vtt = (
+        "WEBVTT\n\nNOTE this is a comment\n\n"
+        "STYLE\n::cue { color: red }\n\n"
+        "intro\n00:00.000 --> 00:01.000 line:90%\n<v Alice>Hi there</v>\n\n"
+        "00:01.000 --> 00:02.000\n<c.colorE5E5E5>Bob&nbsp;here</c>\n"
+    )
+    assert parse_vtt_subtitle(vtt).text == "Hi there Bob here"
+
+
+def test_empty_input():
+    stats = {}
+    assert parse_vtt_subtitle("WEBVTT\n", stats).text == ""
+    assert stats["reduction"] == 0.0
@@ -0,0 +1,140 @@
+import re
+import time
+
+import numpy as np
+
+from transcript_compaction import NON_SPEECH, STOPWORDS
+
+# Keywords and phrases listed, and at most this many points on the speaking-rate chart
+TOP_TERMS = 15
+MAX_RATE_POINTS = 120
+# Gaps between cues at least this long count as silence
+SILENCE_GAP_SECONDS = 1.0
+
+# What str.split() splits on, so word counts match Transcript.word_count
+_WHITESPACE = np.array([code for code in range(0x3001) if chr(code).isspace()], dtype=np.uint32)
+_SENTENCE_END = np.array([ord(char) for char in ".!?。！？"], dtype=np.uint32)
+_WORD = re.compile(r"[^\W\d_][\w']*")
+_STOPWORDS = np.array(sorted(STOPWORDS))
+
+# Letters by writing system, for the language mix: (first, last code point, script)
+_SCRIPTS = (
+    (0x0041, 0x005A, "Latin"), (0x0061, 0x007A, "Latin"), (0x00C0, 0x024F, "Latin"),
+    (0x0370, 0x03FF, "Greek"), (0x0400, 0x04FF, "Cyrillic"), (0x0590, 0x05FF, "Hebrew"),
+    (0x0600, 0x06FF, "Arabic"), (0x0900, 0x097F, "Devanagari"), (0x0E00, 0x0E7F, "Thai"),
+    (0x1100, 0x11FF, "Hangul"), (0x3040, 0x30FF, "Japanese kana"), (0x4E00, 0x9FFF, "CJK"),
+    (0xAC00, 0xD7AF, "Hangul"),
+)
+_SCRIPT_BOUNDS = np.array([bound for first, last, _ in _SCRIPTS for bound in (first, last + 1)], dtype=np.uint32)
+
+
+class TranscriptAnalytics:
+    """Everything the Analytics tab shows for one transcript, computed once by ``analyze_transcript``"""
+
+    __slots__ = ('duration', 'speech_seconds', 'word_count', 'sentence_count', 'words_per_minute',
+                 'rate_seconds', 'rate_wpm', 'keywords', 'phrases', 'silence_ratio', 'music_ratio',
+                 'tag_counts', 'scripts', 'seconds')
+
+    def __init__(self):
+        self.duration = 0.0
+        self.speech_seconds = 0.0       # Time covered by cues
+        self.word_count = 0
+        self.sentence_count = 0         # 0 for auto-captions, which have no punctuation
+        self.words_per_minute = None    # Over speech time; None for untimed transcripts
+        self.rate_seconds = np.zeros(0)     # Start of each speaking-rate bin
+        self.rate_wpm = np.zeros(0)         # Words per minute in that bin
+        self.keywords = []              # [(word, count)], most frequent first
+        self.phrases = []               # [(two-word phrase, count)] seen at least twice
+        self.silence_ratio = 0.0        # Share of the duration in gaps between cues
+        self.music_ratio = 0.0          # Share of the duration in cues tagged [Music] or ♪
+        self.tag_counts = {}            # e.g. {"music": 12, "applause": 3}
+        self.scripts = {}               # Share of letters per writing system, largest first
+        self.seconds = 0.0              # Time taken to compute all of the above
+
+
+def analyze_transcript(transcript, top=TOP_TERMS):
+    """Compute ``TranscriptAnalytics`` for a ``Transcript`` in one pass over its arrays.
+
+    The text is viewed as an array of code points and the cue timings as
+    float arrays, so counting words, sentences and scripts, binning words
+    by time and measuring gaps are NumPy operations rather than Python loops
+    over strings. Keywords come from one regex pass and ``np.unique``.
+    """
+    started = time.perf_counter()
+    analytics = TranscriptAnalytics()
+    text = transcript.text
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    starts = np.frombuffer(transcript.starts, dtype=np.float64)
+    ends = np.frombuffer(transcript.ends, dtype=np.float64)
+    offsets = np.frombuffer(transcript.offsets, dtype=np.int64)
+
+    # Words and sentences
+    space = np.isin(codes, _WHITESPACE)
+    word_starts = np.flatnonzero(~space & np.concatenate(([True], space[:-1])))
+    analytics.word_count = len(word_starts)
+    followed_by_space = np.concatenate((space[1:], [True]))
+    analytics.sentence_count = int(np.count_nonzero(np.isin(codes, _SENTENCE_END) & followed_by_space))
+
+    # Timing: speech, silence and speaking rate
+    if len(starts) and ends.max() > 0:
+        analytics.duration = float(ends.max())
+        covered_until = np.maximum.accumulate(ends)
+        gaps = np.concatenate(([starts[0]], starts[1:] - covered_until[:-1]))
+        analytics.silence_ratio = float(gaps[gaps >= SILENCE_GAP_SECONDS].sum() / analytics.duration)
+        # Overlapping cues (rolling captions) count once
+        speech = ends - np.maximum(starts, np.concatenate(([0.0], covered_until[:-1])))
+        analytics.speech_seconds = float(speech[speech > 0].sum())
+        if analytics.speech_seconds:
+            analytics.words_per_minute = analytics.word_count / analytics.speech_seconds * 60
+
+        word_times = starts[np.searchsorted(offsets, word_starts, side="right") - 1]
+        bin_seconds = max(10.0, 10.0 * np.ceil(analytics.duration / MAX_RATE_POINTS / 10))
+        bins = int(np.ceil(analytics.duration / bin_seconds))
+        counts = np.bincount((word_times // bin_seconds).astype(np.int64), minlength=bins)[:bins]
+        analytics.rate_seconds = np.arange(bins) * bin_seconds
+        analytics.rate_wpm = counts * (60.0 / bin_seconds)
+
+        # Non-speech tags, and the cues they sit in
+        tagged = []
+        for match in NON_SPEECH.finditer(text):
+            tag = match.group().lower()
+            if tag == ">>":
+                continue            # Speaker change, not a sound
+            kind = ("music" if "music" in tag or "♪" in tag else "applause" if "applause" in tag
+                    else "laughter" if "laugh" in tag else "other")
+            analytics.tag_counts[kind] = analytics.tag_counts.get(kind, 0) + 1
+            if kind == "music":
+                tagged.append(match.start())
+        if tagged:
+            cues = np.unique(np.searchsorted(offsets, np.array(tagged), side="right") - 1)
+            analytics.music_ratio = float(min(1.0, (ends[cues] - starts[cues]).sum() / analytics.duration))
+
+    # Language mix by writing system
+    buckets = np.searchsorted(_SCRIPT_BOUNDS, codes, side="right")
+    letters = np.bincount(buckets[buckets % 2 == 1] // 2, minlength=len(_SCRIPTS))
+    total = letters.sum()
+    if total:
+        shares = {}
+        for (_, _, script), count in zip(_SCRIPTS, letters):
+            if count:
+                shares[script] = shares.get(script, 0.0) + float(count / total)
+        analytics.scripts = dict(sorted(shares.items(), key=lambda item: -item[1]))
+
+    # Keywords and two-word phrases, stopwords and very short words left out
+    words = np.array(_WORD.findall(text.lower()))
+    if len(words):
+        vocabulary, ids, counts = np.unique(words, return_inverse=True, return_counts=True)
+        content = ~np.isin(vocabulary, _STOPWORDS) & (np.char.str_len(vocabulary) > 2)
+        ranked = np.argsort(-np.where(content, counts, 0), kind="stable")[:top]
+        analytics.keywords = [(str(vocabulary[i]), int(counts[i])) for i in ranked if content[i]]
+        pairs = content[ids[:-1]] & content[ids[1:]]
+        pair_ids = ids[:-1][pairs].astype(np.int64) * len(vocabulary) + ids[1:][pairs]
+        phrases, phrase_counts = np.unique(pair_ids, return_counts=True)
+        ranked = np.argsort(-phrase_counts, kind="stable")[:top]
+        analytics.phrases = [
+            (f"{vocabulary[phrases[i] // len(vocabulary)]} {vocabulary[phrases[i] % len(vocabulary)]}", int(phrase_counts[i]))
+            for i in ranked if phrase_counts[i] > 1
+        ]
+
+    analytics.seconds = time.perf_counter() - started
+    return analytics
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from transcript_segments import Transcript
+
+CACHE_DIR = os.getenv("TUBETALK_CACHE_DIR", ".tubetalk_cache")
+CACHE_MAX_BYTES = int(os.getenv("TUBETALK_CACHE_MAX_MB", "256")) * 1024 * 1024
+# After this long a stored transcript is revalidated with a conditional GET
+TRANSCRIPT_FRESH_SECONDS = int(os.getenv("TUBETALK_TRANSCRIPT_FRESH_HOURS", "24")) * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL,
+    PRIMARY KEY (video_id, language, kind)
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS indexes (
+    key TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+"""
+
+_TABLES = ("videos", "transcripts", "summaries", "indexes")
+
+# Columns added after the first release, for caches created before them
+_MIGRATIONS = {
+    "transcripts": {"etag": "TEXT", "last_modified": "TEXT", "fetched_at": "REAL"},
+}
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def summary_key(transcript, model_name, prompt_template):
+    """Summaries are keyed by content, so a new prompt or model misses"""
+    parts = (content_hash(transcript), model_name or "", content_hash(prompt_template))
+    return content_hash("\x00".join(parts))
+
+
+class TranscriptStore:
+    """Persistent SQLite cache for video info, transcripts, summaries and Q&A indexes.
+
+    Payloads are zlib-compressed. When the stored payload size grows past
+    ``max_bytes`` the least recently read rows are dropped first.
+    """
+
+    def __init__(self, path=None, max_bytes=CACHE_MAX_BYTES, clock=time.time):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "cache.sqlite3")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    # --- Video info (title, thumbnail, duration) ---
+    def get_video(self, video_id):
+        data = self._get("videos", "video_id = ?", (video_id,))
+        return json.loads(data) if data is not None else None
+
+    def put_video(self, video_id, info):
+        self._put("videos", {"video_id": video_id}, json.dumps(info))
+
+    # --- Transcripts ---
+    def get_transcript(self, video_id, language=None, kind=None):
+        """Return ``(language, kind, Transcript)``; without a language, the last stored track"""
+        if language is None:
+            where, params = "video_id = ? ORDER BY accessed_at DESC LIMIT 1", (video_id,)
+        else:
+            where, params = "video_id = ? AND language = ? AND kind = ?", (video_id, language, kind)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT language, kind, data FROM transcripts WHERE {where}", params
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE transcripts SET accessed_at = ? WHERE video_id = ? AND language = ? AND kind = ?",
+                (self.clock(), video_id, row[0], row[1])
+            )
+        return row[0], row[1], Transcript.from_json(zlib.decompress(row[2]).decode("utf-8"))
+
+    def put_transcript(self, video_id, language, kind, transcript, etag=None, last_modified=None):
+        self._put(
+            "transcripts", {"video_id": video_id, "language": language, "kind": kind}, transcript.to_json(),
+            extra={"etag": etag, "last_modified": last_modified, "fetched_at": self.clock()}
+        )
+
+    def get_transcript_validators(self, video_id, language, kind):
+        """Return ``{"etag", "last_modified", "fetched_at"}`` for a stored track"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, fetched_at FROM transcripts "
+                "WHERE video_id = ? AND language = ? AND kind = ?",
+                (video_id, language, kind)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "fetched_at": row[2] or 0.0}
+
+    def is_transcript_fresh(self, validators, max_age=TRANSCRIPT_FRESH_SECONDS):
+        return self.clock() - validators["fetched_at"] < max_age
+
+    def mark_transcript_revalidated(self, video_id, language, kind):
+        """The upstream answered 304: keep the stored text for another freshness period"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE transcripts SET fetched_at = ? WHERE video_id = ? AND language = ? AND kind = ?",
+                (self.clock(), video_id, language, kind)
+            )
+
+    # --- Summaries ---
+    def get_summary(self, key):
+        return self._get("summaries", "key = ?", (key,))
+
+    def put_summary(self, key, summary):
+        self._put("summaries", {"key": key}, summary)
+
+    # --- Q&A retrieval indexes (serialized ``TranscriptIndex``) ---
+    def get_index(self, key):
+        return self._get("indexes", "key = ?", (key,))
+
+    def put_index(self, key, data):
+        self._put("indexes", {"key": key}, data)
+
+    def stats(self):
+        with self._lock:
+            sizes = {
+                table: self._conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}").fetchone()
+                for table in _TABLES
+            }
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": sum(size for _, size in sizes.values()),
+            **{table: count for table, (count, _) in sizes.items()},
+        }
+
+    def close(self):
+        self._conn.close()
+
+    def _get(self, table, where, params):
+        with self._lock:
+            row = self._conn.execute(f"SELECT data FROM {table} WHERE {where}", params).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(f"UPDATE {table} SET accessed_at = ? WHERE {where}", (self.clock(), *params))
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def _migrate(self):
+        for table, columns in _MIGRATIONS.items():
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in columns.items():
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _put(self, table, key_columns, text, extra=None):
+        data = zlib.compress(text.encode("utf-8"))
+        extra = extra or {}
+        columns = [*key_columns, *extra, "data", "size", "accessed_at"]
+        values = [*key_columns.values(), *extra.values(), data, len(data), self.clock()]
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                values
+            )
+            self._evict()
+
+    def _evict(self):
+        total = sum(
+            self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+            for table in _TABLES
+        )
+        while total > self.max_bytes:
+            oldest = min(
+                (row for row in (
+                    self._conn.execute(
+                        f"SELECT accessed_at, rowid, size, '{table}' FROM {table} "
+                        "ORDER BY accessed_at LIMIT 1"
+                    ).fetchone()
+                    for table in _TABLES
+                ) if row is not None),
+                default=None
+            )
+            if oldest is None:
+                break
+            _, rowid, size, table = oldest
+            self._conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+            self.evictions += 1
+            total -= size
@@ -0,0 +1,139 @@
+import math
+import os
+import re
+from collections import Counter
+
+from summarizer import CHARS_PER_TOKEN, estimate_tokens
+from transcript_segments import TranscriptBuilder
+
+# Above this many tokens, low-information passages are dropped (0 disables pruning)
+COMPACT_BUDGET_TOKENS = int(os.getenv("TUBETALK_COMPACT_BUDGET_TOKENS", "50000"))
+# Passages scored for pruning hold at least this many words (or end a sentence)
+PASSAGE_WORDS = 20
+
+# [Music], [Applause], (laughs), ♪ and ">>" speaker-change markers
+NON_SPEECH = re.compile(
+    r"\[[^\]\n]{0,40}\]|\((?:music|applause|laughter|laughs|inaudible|silence|cheering)\)|♪+|>>",
+    re.IGNORECASE,
+)
+# "mm" is left alone: it is also millimetres ("a 5 mm bolt")
+_FILLER = re.compile(r"\b(?:u+m+|u+h+|e+r+m+|h+m+|m{3,}|m+h+m+|a+h+)\b,?", re.IGNORECASE)
+# Words speakers stutter on. Other doubled words are often meant ("had had",
+# "that that", "bye bye"), so only these collapse on their own.
+_STUTTER_WORDS = (
+    "the", "a", "an", "and", "but", "so", "or", "to", "of", "in", "on", "at", "for", "with",
+    "i", "i'm", "we", "you", "he", "she", "they", "it", "it's", "this", "like", "just", "yeah",
+)
+# "the the", "I think I think" -> one copy (stutter words, or phrases of two or three words)
+_REPEAT = re.compile(
+    r"\b((?:%s)\b|\w+(?:\s+\w+){1,2})(?:\s+\1\b)+" % "|".join(map(re.escape, _STUTTER_WORDS)),
+    re.IGNORECASE,
+)
+_WORD = re.compile(r"[a-z0-9']+")
+
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by can could did
+do does doing don't for from get got had has have he her here him his how i i'm if in into is it it's
+its just know like me more most my no not now of off on one only or other our out over really right so
+some that that's the their them then there these they thing things think this those through to too up
+us very was we we're well were what when where which while who why will with would yeah you you're your
+""".split())
+
+
+def clean_text(text, counts=None):
+    """Drop non-speech tags, filler words and immediate repeats; normalize whitespace"""
+    if '[' in text or '(' in text or '♪' in text or '>' in text:
+        text, removed = NON_SPEECH.subn(" ", text)
+        if counts is not None:
+            counts['tags'] += removed
+    text, removed = _FILLER.subn(" ", text)
+    if counts is not None:
+        counts['fillers'] += removed
+    text = _REPEAT.sub(r"\1", text)
+    return " ".join(text.split())
+
+
+def compact_transcript(transcript, budget_tokens=COMPACT_BUDGET_TOKENS, stats=None):
+    """Return a smaller ``Transcript`` to send to the model.
+
+    Every segment is cleaned with ``clean_text``. If the result is still over
+    ``budget_tokens``, it is grouped into passages and the ones with the
+    least topical content are dropped until it fits; the first and last
+    passages are kept ahead of the rest whenever they fit. A transcript
+    that cleans down to nothing (only tags such as ``[Music]``) is sent
+    as it was rather than empty. Timings of what remains are preserved.
+    If ``stats`` is a dict it receives the token counts before and after.
+    """
+    counts = Counter()
+    builder = TranscriptBuilder()
+    for start, end, text in transcript:
+        builder.add(start, end, clean_text(text, counts))
+    cleaned = builder.build()
+    if not cleaned.text:
+        cleaned = transcript
+
+    compacted = cleaned
+    pruned = 0
+    if budget_tokens and estimate_tokens(cleaned.text) > budget_tokens:
+        compacted, pruned = _prune(cleaned, budget_tokens)
+
+    if stats is not None:
+        stats['tokens_before'] = estimate_tokens(transcript.text)
+        stats['tokens_cleaned'] = estimate_tokens(cleaned.text)
+        stats['tokens_after'] = estimate_tokens(compacted.text)
+        stats['budget_tokens'] = budget_tokens
+        stats['tags_removed'] = counts['tags']
+        stats['fillers_removed'] = counts['fillers']
+        stats['passages_pruned'] = pruned
+    return compacted
+
+
+def _passages(transcript):
+    """Group consecutive segments into ``(start, end, text)`` passages"""
+    passages = []
+    start = None
+    parts, words = [], 0
+    for segment_start, segment_end, text in transcript:
+        if start is None:
+            start = segment_start
+        parts.append(text)
+        words += text.count(" ") + 1
+        if words >= PASSAGE_WORDS or text[-1] in ".?!":
+            passages.append((start, segment_end, " ".join(parts)))
+            start, parts, words = None, [], 0
+    if parts:
+        passages.append((start, segment_end, " ".join(parts)))
+    return passages
+
+
+def _prune(transcript, budget_tokens):
+    """Keep the highest-scoring passages that fit in ``budget_tokens``, in order.
+
+    The first and last passages are offered the budget first, but like any
+    other passage are dropped if they do not fit.
+    """
+    passages = _passages(transcript)
+    words = [[word for word in _WORD.findall(text.lower()) if word not in STOPWORDS] for _, _, text in passages]
+    frequency = Counter(word for passage_words in words for word in passage_words)
+
+    def score(index):
+        # Topic words recur across the video; a passage dense in them carries
+        # more of the content (Luhn-style), repeated passages score no higher
+        distinct = set(words[index])
+        length = passages[index][2].count(" ") + 1
+        return sum(math.log(1 + frequency[word]) for word in distinct) / math.sqrt(length)
+
+    last = len(passages) - 1
+    order = [0, last] + sorted(range(1, last), key=score, reverse=True)
+    budget_chars = budget_tokens * CHARS_PER_TOKEN
+    kept, used = set(), 0
+    for index in order:
+        size = len(passages[index][2]) + 1
+        if index not in kept and used + size <= budget_chars:
+            kept.add(index)
+            used += size
+
+    builder = TranscriptBuilder()
+    for index in sorted(kept):
+        builder.add(*passages[index])
+    return builder.build(), len(passages) - len(kept)
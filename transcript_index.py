@@ -0,0 +1,101 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from transcript_cache import content_hash
+from transcript_compaction import STOPWORDS
+
+# Transcript window per retrievable chunk, and chunks sent with each question
+QA_CHUNK_SECONDS = int(os.getenv("TUBETALK_QA_CHUNK_SECONDS", "60"))
+QA_TOP_K = int(os.getenv("TUBETALK_QA_TOP_K", "4"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+INDEX_VERSION = 1               # Bump when the stored format or tokenizer changes
+
+_TERM = re.compile(r"[a-z0-9][a-z0-9']*")
+
+
+def tokenize(text):
+    return [term for term in _TERM.findall(text.lower()) if term not in STOPWORDS]
+
+
+def index_key(transcript_text, window=QA_CHUNK_SECONDS):
+    """Store key for the index of a transcript, by content"""
+    return content_hash(f"bm25:{INDEX_VERSION}:{window}\x00{transcript_text}")
+
+
+def format_timestamp(seconds):
+    """``m:ss`` or ``h:mm:ss``"""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class TranscriptIndex:
+    """BM25 index over consecutive time windows of one transcript.
+
+    Each chunk is ``(start, end, text)``. Postings map a term to
+    ``[(chunk, term frequency), ...]``; document frequencies come from their
+    length, so the index is just chunks plus postings and round-trips
+    through JSON for the transcript store.
+    """
+
+    __slots__ = ('chunks', 'postings', 'lengths', 'avg_length')
+
+    def __init__(self, chunks, postings, lengths):
+        self.chunks = chunks
+        self.postings = postings
+        self.lengths = lengths
+        self.avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    @classmethod
+    def build(cls, transcript, window=QA_CHUNK_SECONDS):
+        chunks = transcript.chunk_by_time(window) if len(transcript) else []
+        postings = {}
+        lengths = []
+        for number, (_, _, text) in enumerate(chunks):
+            terms = tokenize(text)
+            lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                postings.setdefault(term, []).append((number, count))
+        return cls(chunks, postings, lengths)
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def search(self, query, k=QA_TOP_K):
+        """Top ``k`` chunks for ``query`` as ``(score, start, end, text)``, best first"""
+        scores = {}
+        total = len(self.chunks)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for number, count in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[number] / self.avg_length)
+                scores[number] = scores.get(number, 0.0) + idf * count * (BM25_K1 + 1) / (count + norm)
+        best = sorted(scores, key=lambda number: (-scores[number], number))[:k]
+        return [(scores[number], *self.chunks[number]) for number in best]
+
+    def to_json(self):
+        return json.dumps({
+            "version": INDEX_VERSION,
+            "chunks": self.chunks,
+            "postings": self.postings,
+            "lengths": self.lengths,
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data):
+        """Load ``to_json()`` output; returns None for an index stored by another version"""
+        fields = json.loads(data)
+        if fields.get("version") != INDEX_VERSION:
+            return None
+        return cls(
+            [tuple(chunk) for chunk in fields["chunks"]],
+            {term: [tuple(posting) for posting in postings] for term, postings in fields["postings"].items()},
+            fields["lengths"],
+        )
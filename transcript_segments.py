@@ -0,0 +1,152 @@
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class Transcript:
+    """Timed transcript stored as one text buffer plus parallel arrays.
+
+    Segment ``i`` runs from ``starts[i]`` to ``ends[i]`` seconds and its
+    text is ``text[offsets[i]:offsets[i + 1] - 1]`` (segments are separated
+    by one space). No per-segment objects are kept, so long videos cost a
+    few bytes per cue on top of the text itself.
+    """
+
+    __slots__ = ('text', 'starts', 'ends', 'offsets', '_word_count')
+
+    def __init__(self, text, starts, ends, offsets):
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.offsets = offsets          # len(segments) + 1 entries
+        self._word_count = None
+
+    @classmethod
+    def from_text(cls, text):
+        """Untimed transcript: one segment at 0 s"""
+        builder = TranscriptBuilder()
+        builder.add(0.0, 0.0, text)
+        return builder.build()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def __str__(self):
+        return self.text
+
+    def __eq__(self, other):
+        if not isinstance(other, Transcript):
+            return NotImplemented
+        return (self.text, self.starts, self.ends) == (other.text, other.starts, other.ends)
+
+    def segment_text(self, index):
+        return self.text[self.offsets[index]:self.offsets[index + 1] - 1]
+
+    def segment(self, index):
+        return self.starts[index], self.ends[index], self.segment_text(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.segment(index)
+
+    @property
+    def duration(self):
+        return max(self.ends) if len(self) else 0.0
+
+    @property
+    def word_count(self):
+        if self._word_count is None:
+            self._word_count = len(self.text.split())
+        return self._word_count
+
+    def index_at(self, seconds):
+        """Index of the segment playing at ``seconds`` (the last one starting before it)"""
+        return max(bisect_right(self.starts, seconds) - 1, 0)
+
+    def text_between(self, start, end):
+        """Text of the segments overlapping ``[start, end)``, found by binary search"""
+        first = self.index_at(start)
+        if first < len(self) and self.ends[first] <= start and self.starts[first] < start:
+            first += 1
+        last = bisect_left(self.starts, end)
+        if first >= last:
+            return ""
+        return self.text[self.offsets[first]:self.offsets[last] - 1]
+
+    def chunk_by_time(self, window):
+        """Split into consecutive ``(start, end, text)`` chunks of about ``window`` seconds"""
+        chunks = []
+        first = 0
+        while first < len(self):
+            last = max(bisect_left(self.starts, self.starts[first] + window), first + 1)
+            chunks.append((
+                self.starts[first],
+                max(self.ends[first:last]),
+                self.text[self.offsets[first]:self.offsets[last] - 1],
+            ))
+            first = last
+        return chunks
+
+    def to_json(self):
+        return json.dumps({
+            "text": self.text,
+            "starts": self.starts.tolist(),
+            "ends": self.ends.tolist(),
+            "offsets": self.offsets.tolist(),
+        })
+
+    @classmethod
+    def from_json(cls, data):
+        """Load ``to_json()`` output; plain text (older caches) becomes an untimed transcript"""
+        if data.startswith('{"text"'):
+            fields = json.loads(data)
+            return cls(
+                fields["text"],
+                array('d', fields["starts"]),
+                array('d', fields["ends"]),
+                array('q', fields["offsets"]),
+            )
+        return cls.from_text(data)
+
+
+class TranscriptBuilder:
+    """Collects segments from a parser and joins the text once in ``build()``"""
+
+    __slots__ = ('_parts', '_starts', '_ends', '_offsets', '_size')
+
+    def __init__(self):
+        self._parts = []
+        self._starts = array('d')
+        self._ends = array('d')
+        self._offsets = array('q')
+        self._size = 0
+
+    def add(self, start, end, text):
+        if not text:
+            return
+        self._starts.append(start)
+        self._ends.append(end)
+        self._offsets.append(self._size)
+        self._parts.append(text)
+        self._size += len(text) + 1
+
+    def build(self):
+        text = " ".join(self._parts)
+        self._offsets.append(len(text) + 1)
+        return Transcript(text, self._starts, self._ends, self._offsets)
+
+
+def parse_timestamp(value):
+    """Seconds from ``HH:MM:SS.mmm``, ``MM:SS.mmm``, ``HH:MM:SS,mmm`` or ``1.5s``"""
+    value = value.strip().replace(',', '.')
+    if value.endswith('ms'):
+        return float(value[:-2]) / 1000
+    if value.endswith('s'):
+        return float(value[:-1])
+    seconds = 0.0
+    for part in value.split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from urllib.parse import parse_qs, urlparse
+
+# Only the fields the app reads are kept, the full yt-dlp info dict is large
+INFO_FIELDS = ('id', 'title', 'thumbnail', 'duration', 'subtitles', 'automatic_captions')
+
+CACHE_MAX_ENTRIES = 128
+CACHE_TTL_SECONDS = 60 * 60
+
+
+def extract_video_id(url):
+    """Return the canonical 11-character video ID for a YouTube URL"""
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    video_id = ""
+    if host.endswith("youtu.be"):
+        video_id = parsed.path.lstrip("/").split("/")[0]
+    elif "youtube.com" in host:
+        if parsed.path == "/watch":
+            video_id = parse_qs(parsed.query).get("v", [""])[0]
+        else:
+            parts = parsed.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                video_id = parts[1]
+    if not video_id:
+        raise ValueError("Invalid YouTube URL format")
+    return video_id
+
+
+def canonical_url(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def extract_with_yt_dlp(url):
+    """Run one yt-dlp metadata extraction (no download)"""
+    import yt_dlp
+    ydl_opts = {
+        'writesubtitles': True,
+        'writeautomaticsub': True,
+        'skip_download': True,
+        'quiet': True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        return ydl.extract_info(url, download=False)
+
+
+def list_playlist_urls(url):
+    """Expand a playlist or channel URL into canonical video URLs (flat, no per-video extraction)"""
+    import yt_dlp
+    ydl_opts = {'quiet': True, 'skip_download': True, 'extract_flat': 'in_playlist'}
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    entries = info.get('entries') or [info]
+    return [canonical_url(entry['id']) for entry in entries if entry and entry.get('id')]
+
+
+class VideoInfoCache:
+    """Bounded LRU cache of yt-dlp info dicts keyed by video ID, with a TTL.
+
+    ``limiter`` (e.g. a semaphore) is held around each extraction to cap
+    concurrent requests to YouTube; cache hits never wait for it.
+    """
+
+    def __init__(self, extractor=extract_with_yt_dlp, max_entries=CACHE_MAX_ENTRIES,
+                 ttl=CACHE_TTL_SECONDS, clock=time.monotonic, limiter=None):
+        self.extractor = extractor
+        self.limiter = limiter or nullcontext()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()     # video_id -> (expires_at, info)
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """Return the trimmed info dict for ``url``, extracting on a miss"""
+        video_id = extract_video_id(url)
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is not None and self.clock() < entry[0]:
+                self._entries.move_to_end(video_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        with self.limiter:
+            raw = self.extractor(canonical_url(video_id))
+        info = {field: raw.get(field) for field in INFO_FIELDS}
+        info['id'] = info['id'] or video_id
+
+        with self._lock:
+            self._entries[video_id] = (self.clock() + self.ttl, info)
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return info
+
+    def invalidate(self, url):
+        with self._lock:
+            self._entries.pop(extract_video_id(url), None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }